@@ -0,0 +1,29 @@
+"""Add composite index for avatar training history
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Training history is read newest-first per avatar and paginated
+    op.create_index(
+        'ix_avatar_training_sessions_avatar_id_started_at',
+        'avatar_training_sessions',
+        ['avatar_id', sa.text('started_at DESC')],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_avatar_training_sessions_avatar_id_started_at', table_name='avatar_training_sessions')
@@ -0,0 +1,42 @@
+"""Add precomputed compatibility scores table
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Create compatibility_scores table, one row per user pair
+    op.create_table('compatibility_scores',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user1_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user2_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('scores', sa.JSON(), nullable=False),
+        sa.Column('sessions_count', sa.Integer(), nullable=True),
+        sa.Column('last_simulation_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user1_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user2_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user1_id', 'user2_id', name='uq_compatibility_scores_user_pair')
+    )
+    op.create_index(op.f('ix_compatibility_scores_user1_id'), 'compatibility_scores', ['user1_id'], unique=False)
+    op.create_index(op.f('ix_compatibility_scores_user2_id'), 'compatibility_scores', ['user2_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_compatibility_scores_user2_id'), table_name='compatibility_scores')
+    op.drop_index(op.f('ix_compatibility_scores_user1_id'), table_name='compatibility_scores')
+    op.drop_table('compatibility_scores')
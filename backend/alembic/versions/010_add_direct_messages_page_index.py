@@ -0,0 +1,30 @@
+"""Add composite index for paginated conversation messages
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Message pages are selected newest-first per match by ID before the
+    # full rows are loaded
+    op.create_index(
+        'ix_direct_messages_match_id_created_at',
+        'direct_messages',
+        ['match_id', sa.text('created_at DESC')],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_direct_messages_match_id_created_at', table_name='direct_messages')
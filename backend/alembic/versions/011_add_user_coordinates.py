@@ -0,0 +1,34 @@
+"""Add user coordinates for distance filtering
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('users', sa.Column('longitude', sa.Float(), nullable=True))
+    
+    # Bounding-box pre-filter for discovery's max_distance
+    op.create_index(
+        'ix_users_latitude_longitude',
+        'users',
+        ['latitude', 'longitude'],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_users_latitude_longitude', table_name='users')
+    op.drop_column('users', 'longitude')
+    op.drop_column('users', 'latitude')
@@ -0,0 +1,34 @@
+"""Add user interests with GIN index
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('interests', postgresql.ARRAY(sa.String(length=50)), nullable=True))
+    
+    # Discovery filters candidates by array overlap (&&) on interests
+    op.create_index(
+        'ix_users_interests',
+        'users',
+        ['interests'],
+        unique=False,
+        postgresql_using='gin'
+    )
+
+
+def downgrade():
+    op.drop_index('ix_users_interests', table_name='users')
+    op.drop_column('users', 'interests')
@@ -0,0 +1,30 @@
+"""Add composite index for paginated notifications
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Notification pages are read newest-first per user, and keyset pages
+    # seek on created_at
+    op.create_index(
+        'ix_notifications_user_id_created_at',
+        'notifications',
+        ['user_id', sa.text('created_at DESC')],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_notifications_user_id_created_at', table_name='notifications')
@@ -0,0 +1,30 @@
+"""Add composite index for paginated session messages
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Session messages are read oldest-first per session, and keyset pages
+    # seek on timestamp
+    op.create_index(
+        'ix_conversation_messages_session_id_timestamp',
+        'conversation_messages',
+        ['session_id', 'timestamp'],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_conversation_messages_session_id_timestamp', table_name='conversation_messages')
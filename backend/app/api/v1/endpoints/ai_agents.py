@@ -1,22 +1,41 @@
 """
 AI Agents API endpoints.
 """
-from typing import Dict, List, Optional, Any
+from dataclasses import asdict
+from typing import Dict, List, Optional, Any, Type
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 import logging
+import orjson
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.services.ai_agent_service import AIAgentService
 from app.services.conversation_orchestration_service import ConversationOrchestrationService
 from app.api.v1.endpoints.auth import get_current_user
+from app.api.v1.json_body import json_body, json_body_openapi
 from app.models.user import User
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Static payloads, serialized once at import time
+_CONNECTION_ESTABLISHED_TEMPLATE = (
+    '{"type":"connection_established","session_id":%s,"timestamp":"2024-01-01T00:00:00Z"}'
+)
+_PONG_MESSAGE = '{"type":"pong"}'
+_HEALTH_RESPONSE = orjson.dumps({
+    "status": "healthy",
+    "services": {
+        "agentscope": "available" if hasattr(AIAgentService, 'AGENTSCOPE_AVAILABLE') else "unavailable",
+        "gemini_api": "configured" if hasattr(AIAgentService, 'GEMINI_AVAILABLE') else "not_configured"
+    },
+    "timestamp": "2024-01-01T00:00:00Z"
+})
+
 
 # Request/Response Models
 class StartConversationRequest(BaseModel):
@@ -68,10 +87,25 @@ class CompatibilityReportResponse(BaseModel):
     report: Dict[str, Any]
 
 
+# Service outputs are trusted, so FastAPI's output validation only runs in debug
+# builds. The models stay in the OpenAPI schema through ``responses`` either way.
+ENABLE_RESPONSE_VALIDATION = settings.DEBUG
+
+
+def _response_model(model: Type[BaseModel]) -> Optional[Type[BaseModel]]:
+    """Return the response model when output validation is enabled."""
+    return model if ENABLE_RESPONSE_VALIDATION else None
+
+
 # AI Agent Endpoints
-@router.post("/conversations/start", response_model=StartConversationResponse)
+@router.post(
+    "/conversations/start",
+    response_model=_response_model(StartConversationResponse),
+    responses={200: {"model": StartConversationResponse}},
+    openapi_extra=json_body_openapi(StartConversationRequest),
+)
 async def start_conversation(
-    request: StartConversationRequest,
+    request: StartConversationRequest = Depends(json_body(StartConversationRequest)),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -86,21 +120,26 @@ async def start_conversation(
             max_duration_minutes=request.max_duration_minutes
         )
         
-        return StartConversationResponse(
-            session_id=session_id,
-            status="started",
-            message="Conversation session started successfully"
-        )
+        return {
+            "session_id": session_id,
+            "status": "started",
+            "message": "Conversation session started successfully"
+        }
         
     except Exception as e:
         logger.error(f"Error starting conversation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/conversations/{session_id}/messages", response_model=SendMessageResponse)
+@router.post(
+    "/conversations/{session_id}/messages",
+    response_model=_response_model(SendMessageResponse),
+    responses={200: {"model": SendMessageResponse}},
+    openapi_extra=json_body_openapi(SendMessageRequest),
+)
 async def send_message(
     session_id: str,
-    request: SendMessageRequest,
+    request: SendMessageRequest = Depends(json_body(SendMessageRequest)),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -114,7 +153,15 @@ async def send_message(
             message_content=request.message_content
         )
         
-        return SendMessageResponse(**result)
+        # Only the documented fields; the safety assessment stays server-side
+        compatibility_update = result.get("compatibility_update")
+        return {
+            "success": result["success"],
+            "ai_response": result.get("ai_response"),
+            "facilitation_message": result.get("facilitation_message"),
+            "compatibility_update": asdict(compatibility_update) if compatibility_update else None,
+            "error": result.get("error"),
+        }
         
     except Exception as e:
         logger.error(f"Error sending message: {e}")
@@ -147,10 +194,15 @@ async def get_conversation_history(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/conversations/{session_id}/scenarios", response_model=GenerateScenarioResponse)
+@router.post(
+    "/conversations/{session_id}/scenarios",
+    response_model=_response_model(GenerateScenarioResponse),
+    responses={200: {"model": GenerateScenarioResponse}},
+    openapi_extra=json_body_openapi(GenerateScenarioRequest),
+)
 async def generate_scenario(
     session_id: str,
-    request: GenerateScenarioRequest,
+    request: GenerateScenarioRequest = Depends(json_body(GenerateScenarioRequest)),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -163,7 +215,7 @@ async def generate_scenario(
             scenario_type=request.scenario_type
         )
         
-        return GenerateScenarioResponse(scenario=scenario)
+        return {"scenario": scenario}
         
     except Exception as e:
         logger.error(f"Error generating scenario: {e}")
@@ -192,7 +244,11 @@ async def end_conversation(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/conversations/{session_id}/compatibility", response_model=CompatibilityReportResponse)
+@router.get(
+    "/conversations/{session_id}/compatibility",
+    response_model=_response_model(CompatibilityReportResponse),
+    responses={200: {"model": CompatibilityReportResponse}},
+)
 async def get_compatibility_report(
     session_id: str,
     current_user: User = Depends(get_current_user),
@@ -232,7 +288,8 @@ async def get_compatibility_report(
             "is_final": report.is_final
         }
         
-        return CompatibilityReportResponse(report=report_data)
+        # Report data is already JSON-ready; skip the Pydantic round-trip
+        return Response(content=orjson.dumps({"report": report_data}), media_type="application/json")
         
     except HTTPException:
         raise
@@ -331,11 +388,9 @@ async def conversation_websocket(
         await orchestration_service.add_websocket_connection(session_id, websocket)
         
         # Send initial session status
-        await websocket.send_json({
-            "type": "connection_established",
-            "session_id": session_id,
-            "timestamp": "2024-01-01T00:00:00Z"
-        })
+        await websocket.send_text(
+            _CONNECTION_ESTABLISHED_TEMPLATE % orjson.dumps(session_id).decode()
+        )
         
         # Keep connection alive and handle incoming messages
         while True:
@@ -345,7 +400,7 @@ async def conversation_websocket(
                 
                 # Handle different message types
                 if data.get("type") == "ping":
-                    await websocket.send_json({"type": "pong"})
+                    await websocket.send_text(_PONG_MESSAGE)
                 elif data.get("type") == "user_message":
                     # This would typically be handled by the REST API
                     # but we can also handle it here for real-time processing
@@ -373,19 +428,5 @@ async def conversation_websocket(
 @router.get("/health")
 async def health_check():
     """Health check for AI agent services."""
-    try:
-        # Check if required services are available
-        health_status = {
-            "status": "healthy",
-            "services": {
-                "agentscope": "available" if hasattr(AIAgentService, 'AGENTSCOPE_AVAILABLE') else "unavailable",
-                "gemini_api": "configured" if hasattr(AIAgentService, 'GEMINI_AVAILABLE') else "not_configured"
-            },
-            "timestamp": "2024-01-01T00:00:00Z"
-        }
-        
-        return health_status
-        
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
-        raise HTTPException(status_code=500, detail="Service unhealthy")
\ No newline at end of file
+    # Service availability is fixed at import time, so the body is prebuilt
+    return Response(content=_HEALTH_RESPONSE, media_type="application/json")
\ No newline at end of file
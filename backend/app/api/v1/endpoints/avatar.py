@@ -1,20 +1,28 @@
 """
 AI Avatar management endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, raiseload
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from uuid import UUID
 from datetime import datetime
+from operator import attrgetter, itemgetter
 import uuid
+import orjson
 
 from app.core.database import get_db
+from app.core.http_cache import cacheable_json_response
+from app.api.v1.json_body import json_body, json_body_openapi
 from app.models.user import User
 from app.models.avatar import AIAvatar, AvatarCustomization, AvatarTrainingSession
-from app.services.avatar_service import AvatarService
+from app.models.redis_models import get_cached_json, set_cached_json
+from app.services.avatar_service import (
+    AvatarService, AVATAR_CACHE_TTL_SECONDS, avatar_cache_key,
+    avatar_customizations_cache_key, avatar_completeness_cache_key
+)
 
 router = APIRouter()
 
@@ -90,10 +98,73 @@ class AvatarTrainingResponse(BaseModel):
     duration_seconds: Optional[int] = None
 
 
-@router.post("/create/{user_id}", response_model=AvatarResponse)
+# Avatar attributes copied verbatim into the ``AvatarResponse`` payload
+_AVATAR_FIELDS = (
+    "id", "user_id", "name", "description", "avatar_version",
+    "personality_traits", "communication_patterns", "response_style",
+    "conversation_skills", "emotional_range", "completeness_score",
+    "authenticity_score", "consistency_score", "status", "improvement_areas",
+    "suggested_actions", "training_iterations", "last_training_date",
+)
+_get_avatar_fields = attrgetter(*_AVATAR_FIELDS)
+
+
+def _serialize_avatar(avatar: AIAvatar) -> Dict[str, Any]:
+    """Build the ``AvatarResponse`` payload from a trusted ORM avatar.
+    
+    UUID and datetime values are left as-is for orjson to encode natively.
+    """
+    payload = dict(zip(_AVATAR_FIELDS, _get_avatar_fields(avatar)))
+    created_at = avatar.created_at
+    updated_at = avatar.updated_at
+    if created_at is None or updated_at is None:
+        now = datetime.utcnow()
+        created_at = created_at or now
+        updated_at = updated_at or now
+    payload["created_at"] = created_at
+    payload["updated_at"] = updated_at
+    return payload
+
+
+_CUSTOMIZATION_FIELDS = tuple(AvatarCustomizationResponse.model_fields)
+_get_customization_fields = attrgetter(*_CUSTOMIZATION_FIELDS)
+
+_TRAINING_FIELDS = tuple(AvatarTrainingResponse.model_fields)
+_get_training_fields = attrgetter(*_TRAINING_FIELDS)
+
+_COMPLETENESS_FIELDS = tuple(AvatarCompletenessAnalysis.model_fields)
+_get_completeness_fields = itemgetter(*_COMPLETENESS_FIELDS)
+
+
+def _serialize_customization(customization: AvatarCustomization) -> Dict[str, Any]:
+    """Build the ``AvatarCustomizationResponse`` payload from an ORM row."""
+    return dict(zip(_CUSTOMIZATION_FIELDS, _get_customization_fields(customization)))
+
+
+def _serialize_training_session(session: AvatarTrainingSession) -> Dict[str, Any]:
+    """Build the ``AvatarTrainingResponse`` payload from an ORM row."""
+    return dict(zip(_TRAINING_FIELDS, _get_training_fields(session)))
+
+
+def _serialize_completeness(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Project the service's analysis onto ``AvatarCompletenessAnalysis`` fields."""
+    return dict(zip(_COMPLETENESS_FIELDS, _get_completeness_fields(analysis)))
+
+
+def get_avatar_service(db: AsyncSession = Depends(get_db)) -> AvatarService:
+    """Provide an ``AvatarService`` bound to the request's database session."""
+    return AvatarService(db)
+
+
+@router.post(
+    "/create/{user_id}",
+    response_class=Response,
+    responses={200: {"model": AvatarResponse}},
+)
 async def create_avatar(
     user_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    avatar_service: AvatarService = Depends(get_avatar_service)
 ):
     """Create AI avatar from user's personality profile."""
     
@@ -115,34 +186,12 @@ async def create_avatar(
         )
     
     try:
-        avatar_service = AvatarService(db)
         avatar = await avatar_service.create_avatar_from_personality(
-            str(user_id), 
-            str(user.personality_profile.id)
+            user_id, 
+            user.personality_profile.id
         )
         
-        return AvatarResponse(
-            id=str(avatar.id),
-            user_id=str(avatar.user_id),
-            name=avatar.name,
-            description=avatar.description,
-            avatar_version=avatar.avatar_version,
-            personality_traits=avatar.personality_traits,
-            communication_patterns=avatar.communication_patterns,
-            response_style=avatar.response_style,
-            conversation_skills=avatar.conversation_skills,
-            emotional_range=avatar.emotional_range,
-            completeness_score=avatar.completeness_score,
-            authenticity_score=avatar.authenticity_score,
-            consistency_score=avatar.consistency_score,
-            status=avatar.status,
-            improvement_areas=avatar.improvement_areas,
-            suggested_actions=avatar.suggested_actions,
-            training_iterations=avatar.training_iterations,
-            last_training_date=avatar.last_training_date.isoformat() if avatar.last_training_date else None,
-            created_at=avatar.created_at.isoformat() if avatar.created_at else datetime.utcnow().isoformat(),
-            updated_at=avatar.updated_at.isoformat() if avatar.updated_at else datetime.utcnow().isoformat()
-        )
+        return Response(content=orjson.dumps(_serialize_avatar(avatar)), media_type="application/json")
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -153,103 +202,54 @@ async def create_avatar(
         raise HTTPException(status_code=500, detail=f"Failed to create avatar: {str(e)}")
 
 
-@router.get("/{user_id}", response_model=AvatarResponse)
+@router.get(
+    "/{user_id}",
+    response_class=Response,
+    responses={200: {"model": AvatarResponse}},
+)
 async def get_avatar(
     user_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    avatar_service: AvatarService = Depends(get_avatar_service)
 ):
     """Get user's AI avatar."""
     
-    avatar_service = AvatarService(db)
-    avatar = await avatar_service.get_avatar_by_user_id(str(user_id))
+    cache_key = avatar_cache_key(user_id)
+    cached = get_cached_json(cache_key)
+    if cached is not None:
+        return cacheable_json_response(request, cached)
+    
+    avatar = await avatar_service.get_avatar_by_user_id(user_id)
     
     if not avatar:
         raise HTTPException(status_code=404, detail="Avatar not found")
     
-    return AvatarResponse(
-        id=str(avatar.id),
-        user_id=str(avatar.user_id),
-        name=avatar.name,
-        description=avatar.description,
-        avatar_version=avatar.avatar_version,
-        personality_traits=avatar.personality_traits,
-        communication_patterns=avatar.communication_patterns,
-        response_style=avatar.response_style,
-        conversation_skills=avatar.conversation_skills,
-        emotional_range=avatar.emotional_range,
-        completeness_score=avatar.completeness_score,
-        authenticity_score=avatar.authenticity_score,
-        consistency_score=avatar.consistency_score,
-        status=avatar.status,
-        improvement_areas=avatar.improvement_areas,
-        suggested_actions=avatar.suggested_actions,
-        training_iterations=avatar.training_iterations,
-        last_training_date=avatar.last_training_date.isoformat() if avatar.last_training_date else None,
-        created_at=avatar.created_at.isoformat() if avatar.created_at else datetime.utcnow().isoformat(),
-        updated_at=avatar.updated_at.isoformat() if avatar.updated_at else datetime.utcnow().isoformat()
-    )
+    payload = orjson.dumps(_serialize_avatar(avatar))
+    set_cached_json(cache_key, payload, AVATAR_CACHE_TTL_SECONDS)
+    return cacheable_json_response(request, payload)
 
 
-@router.put("/update/{user_id}", response_model=AvatarResponse)
+@router.put(
+    "/update/{user_id}",
+    response_class=Response,
+    responses={200: {"model": AvatarResponse}},
+)
 async def update_avatar_from_personality(
     user_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    avatar_service: AvatarService = Depends(get_avatar_service)
 ):
     """Update avatar when personality profile changes."""
     
-    # Check if user exists and has personality profile
-    result = await db.execute(
-        select(User)
-        .options(selectinload(User.personality_profile))
-        .where(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    if not user.personality_profile:
-        raise HTTPException(status_code=400, detail="User has no personality profile")
-    
     try:
-        avatar_service = AvatarService(db)
-        avatar = await avatar_service.get_avatar_by_user_id(str(user_id))
-        
+        # Creates the avatar if the user has none yet
+        avatar = await avatar_service.upsert_from_personality(user_id)
         if not avatar:
-            # Create new avatar if none exists
-            avatar = await avatar_service.create_avatar_from_personality(
-                str(user_id), 
-                str(user.personality_profile.id)
-            )
-        else:
-            # Update existing avatar
-            avatar = await avatar_service.update_avatar_from_personality(
-                str(avatar.id),
-                str(user.personality_profile.id)
-            )
+            raise HTTPException(status_code=404, detail="User not found")
         
-        return AvatarResponse(
-            id=str(avatar.id),
-            user_id=str(avatar.user_id),
-            name=avatar.name,
-            description=avatar.description,
-            avatar_version=avatar.avatar_version,
-            personality_traits=avatar.personality_traits,
-            communication_patterns=avatar.communication_patterns,
-            response_style=avatar.response_style,
-            conversation_skills=avatar.conversation_skills,
-            emotional_range=avatar.emotional_range,
-            completeness_score=avatar.completeness_score,
-            authenticity_score=avatar.authenticity_score,
-            consistency_score=avatar.consistency_score,
-            status=avatar.status,
-            improvement_areas=avatar.improvement_areas,
-            suggested_actions=avatar.suggested_actions,
-            training_iterations=avatar.training_iterations,
-            last_training_date=avatar.last_training_date.isoformat() if avatar.last_training_date else None,
-            created_at=avatar.created_at.isoformat() if avatar.created_at else datetime.utcnow().isoformat(),
-            updated_at=avatar.updated_at.isoformat() if avatar.updated_at else datetime.utcnow().isoformat()
-        )
+        return Response(content=orjson.dumps(_serialize_avatar(avatar)), media_type="application/json")
     
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -259,37 +259,29 @@ async def update_avatar_from_personality(
         raise HTTPException(status_code=500, detail=f"Failed to update avatar: {str(e)}")
 
 
-@router.post("/{avatar_id}/customize", response_model=AvatarCustomizationResponse)
+@router.post(
+    "/{avatar_id}/customize",
+    response_class=Response,
+    responses={200: {"model": AvatarCustomizationResponse}},
+    openapi_extra=json_body_openapi(AvatarCustomizationRequest),
+)
 async def customize_avatar(
     avatar_id: UUID,
-    customization_data: AvatarCustomizationRequest,
-    db: AsyncSession = Depends(get_db)
+    customization_data: AvatarCustomizationRequest = Depends(json_body(AvatarCustomizationRequest)),
+    avatar_service: AvatarService = Depends(get_avatar_service)
 ):
     """Apply user customization to avatar."""
     
     try:
-        avatar_service = AvatarService(db)
         customization = await avatar_service.customize_avatar(
-            str(avatar_id),
+            avatar_id,
             customization_data.customization_type,
             customization_data.field_name,
             customization_data.custom_value,
             customization_data.reason
         )
         
-        return AvatarCustomizationResponse(
-            id=str(customization.id),
-            avatar_id=str(customization.avatar_id),
-            customization_type=customization.customization_type,
-            field_name=customization.field_name,
-            original_value=customization.original_value,
-            custom_value=customization.custom_value,
-            reason=customization.reason,
-            confidence=customization.confidence,
-            impact_score=customization.impact_score,
-            is_active=customization.is_active,
-            created_at=customization.created_at.isoformat()
-        )
+        return Response(content=orjson.dumps(_serialize_customization(customization)), media_type="application/json")
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -297,13 +289,23 @@ async def customize_avatar(
         raise HTTPException(status_code=500, detail="Failed to customize avatar")
 
 
-@router.get("/{avatar_id}/customizations", response_model=List[AvatarCustomizationResponse])
+@router.get(
+    "/{avatar_id}/customizations",
+    response_class=Response,
+    responses={200: {"model": List[AvatarCustomizationResponse]}},
+)
 async def get_avatar_customizations(
     avatar_id: UUID,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """Get all customizations for an avatar."""
     
+    cache_key = avatar_customizations_cache_key(avatar_id)
+    cached = get_cached_json(cache_key)
+    if cached is not None:
+        return cacheable_json_response(request, cached)
+    
     result = await db.execute(
         select(AvatarCustomization)
         .where(AvatarCustomization.avatar_id == avatar_id)
@@ -311,44 +313,34 @@ async def get_avatar_customizations(
     )
     customizations = result.scalars().all()
     
-    return [
-        AvatarCustomizationResponse(
-            id=str(customization.id),
-            avatar_id=str(customization.avatar_id),
-            customization_type=customization.customization_type,
-            field_name=customization.field_name,
-            original_value=customization.original_value,
-            custom_value=customization.custom_value,
-            reason=customization.reason,
-            confidence=customization.confidence,
-            impact_score=customization.impact_score,
-            is_active=customization.is_active,
-            created_at=customization.created_at.isoformat()
-        )
-        for customization in customizations
-    ]
+    payload = orjson.dumps([_serialize_customization(c) for c in customizations])
+    set_cached_json(cache_key, payload, AVATAR_CACHE_TTL_SECONDS)
+    return cacheable_json_response(request, payload)
 
 
-@router.get("/{avatar_id}/completeness", response_model=AvatarCompletenessAnalysis)
+@router.get(
+    "/{avatar_id}/completeness",
+    response_class=Response,
+    responses={200: {"model": AvatarCompletenessAnalysis}},
+)
 async def get_avatar_completeness_analysis(
     avatar_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    avatar_service: AvatarService = Depends(get_avatar_service)
 ):
     """Get detailed completeness analysis and improvement suggestions."""
     
+    cache_key = avatar_completeness_cache_key(avatar_id)
+    cached = get_cached_json(cache_key)
+    if cached is not None:
+        return cacheable_json_response(request, cached)
+    
     try:
-        avatar_service = AvatarService(db)
-        analysis = await avatar_service.get_avatar_completeness_analysis(str(avatar_id))
+        analysis = await avatar_service.get_avatar_completeness_analysis(avatar_id)
         
-        return AvatarCompletenessAnalysis(
-            overall_score=analysis["overall_score"],
-            authenticity_score=analysis["authenticity_score"],
-            consistency_score=analysis["consistency_score"],
-            areas=analysis["areas"],
-            improvement_areas=analysis["improvement_areas"],
-            suggested_actions=analysis["suggested_actions"],
-            training_status=analysis["training_status"]
-        )
+        payload = orjson.dumps(_serialize_completeness(analysis))
+        set_cached_json(cache_key, payload, AVATAR_CACHE_TTL_SECONDS)
+        return cacheable_json_response(request, payload)
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -356,85 +348,62 @@ async def get_avatar_completeness_analysis(
         raise HTTPException(status_code=500, detail="Failed to analyze avatar completeness")
 
 
-@router.get("/{avatar_id}/training-history", response_model=List[AvatarTrainingResponse])
+@router.get(
+    "/{avatar_id}/training-history",
+    response_class=Response,
+    responses={200: {"model": List[AvatarTrainingResponse]}},
+)
 async def get_avatar_training_history(
     avatar_id: UUID,
+    request: Request,
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of sessions to return"),
+    offset: int = Query(0, ge=0, description="Number of sessions to skip"),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get avatar training history."""
+    """Get avatar training history, newest first."""
     
     result = await db.execute(
         select(AvatarTrainingSession)
         .where(AvatarTrainingSession.avatar_id == avatar_id)
         .order_by(AvatarTrainingSession.started_at.desc())
+        .limit(limit)
+        .offset(offset)
     )
     training_sessions = result.scalars().all()
     
-    return [
-        AvatarTrainingResponse(
-            id=str(session.id),
-            avatar_id=str(session.avatar_id),
-            training_type=session.training_type,
-            trigger_reason=session.trigger_reason,
-            success=session.success,
-            error_message=session.error_message,
-            started_at=session.started_at.isoformat(),
-            completed_at=session.completed_at.isoformat() if session.completed_at else None,
-            duration_seconds=session.duration_seconds
-        )
-        for session in training_sessions
-    ]
+    payload = orjson.dumps([_serialize_training_session(t) for t in training_sessions])
+    return cacheable_json_response(request, payload)
 
 
-@router.post("/{avatar_id}/retrain", response_model=AvatarResponse)
+@router.post(
+    "/{avatar_id}/retrain",
+    response_class=Response,
+    responses={200: {"model": AvatarResponse}},
+)
 async def retrain_avatar(
     avatar_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    avatar_service: AvatarService = Depends(get_avatar_service)
 ):
     """Manually trigger avatar retraining."""
     
     # Get avatar
-    result = await db.execute(select(AIAvatar).where(AIAvatar.id == avatar_id))
+    result = await db.execute(
+        select(AIAvatar).options(raiseload("*")).where(AIAvatar.id == avatar_id)
+    )
     avatar = result.scalar_one_or_none()
     if not avatar:
         raise HTTPException(status_code=404, detail="Avatar not found")
     
     try:
-        avatar_service = AvatarService(db)
-        
-        # Start retraining
-        await avatar_service._start_avatar_training(
-            str(avatar_id), 
+        # Start retraining; the service returns the same, already updated avatar
+        updated_avatar = await avatar_service._start_avatar_training(
+            avatar.id, 
             "manual_retrain", 
             "User requested retraining"
         )
         
-        # Get updated avatar
-        result = await db.execute(select(AIAvatar).where(AIAvatar.id == avatar_id))
-        updated_avatar = result.scalar_one()
-        
-        return AvatarResponse(
-            id=str(updated_avatar.id),
-            user_id=str(updated_avatar.user_id),
-            name=updated_avatar.name,
-            description=updated_avatar.description,
-            avatar_version=updated_avatar.avatar_version,
-            personality_traits=updated_avatar.personality_traits,
-            communication_patterns=updated_avatar.communication_patterns,
-            response_style=updated_avatar.response_style,
-            conversation_skills=updated_avatar.conversation_skills,
-            emotional_range=updated_avatar.emotional_range,
-            completeness_score=updated_avatar.completeness_score,
-            authenticity_score=updated_avatar.authenticity_score,
-            consistency_score=updated_avatar.consistency_score,
-            status=updated_avatar.status,
-            improvement_areas=updated_avatar.improvement_areas,
-            suggested_actions=updated_avatar.suggested_actions,
-            training_iterations=updated_avatar.training_iterations,
-            last_training_date=updated_avatar.last_training_date.isoformat() if updated_avatar.last_training_date else None,
-            created_at=updated_avatar.created_at.isoformat() if updated_avatar.created_at else datetime.utcnow().isoformat(),
-            updated_at=updated_avatar.updated_at.isoformat() if updated_avatar.updated_at else datetime.utcnow().isoformat()
-        )
+        return Response(content=orjson.dumps(_serialize_avatar(updated_avatar)), media_type="application/json")
     
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to retrain avatar")
\ No newline at end of file
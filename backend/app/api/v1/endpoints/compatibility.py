@@ -1,16 +1,20 @@
 """
 Compatibility analysis and reporting API endpoints.
 """
-from typing import Optional
+from typing import AsyncIterator, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query
+from uuid import UUID
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 
 from app.core.database import get_db
+from app.core.http_cache import cacheable_json_response, not_modified_response, version_etag
 from app.core.security import get_current_user
 from app.models.user import User
-from app.services.compatibility_service import CompatibilityService
+from app.services.compatibility_service import CompatibilityService, compatibility_inputs_version
 
 router = APIRouter()
 
@@ -51,10 +55,21 @@ class CompatibilityTrendsResponse(BaseModel):
     trend_summary: Optional[str] = None
 
 
-@router.get("/report", response_model=CompatibilityReportResponse)
+async def _resume_stream(first_chunk: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Yield an already fetched first chunk, then the rest of the stream."""
+    yield first_chunk
+    async for chunk in rest:
+        yield chunk
+
+
+@router.get(
+    "/report",
+    response_class=StreamingResponse,
+    responses={200: {"model": CompatibilityReportResponse}},
+)
 async def get_compatibility_report(
-    user2_id: str = Query(..., description="ID of the other user"),
-    match_id: Optional[str] = Query(None, description="Optional match ID"),
+    user2_id: UUID = Query(..., description="ID of the other user"),
+    match_id: Optional[UUID] = Query(None, description="Optional match ID"),
     include_trends: bool = Query(True, description="Include trend analysis"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -64,14 +79,17 @@ async def get_compatibility_report(
     
     Analyzes compatibility between the current user and another user based on
     personality profiles and simulation history. Includes detailed insights,
-    recommendations, and trend analysis.
+    recommendations, and trend analysis. Sections are streamed as they are
+    computed. The first section is computed before the response starts, so
+    scoring failures still return an error status; a failure in a later
+    section can only truncate the already-started 200 body.
     """
     compatibility_service = CompatibilityService(db)
     
     try:
         # Check if both users have personality profiles
-        users = await compatibility_service._get_user_profiles(
-            str(current_user.id), user2_id
+        users, simulation_history = await compatibility_service._get_profiles_and_history(
+            current_user.id, user2_id, match_id
         )
         
         if not users:
@@ -95,14 +113,15 @@ async def get_compatibility_report(
                 detail="The other user's personality profile is incomplete. A compatibility report cannot be generated yet."
             )
         
-        report = await compatibility_service.generate_compatibility_report(
-            user1_id=str(current_user.id),
-            user2_id=user2_id,
-            match_id=match_id,
-            include_trends=include_trends
+        report = compatibility_service.stream_compatibility_report(
+            user1, user2, simulation_history, include_trends=include_trends
         )
+        first_section = await anext(report)
         
-        return CompatibilityReportResponse(**report)
+        return StreamingResponse(
+            _resume_stream(first_section, report),
+            media_type="application/json"
+        )
         
     except HTTPException:
         raise
@@ -112,10 +131,15 @@ async def get_compatibility_report(
         raise HTTPException(status_code=500, detail=f"Failed to generate compatibility report: {str(e)}")
 
 
-@router.get("/dashboard", response_model=CompatibilityDashboardResponse)
+@router.get(
+    "/dashboard",
+    response_class=Response,
+    responses={200: {"model": CompatibilityDashboardResponse}},
+)
 async def get_compatibility_dashboard(
-    user2_id: str = Query(..., description="ID of the other user"),
-    match_id: Optional[str] = Query(None, description="Optional match ID"),
+    request: Request,
+    user2_id: UUID = Query(..., description="ID of the other user"),
+    match_id: Optional[UUID] = Query(None, description="Optional match ID"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -129,20 +153,25 @@ async def get_compatibility_dashboard(
     
     try:
         dashboard_data = await compatibility_service.get_compatibility_dashboard_data(
-            user1_id=str(current_user.id),
+            user1_id=current_user.id,
             user2_id=user2_id,
             match_id=match_id
         )
         
-        return CompatibilityDashboardResponse(**dashboard_data)
+        return cacheable_json_response(request, orjson.dumps(dashboard_data))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get dashboard data: {str(e)}")
 
 
-@router.get("/trends", response_model=CompatibilityTrendsResponse)
+@router.get(
+    "/trends",
+    response_class=Response,
+    responses={200: {"model": CompatibilityTrendsResponse}},
+)
 async def get_compatibility_trends(
-    user2_id: str = Query(..., description="ID of the other user"),
+    request: Request,
+    user2_id: UUID = Query(..., description="ID of the other user"),
     time_period_days: int = Query(30, ge=7, le=365, description="Time period in days"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -157,12 +186,12 @@ async def get_compatibility_trends(
     
     try:
         trends = await compatibility_service.track_compatibility_trends(
-            user1_id=str(current_user.id),
+            user1_id=current_user.id,
             user2_id=user2_id,
             time_period_days=time_period_days
         )
         
-        return CompatibilityTrendsResponse(**trends)
+        return cacheable_json_response(request, orjson.dumps(trends))
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get compatibility trends: {str(e)}")
@@ -170,8 +199,9 @@ async def get_compatibility_trends(
 
 @router.get("/scores", response_model=dict)
 async def get_compatibility_scores(
-    user2_id: str = Query(..., description="ID of the other user"),
-    match_id: Optional[str] = Query(None, description="Optional match ID"),
+    request: Request,
+    user2_id: UUID = Query(..., description="ID of the other user"),
+    match_id: Optional[UUID] = Query(None, description="Optional match ID"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -184,30 +214,44 @@ async def get_compatibility_scores(
     compatibility_service = CompatibilityService(db)
     
     try:
+        # Pair-wide scores are precomputed whenever a simulation completes
+        if match_id is None:
+            stored = await compatibility_service.get_stored_compatibility_scores(
+                current_user.id, user2_id
+            )
+            if stored:
+                payload = orjson.dumps({
+                    "user1_id": current_user.id,
+                    "user2_id": user2_id,
+                    "match_id": match_id,
+                    "scores": stored.scores,
+                    "last_updated": stored.last_simulation_at.isoformat() if stored.last_simulation_at else None,
+                    "sessions_count": stored.sessions_count
+                })
+                return cacheable_json_response(request, payload)
+        
         # Get users and simulation history
-        users = await compatibility_service._get_user_profiles(
-            str(current_user.id), user2_id
+        users, simulation_history = await compatibility_service._get_profiles_and_history(
+            current_user.id, user2_id, match_id
         )
         if not users:
             raise HTTPException(status_code=404, detail="Users not found")
         
         user1, user2 = users
-        simulation_history = await compatibility_service._get_simulation_history(
-            str(current_user.id), user2_id, match_id
-        )
         
         scores = await compatibility_service._calculate_compatibility_scores(
             user1, user2, simulation_history
         )
         
-        return {
-            "user1_id": str(current_user.id),
+        payload = orjson.dumps({
+            "user1_id": current_user.id,
             "user2_id": user2_id,
             "match_id": match_id,
             "scores": scores,
             "last_updated": simulation_history[-1].updated_at.isoformat() if simulation_history else None,
             "sessions_count": len(simulation_history)
-        }
+        })
+        return cacheable_json_response(request, payload)
         
     except HTTPException:
         raise
@@ -217,8 +261,9 @@ async def get_compatibility_scores(
 
 @router.get("/insights", response_model=dict)
 async def get_compatibility_insights(
-    user2_id: str = Query(..., description="ID of the other user"),
-    match_id: Optional[str] = Query(None, description="Optional match ID"),
+    request: Request,
+    user2_id: UUID = Query(..., description="ID of the other user"),
+    match_id: Optional[UUID] = Query(None, description="Optional match ID"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -232,16 +277,22 @@ async def get_compatibility_insights(
     
     try:
         # Get users and simulation history
-        users = await compatibility_service._get_user_profiles(
-            str(current_user.id), user2_id
+        users, simulation_history = await compatibility_service._get_profiles_and_history(
+            current_user.id, user2_id, match_id
         )
         if not users:
             raise HTTPException(status_code=404, detail="Users not found")
         
         user1, user2 = users
-        simulation_history = await compatibility_service._get_simulation_history(
-            str(current_user.id), user2_id, match_id
+        
+        # The body carries generated_at, so revalidate against the inputs
+        # instead of hashing it, before computing anything
+        etag = version_etag(
+            "insights", match_id, *compatibility_inputs_version(user1, user2, simulation_history)
         )
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
         
         scores = await compatibility_service._calculate_compatibility_scores(
             user1, user2, simulation_history
@@ -251,13 +302,14 @@ async def get_compatibility_insights(
             user1, user2, simulation_history, scores
         )
         
-        return {
-            "user1_id": str(current_user.id),
+        payload = orjson.dumps({
+            "user1_id": current_user.id,
             "user2_id": user2_id,
             "match_id": match_id,
             "insights": insights,
             "generated_at": datetime.utcnow().isoformat()
-        }
+        })
+        return cacheable_json_response(request, payload, etag=etag)
         
     except HTTPException:
         raise
@@ -267,8 +319,9 @@ async def get_compatibility_insights(
 
 @router.get("/recommendations", response_model=dict)
 async def get_compatibility_recommendations(
-    user2_id: str = Query(..., description="ID of the other user"),
-    match_id: Optional[str] = Query(None, description="Optional match ID"),
+    request: Request,
+    user2_id: UUID = Query(..., description="ID of the other user"),
+    match_id: Optional[UUID] = Query(None, description="Optional match ID"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -282,16 +335,22 @@ async def get_compatibility_recommendations(
     
     try:
         # Get users and simulation history
-        users = await compatibility_service._get_user_profiles(
-            str(current_user.id), user2_id
+        users, simulation_history = await compatibility_service._get_profiles_and_history(
+            current_user.id, user2_id, match_id
         )
         if not users:
             raise HTTPException(status_code=404, detail="Users not found")
         
         user1, user2 = users
-        simulation_history = await compatibility_service._get_simulation_history(
-            str(current_user.id), user2_id, match_id
+        
+        # The body carries generated_at, so revalidate against the inputs
+        # instead of hashing it, before computing anything
+        etag = version_etag(
+            "recommendations", match_id, *compatibility_inputs_version(user1, user2, simulation_history)
         )
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
         
         scores = await compatibility_service._calculate_compatibility_scores(
             user1, user2, simulation_history
@@ -305,15 +364,70 @@ async def get_compatibility_recommendations(
             user1, user2, scores, insights, simulation_history
         )
         
-        return {
-            "user1_id": str(current_user.id),
+        payload = orjson.dumps({
+            "user1_id": current_user.id,
             "user2_id": user2_id,
             "match_id": match_id,
             "recommendations": recommendations,
             "generated_at": datetime.utcnow().isoformat()
-        }
+        })
+        return cacheable_json_response(request, payload, etag=etag)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get recommendations: {str(e)}")
+
+
+@router.get("/analysis", response_model=dict)
+async def get_compatibility_analysis(
+    request: Request,
+    user2_id: UUID = Query(..., description="ID of the other user"),
+    match_id: Optional[UUID] = Query(None, description="Optional match ID"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get compatibility scores, insights and recommendations together.
+    
+    Computes profiles, simulation history and scores once and returns
+    everything the `/scores`, `/insights` and `/recommendations` endpoints
+    provide individually.
+    """
+    compatibility_service = CompatibilityService(db)
+    
+    try:
+        users, simulation_history = await compatibility_service._get_profiles_and_history(
+            current_user.id, user2_id, match_id
+        )
+        if not users:
+            raise HTTPException(status_code=404, detail="Users not found")
+        
+        user1, user2 = users
+        
+        # The body carries generated_at, so revalidate against the inputs
+        # instead of hashing it, before computing anything
+        etag = version_etag(
+            "analysis", match_id, *compatibility_inputs_version(user1, user2, simulation_history)
+        )
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        
+        analysis = await compatibility_service.analyze_compatibility(
+            user1, user2, simulation_history
+        )
+        
+        payload = orjson.dumps({
+            "user1_id": current_user.id,
+            "user2_id": user2_id,
+            "match_id": match_id,
+            **analysis,
+            "generated_at": datetime.utcnow().isoformat()
+        })
+        return cacheable_json_response(request, payload, etag=etag)
         
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to get recommendations: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to get compatibility analysis: {str(e)}")
@@ -1,19 +1,27 @@
 """
 Match discovery and management endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter, constr
 from typing import Optional, List
+from uuid import UUID
 
 from app.core.database import get_db
+from app.core.http_cache import cacheable_json_response, not_modified_response, version_etag
 from app.services.match_service import MatchService
-from app.core.security import get_current_user
-from app.models.user import User
+from app.core.security import get_current_user_id
 
 router = APIRouter()
 
 
+DISCOVERY_RECOMMENDATIONS = (
+    "Try expanding your age range for more matches",
+    "Complete your personality assessment for better compatibility",
+    "Add more photos to your profile",
+)
+
+
 class PotentialMatch(BaseModel):
     """Potential match data."""
     user_id: str
@@ -40,12 +48,17 @@ class MatchFilters(BaseModel):
 class MatchDiscoveryResponse(BaseModel):
     """Match discovery response."""
     matches: List[PotentialMatch]
-    total_count: int
+    total_count: Optional[int] = None
     has_more: bool
+    next_cursor: Optional[str] = None
     filters_applied: Optional[MatchFilters] = None
     recommendations: List[str] = []
 
 
+# Built once so discover can serialize without FastAPI's response_model pass
+_MATCH_DISCOVERY_ADAPTER = TypeAdapter(MatchDiscoveryResponse)
+
+
 class LikeResponse(BaseModel):
     """Like action response."""
     message: str
@@ -74,18 +87,27 @@ class MatchHistoryResponse(BaseModel):
     matches: List[MatchHistoryItem]
 
 
-@router.get("/discover", response_model=MatchDiscoveryResponse)
+def get_match_service(db: AsyncSession = Depends(get_db)) -> MatchService:
+    """Provide a ``MatchService`` bound to the request's database session."""
+    return MatchService(db)
+
+
+@router.get(
+    "/discover",
+    response_class=Response,
+    responses={200: {"model": MatchDiscoveryResponse}},
+)
 async def discover_matches(
-    limit: int = 10,
-    offset: int = 0,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
     age_min: Optional[int] = None,
     age_max: Optional[int] = None,
     max_distance: Optional[int] = None,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    interests: Optional[List[constr(max_length=50)]] = Query(None, max_length=50),
+    current_user_id: UUID = Depends(get_current_user_id),
+    match_service: MatchService = Depends(get_match_service)
 ):
     """Discover potential matches."""
-    match_service = MatchService(db)
     
     # Build filters
     filters = {}
@@ -95,47 +117,56 @@ async def discover_matches(
         filters['age_max'] = age_max
     if max_distance:
         filters['max_distance'] = max_distance
+    if interests:
+        filters['interests'] = [interest.strip().lower() for interest in interests]
     
     # Get matches
-    matches, total_count = await match_service.discover_matches(
-        user_id=str(current_user.id),
-        limit=limit,
-        offset=offset,
-        filters=filters if filters else None
-    )
+    try:
+        matches, next_cursor = await match_service.discover_matches(
+            user_id=str(current_user_id),
+            limit=limit,
+            cursor=cursor,
+            filters=filters if filters else None
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    # Convert to response format
-    potential_matches = [PotentialMatch(**match) for match in matches]
+    # Service rows are already well-formed, so skip per-item validation
+    potential_matches = [PotentialMatch.model_construct(**match) for match in matches]
     
-    return MatchDiscoveryResponse(
+    discovery = MatchDiscoveryResponse(
         matches=potential_matches,
-        total_count=total_count,
-        has_more=offset + limit < total_count,
+        has_more=next_cursor is not None,
+        next_cursor=next_cursor,
         filters_applied=MatchFilters(
             age_min=age_min,
             age_max=age_max,
-            max_distance=max_distance
-        ) if any([age_min, age_max, max_distance]) else None,
-        recommendations=[
-            "Try expanding your age range for more matches",
-            "Complete your personality assessment for better compatibility",
-            "Add more photos to your profile"
-        ]
+            max_distance=max_distance,
+            interests=filters.get('interests')
+        ) if filters else None,
+        recommendations=DISCOVERY_RECOMMENDATIONS
+    )
+    
+    return Response(
+        content=_MATCH_DISCOVERY_ADAPTER.dump_json(discovery),
+        media_type="application/json"
     )
 
 
 @router.post("/like/{target_user_id}", response_model=LikeResponse)
 async def like_user(
     target_user_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    match_service: MatchService = Depends(get_match_service)
 ):
     """Like a potential match."""
-    match_service = MatchService(db)
     
     try:
         result = await match_service.like_user(
-            user_id=str(current_user.id),
+            user_id=str(current_user_id),
             target_user_id=target_user_id
         )
         return LikeResponse(**result)
@@ -149,15 +180,14 @@ async def like_user(
 @router.post("/pass/{target_user_id}", response_model=PassResponse)
 async def pass_user(
     target_user_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    match_service: MatchService = Depends(get_match_service)
 ):
     """Pass on a potential match."""
-    match_service = MatchService(db)
     
     try:
         result = await match_service.pass_user(
-            user_id=str(current_user.id),
+            user_id=str(current_user_id),
             target_user_id=target_user_id
         )
         return PassResponse(**result)
@@ -170,16 +200,30 @@ async def pass_user(
 
 @router.get("/history", response_model=MatchHistoryResponse)
 async def get_match_history(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    current_user_id: UUID = Depends(get_current_user_id),
+    match_service: MatchService = Depends(get_match_service)
 ):
     """Get user's match history."""
-    match_service = MatchService(db)
     
     try:
-        matches = await match_service.get_match_history(str(current_user.id))
-        history_items = [MatchHistoryItem(**match) for match in matches]
-        return MatchHistoryResponse(matches=history_items)
+        # Revalidate against the history's version before loading the page
+        version = await match_service.get_match_history_version(str(current_user_id))
+        etag = version_etag(current_user_id, limit, offset, *version)
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        
+        matches = await match_service.get_match_history(
+            str(current_user_id),
+            limit=limit,
+            offset=offset
+        )
+        history_items = [MatchHistoryItem.model_construct(**match) for match in matches]
+        history = MatchHistoryResponse(matches=history_items)
+        return cacheable_json_response(request, history.model_dump_json(), etag=etag)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -190,14 +234,13 @@ async def get_match_history(
 @router.get("/{match_id}")
 async def get_match(
     match_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    match_service: MatchService = Depends(get_match_service)
 ):
     """Get match details by ID."""
-    match_service = MatchService(db)
     
     try:
-        match = await match_service.get_match_by_id(match_id, str(current_user.id))
+        match = await match_service.get_match_by_id(match_id, str(current_user_id))
         if not match:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1,13 +1,18 @@
 """
 Direct messaging endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
+from uuid import UUID
+
+import orjson
 
 from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.exceptions import NotFoundError
+from app.core.http_cache import cacheable_json_response, not_modified_response, version_etag
+from app.core.security import get_current_user, get_current_user_id
 from app.services.messaging_service import MessagingService
 from app.models.user import User
 
@@ -48,365 +53,202 @@ class ConversationResponse(BaseModel):
     created_at: str
 
 
+class ConversationListResponse(BaseModel):
+    """Page of conversations."""
+    conversations: List[ConversationResponse]
+    next_cursor: Optional[str] = None
+    has_more: bool
+
+
+class ConversationPatch(BaseModel):
+    """Per-user conversation changes; omitted fields are left as they are."""
+    is_archived: Optional[bool] = None
+    is_muted: Optional[bool] = None
+    mark_read: bool = False
+
+
 class ProfileViewRequest(BaseModel):
     """Profile view request."""
-    viewed_user_id: str
-    source: str = "discover"
-    duration_seconds: Optional[int] = None
+    viewed_user_id: UUID
+    source: str = Field("discover", max_length=50)
+    duration_seconds: Optional[int] = Field(None, ge=0, le=86400)
+
+
+def get_messaging_service(db: AsyncSession = Depends(get_db)) -> MessagingService:
+    """Provide a ``MessagingService`` bound to the request's database session."""
+    return MessagingService(db)
 
 
 @router.post("/send", response_model=MessageResponse)
 async def send_message(
     request: SendMessageRequest,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    messaging_service: MessagingService = Depends(get_messaging_service)
 ):
     """Send a direct message to a matched user."""
-    messaging_service = MessagingService(db)
     
-    try:
-        message = await messaging_service.send_message(
-            sender_id=str(current_user.id),
-            recipient_id=request.recipient_id,
-            content=request.content,
-            message_type=request.message_type,
-            media_url=request.media_url,
-            media_type=request.media_type
-        )
-        
-        return MessageResponse(
-            id=str(message.id),
-            sender_id=str(message.sender_id),
-            sender_name=f"{current_user.first_name} {current_user.last_name}",
-            content=message.content,
-            message_type=message.message_type,
-            media_url=message.media_url,
-            is_read=message.is_read,
-            created_at=message.created_at.isoformat()
-        )
-        
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to send message: {str(e)}"
-        )
-
-
-@router.get("/conversations", response_model=List[ConversationResponse])
+    message = await messaging_service.send_message(
+        sender_id=str(current_user.id),
+        recipient_id=request.recipient_id,
+        content=request.content,
+        message_type=request.message_type,
+        media_url=request.media_url,
+        media_type=request.media_type
+    )
+    
+    return MessageResponse(
+        id=str(message.id),
+        sender_id=str(message.sender_id),
+        sender_name=f"{current_user.first_name} {current_user.last_name}",
+        content=message.content,
+        message_type=message.message_type,
+        media_url=message.media_url,
+        is_read=message.is_read,
+        created_at=message.created_at.isoformat()
+    )
+
+
+@router.get("/conversations", response_model=ConversationListResponse)
 async def get_conversations(
+    request: Request,
     include_archived: bool = False,
     limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = None,
+    current_user_id: UUID = Depends(get_current_user_id),
+    messaging_service: MessagingService = Depends(get_messaging_service)
 ):
     """Get user's conversations."""
-    messaging_service = MessagingService(db)
     
-    try:
-        conversations = await messaging_service.get_conversations(
-            user_id=str(current_user.id),
-            include_archived=include_archived,
-            limit=limit,
-            offset=offset
-        )
-        
-        return [ConversationResponse(**conv) for conv in conversations]
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get conversations: {str(e)}"
-        )
-
-
-@router.get("/conversation/{match_id}", response_model=List[MessageResponse])
+    # Revalidate against the list's version before running the page query
+    version = await messaging_service.get_conversations_version(str(current_user_id))
+    etag = version_etag(current_user_id, include_archived, limit, cursor, *version)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
+    conversations, next_cursor = await messaging_service.get_conversations(
+        user_id=str(current_user_id),
+        include_archived=include_archived,
+        limit=limit,
+        cursor=cursor
+    )
+    
+    # Service rows are already well-formed, so skip per-item validation
+    page = ConversationListResponse(
+        conversations=[ConversationResponse.model_construct(**conv) for conv in conversations],
+        next_cursor=next_cursor,
+        has_more=next_cursor is not None
+    )
+    return cacheable_json_response(request, page.model_dump_json(), etag=etag)
+
+
+@router.get(
+    "/conversation/{match_id}",
+    response_class=Response,
+    responses={200: {"model": List[MessageResponse]}},
+)
 async def get_messages(
     match_id: str,
     limit: int = Query(50, ge=1, le=100),
     before_message_id: Optional[str] = None,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    messaging_service: MessagingService = Depends(get_messaging_service)
 ):
     """Get messages for a conversation."""
-    messaging_service = MessagingService(db)
-    
-    try:
-        messages = await messaging_service.get_messages(
-            user_id=str(current_user.id),
-            match_id=match_id,
-            limit=limit,
-            before_message_id=before_message_id
-        )
-        
-        return [MessageResponse(**msg) for msg in messages]
-        
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail=str(e)
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get messages: {str(e)}"
-        )
-
-
-@router.post("/conversation/{match_id}/read")
-async def mark_conversation_read(
-    match_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Mark all messages in a conversation as read."""
-    messaging_service = MessagingService(db)
-    
-    try:
-        success = await messaging_service.mark_conversation_read(
-            user_id=str(current_user.id),
-            match_id=match_id
-        )
-        
-        if success:
-            return {"message": "Conversation marked as read"}
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Conversation not found"
-            )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to mark conversation as read: {str(e)}"
-        )
-
-
-@router.post("/conversation/{match_id}/archive")
-async def archive_conversation(
-    match_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Archive a conversation."""
-    messaging_service = MessagingService(db)
     
-    try:
-        success = await messaging_service.archive_conversation(
-            user_id=str(current_user.id),
-            match_id=match_id
-        )
-        
-        if success:
-            return {"message": "Conversation archived"}
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Conversation not found"
-            )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to archive conversation: {str(e)}"
-        )
-
-
-@router.post("/conversation/{match_id}/unarchive")
-async def unarchive_conversation(
-    match_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Unarchive a conversation."""
-    messaging_service = MessagingService(db)
+    messages = await messaging_service.get_messages(
+        user_id=str(current_user_id),
+        match_id=match_id,
+        limit=limit,
+        before_message_id=before_message_id
+    )
     
-    try:
-        success = await messaging_service.unarchive_conversation(
-            user_id=str(current_user.id),
-            match_id=match_id
-        )
-        
-        if success:
-            return {"message": "Conversation unarchived"}
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Conversation not found"
-            )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to unarchive conversation: {str(e)}"
-        )
-
-
-@router.post("/conversation/{match_id}/mute")
-async def mute_conversation(
+    return Response(content=orjson.dumps(messages), media_type="application/json")
+
+
+@router.patch("/conversation/{match_id}")
+async def update_conversation(
     match_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    patch: ConversationPatch,
+    current_user_id: UUID = Depends(get_current_user_id),
+    messaging_service: MessagingService = Depends(get_messaging_service)
 ):
-    """Mute notifications for a conversation."""
-    messaging_service = MessagingService(db)
+    """Archive, mute or mark a conversation as read, in any combination."""
     
-    try:
-        success = await messaging_service.mute_conversation(
-            user_id=str(current_user.id),
-            match_id=match_id
-        )
-        
-        if success:
-            return {"message": "Conversation muted"}
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Conversation not found"
-            )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to mute conversation: {str(e)}"
-        )
-
-
-@router.post("/conversation/{match_id}/unmute")
-async def unmute_conversation(
-    match_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
-):
-    """Unmute notifications for a conversation."""
-    messaging_service = MessagingService(db)
+    updated = await messaging_service.update_conversation(
+        user_id=str(current_user_id),
+        match_id=match_id,
+        is_archived=patch.is_archived,
+        is_muted=patch.is_muted,
+        mark_read=patch.mark_read
+    )
+    if not updated:
+        raise NotFoundError("Conversation not found")
     
-    try:
-        success = await messaging_service.unmute_conversation(
-            user_id=str(current_user.id),
-            match_id=match_id
-        )
-        
-        if success:
-            return {"message": "Conversation unmuted"}
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Conversation not found"
-            )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to unmute conversation: {str(e)}"
-        )
+    return {"message": "Conversation updated"}
 
 
 @router.delete("/message/{message_id}")
 async def delete_message(
     message_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    messaging_service: MessagingService = Depends(get_messaging_service)
 ):
     """Delete a message."""
-    messaging_service = MessagingService(db)
     
-    try:
-        success = await messaging_service.delete_message(
-            user_id=str(current_user.id),
-            message_id=message_id
-        )
-        
-        if success:
-            return {"message": "Message deleted"}
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Message not found or you don't have permission to delete it"
-            )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to delete message: {str(e)}"
-        )
-
-
-@router.post("/profile-view")
+    deleted = await messaging_service.delete_message(
+        user_id=str(current_user_id),
+        message_id=message_id
+    )
+    if not deleted:
+        raise NotFoundError("Message not found or you don't have permission to delete it")
+    
+    return {"message": "Message deleted"}
+
+
+@router.post("/profile-view", status_code=status.HTTP_202_ACCEPTED)
 async def record_profile_view(
     request: ProfileViewRequest,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    messaging_service: MessagingService = Depends(get_messaging_service)
 ):
     """Record a profile view."""
-    messaging_service = MessagingService(db)
     
-    try:
-        await messaging_service.record_profile_view(
-            viewer_id=str(current_user.id),
-            viewed_user_id=request.viewed_user_id,
-            source=request.source,
-            duration_seconds=request.duration_seconds
-        )
-        
-        return {"message": "Profile view recorded"}
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to record profile view: {str(e)}"
-        )
+    messaging_service.record_profile_view(
+        viewer_id=current_user_id,
+        viewed_user_id=request.viewed_user_id,
+        source=request.source,
+        duration_seconds=request.duration_seconds
+    )
+    
+    return {"message": "Profile view recorded"}
 
 
 @router.get("/profile-views")
 async def get_profile_views(
     limit: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    messaging_service: MessagingService = Depends(get_messaging_service)
 ):
     """Get recent profile views."""
-    messaging_service = MessagingService(db)
     
-    try:
-        views = await messaging_service.get_profile_views(
-            user_id=str(current_user.id),
-            limit=limit
-        )
-        
-        return {"views": views}
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get profile views: {str(e)}"
-        )
+    views = await messaging_service.get_profile_views(
+        user_id=str(current_user_id),
+        limit=limit
+    )
+    
+    return {"views": views}
 
 
 @router.get("/mutual-connections/{user_id}")
 async def get_mutual_connections(
     user_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    messaging_service: MessagingService = Depends(get_messaging_service)
 ):
     """Get mutual connections with another user."""
-    messaging_service = MessagingService(db)
     
-    try:
-        connections = await messaging_service.get_mutual_connections(
-            user1_id=str(current_user.id),
-            user2_id=user_id
-        )
-        
-        return connections
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get mutual connections: {str(e)}"
-        )
+    return await messaging_service.get_mutual_connections(
+        user1_id=str(current_user_id),
+        user2_id=user_id
+    )
@@ -1,29 +1,40 @@
 """
 Notification and social interaction endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
+from datetime import datetime
+from uuid import UUID
 
-from app.core.database import get_db
-from app.core.security import get_current_user
-from app.services.notification_service import NotificationService
-from app.models.user import User
-from app.models.notification import NotificationType, NotificationPreference, PushSubscription
+import orjson
+
+from app.core.database import get_notifications_db
+from app.core.security import get_current_user_id
+from app.services.notification_service import NotificationService, send_report_alert
+from app.models.redis_models import get_cached_json, set_cached_json
+from app.models.notification import Notification, NotificationType, NotificationPreference, PushSubscription
 
 router = APIRouter()
 
 
+PREFERENCES_CACHE_TTL_SECONDS = 3600
+
+# Resolved once so payload shaping is a dict lookup per row
+_NOTIFICATION_TYPE_VALUES = {member: member.value for member in NotificationType}
+
+
 class NotificationResponse(BaseModel):
     """Notification response model."""
-    id: str
+    id: UUID
     type: str
     title: str
     message: str
     is_read: bool
-    created_at: str
-    read_at: Optional[str] = None
+    created_at: datetime
+    read_at: Optional[datetime] = None
     action_url: Optional[str] = None
     data: Dict[str, Any] = {}
     related_user: Optional[Dict[str, Any]] = None
@@ -51,12 +62,17 @@ class ReportUserRequest(BaseModel):
 
 class BlockedUser(BaseModel):
     """Blocked user response."""
-    id: str
+    id: UUID
     name: str
     reason: Optional[str] = None
     blocked_at: str
 
 
+class MarkNotificationsReadRequest(BaseModel):
+    """Batch mark-as-read request."""
+    ids: List[UUID] = Field(..., min_length=1, max_length=200)
+
+
 class NotificationPreferencesRequest(BaseModel):
     """Notification preferences update request."""
     in_app_enabled: Optional[bool] = None
@@ -97,457 +113,433 @@ class PushSubscriptionRequest(BaseModel):
     device_name: Optional[str] = None
 
 
-@router.get("/", response_model=NotificationListResponse)
+def get_notification_service(db: AsyncSession = Depends(get_notifications_db)) -> NotificationService:
+    """Provide a ``NotificationService`` bound to the request's database session."""
+    return NotificationService(db)
+
+
+def _notification_payload(notification: Notification) -> Dict[str, Any]:
+    """Shape a notification row like NotificationResponse."""
+    related_user = None
+    if notification.related_user:
+        related_user = {
+            "id": notification.related_user.id,
+            "name": f"{notification.related_user.first_name} {notification.related_user.last_name}",
+            "photo_url": None  # TODO: Get primary photo
+        }
+    
+    return {
+        "id": notification.id,
+        "type": _NOTIFICATION_TYPE_VALUES[notification.type],
+        "title": notification.title,
+        "message": notification.message,
+        "is_read": notification.is_read,
+        "created_at": notification.created_at,
+        "read_at": notification.read_at,
+        "action_url": notification.action_url,
+        "data": notification.data,
+        "related_user": related_user
+    }
+
+
+async def _iter_notification_list(
+    first_row: Optional[Tuple[Notification, int]],
+    rows: AsyncIterator[Tuple[Notification, int]],
+    notification_service: NotificationService,
+    user_id: UUID
+) -> AsyncIterator[bytes]:
+    """
+    Yield a NotificationListResponse body as rows arrive from the cursor.
+    
+    ``first_row`` is fetched by the caller before the response starts; an
+    error after that can only truncate the body, not change the status.
+    """
+    yield b'{"notifications":['
+    
+    total_count = 0
+    unread_count = None
+    if first_row is not None:
+        notification, unread_count = first_row
+        yield orjson.dumps(_notification_payload(notification), option=orjson.OPT_UTC_Z)
+        total_count = 1
+        
+        async for notification, unread_count in rows:
+            yield b","
+            yield orjson.dumps(_notification_payload(notification), option=orjson.OPT_UTC_Z)
+            total_count += 1
+    
+    if unread_count is None:
+        # Empty and keyset pages carry no window count
+        unread_count = await notification_service.get_unread_count(user_id)
+    
+    yield (
+        b'],"unread_count":' + orjson.dumps(unread_count)
+        + b',"total_count":' + orjson.dumps(total_count) + b"}"
+    )
+
+
+@router.get(
+    "/",
+    response_class=StreamingResponse,
+    responses={200: {"model": NotificationListResponse}},
+)
 async def get_notifications(
-    limit: int = 20,
-    offset: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    before_id: Optional[UUID] = None,
     unread_only: bool = False,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    notification_service: NotificationService = Depends(get_notification_service)
 ):
     """Get user notifications."""
-    notification_service = NotificationService(db)
+    rows = notification_service.stream_user_notifications(
+        user_id=current_user_id,
+        limit=limit,
+        offset=offset,
+        unread_only=unread_only,
+        before_id=before_id
+    )
     
-    try:
-        # Get notifications
-        notifications = await notification_service.get_user_notifications(
-            user_id=str(current_user.id),
-            limit=limit,
-            offset=offset,
-            unread_only=unread_only
-        )
-        
-        # Get unread count
-        unread_count = await notification_service.get_unread_count(str(current_user.id))
-        
-        # Convert to response format
-        notification_responses = []
-        for notification in notifications:
-            related_user = None
-            if notification.related_user:
-                related_user = {
-                    "id": str(notification.related_user.id),
-                    "name": f"{notification.related_user.first_name} {notification.related_user.last_name}",
-                    "photo_url": None  # TODO: Get primary photo
-                }
-            
-            notification_responses.append(NotificationResponse(
-                id=str(notification.id),
-                type=notification.type.value,
-                title=notification.title,
-                message=notification.message,
-                is_read=notification.is_read,
-                created_at=notification.created_at.isoformat(),
-                read_at=notification.read_at.isoformat() if notification.read_at else None,
-                action_url=notification.action_url,
-                data=notification.data,
-                related_user=related_user
-            ))
-        
-        return NotificationListResponse(
-            notifications=notification_responses,
-            unread_count=unread_count,
-            total_count=len(notifications)
-        )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get notifications: {str(e)}"
-        )
+    # Run the query before committing to a 200, so database errors still
+    # surface as error responses
+    first_row = await anext(rows, None)
+    
+    return StreamingResponse(
+        _iter_notification_list(first_row, rows, notification_service, current_user_id),
+        media_type="application/json"
+    )
+
+
+@router.post("/read")
+async def mark_notifications_read(
+    request: MarkNotificationsReadRequest,
+    current_user_id: UUID = Depends(get_current_user_id),
+    notification_service: NotificationService = Depends(get_notification_service)
+):
+    """Mark several notifications as read."""
+    marked_ids = await notification_service.mark_notifications_read(
+        notification_ids=request.ids,
+        user_id=current_user_id
+    )
+    return {
+        "message": f"Marked {len(marked_ids)} notifications as read",
+        "ids": marked_ids
+    }
 
 
 @router.post("/{notification_id}/read")
 async def mark_notification_read(
-    notification_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    notification_id: UUID,
+    current_user_id: UUID = Depends(get_current_user_id),
+    notification_service: NotificationService = Depends(get_notification_service)
 ):
     """Mark a notification as read."""
-    notification_service = NotificationService(db)
+    success = await notification_service.mark_notification_read(
+        notification_id=notification_id,
+        user_id=current_user_id
+    )
     
-    try:
-        success = await notification_service.mark_notification_read(
-            notification_id=notification_id,
-            user_id=str(current_user.id)
-        )
-        
-        if not success:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Notification not found"
-            )
-        
-        return {"message": "Notification marked as read"}
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    if not success:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to mark notification as read: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification not found"
         )
+    
+    return {"message": "Notification marked as read"}
 
 
 @router.post("/read-all")
 async def mark_all_notifications_read(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    notification_service: NotificationService = Depends(get_notification_service)
 ):
     """Mark all notifications as read."""
-    notification_service = NotificationService(db)
-    
-    try:
-        count = await notification_service.mark_all_notifications_read(str(current_user.id))
-        return {"message": f"Marked {count} notifications as read"}
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to mark notifications as read: {str(e)}"
-        )
+    count = await notification_service.mark_all_notifications_read(current_user_id)
+    return {"message": f"Marked {count} notifications as read"}
 
 
 @router.get("/unread-count")
 async def get_unread_count(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    notification_service: NotificationService = Depends(get_notification_service)
 ):
     """Get count of unread notifications."""
-    notification_service = NotificationService(db)
-    
-    try:
-        count = await notification_service.get_unread_count(str(current_user.id))
-        return {"unread_count": count}
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get unread count: {str(e)}"
-        )
+    count = await notification_service.get_unread_count(current_user_id)
+    return {"unread_count": count}
 
 
 @router.post("/block/{user_id}")
 async def block_user(
-    user_id: str,
+    user_id: UUID,
     request: BlockUserRequest,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    notification_service: NotificationService = Depends(get_notification_service)
 ):
     """Block a user."""
-    notification_service = NotificationService(db)
+    success = await notification_service.block_user(
+        blocker_id=current_user_id,
+        blocked_id=user_id,
+        reason=request.reason,
+        notes=request.notes
+    )
     
-    try:
-        success = await notification_service.block_user(
-            blocker_id=str(current_user.id),
-            blocked_id=user_id,
-            reason=request.reason,
-            notes=request.notes
-        )
-        
-        if not success:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User is already blocked"
-            )
-        
-        return {"message": "User blocked successfully"}
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    if not success:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to block user: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User is already blocked"
         )
+    
+    return {"message": "User blocked successfully"}
 
 
 @router.delete("/block/{user_id}")
 async def unblock_user(
-    user_id: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    user_id: UUID,
+    current_user_id: UUID = Depends(get_current_user_id),
+    notification_service: NotificationService = Depends(get_notification_service)
 ):
     """Unblock a user."""
-    notification_service = NotificationService(db)
+    success = await notification_service.unblock_user(
+        blocker_id=current_user_id,
+        blocked_id=user_id
+    )
     
-    try:
-        success = await notification_service.unblock_user(
-            blocker_id=str(current_user.id),
-            blocked_id=user_id
-        )
-        
-        if not success:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User is not blocked"
-            )
-        
-        return {"message": "User unblocked successfully"}
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    if not success:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to unblock user: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User is not blocked"
         )
+    
+    return {"message": "User unblocked successfully"}
 
 
-@router.get("/blocked", response_model=List[BlockedUser])
+@router.get(
+    "/blocked",
+    response_class=Response,
+    responses={200: {"model": List[BlockedUser]}}
+)
 async def get_blocked_users(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    notification_service: NotificationService = Depends(get_notification_service)
 ):
     """Get list of blocked users."""
-    notification_service = NotificationService(db)
-    
-    try:
-        blocked_users = await notification_service.get_blocked_users(str(current_user.id))
-        return [BlockedUser(**user) for user in blocked_users]
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get blocked users: {str(e)}"
-        )
+    # The service already shapes rows like BlockedUser; skip re-validating them
+    blocked_users = await notification_service.get_blocked_users(current_user_id)
+    return Response(content=orjson.dumps(blocked_users), media_type="application/json")
 
 
-@router.post("/report/{user_id}")
+@router.post("/report/{user_id}", status_code=status.HTTP_202_ACCEPTED)
 async def report_user(
-    user_id: str,
+    user_id: UUID,
     request: ReportUserRequest,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    current_user_id: UUID = Depends(get_current_user_id),
+    notification_service: NotificationService = Depends(get_notification_service)
 ):
     """Report a user for inappropriate behavior."""
-    notification_service = NotificationService(db)
+    report = await notification_service.report_user(
+        reporter_id=current_user_id,
+        reported_id=user_id,
+        category=request.category,
+        description=request.description,
+        evidence=request.evidence
+    )
     
-    try:
-        report = await notification_service.report_user(
-            reporter_id=str(current_user.id),
-            reported_id=user_id,
-            category=request.category,
-            description=request.description,
-            evidence=request.evidence
-        )
-        
-        return {
-            "message": "User reported successfully",
-            "report_id": str(report.id)
-        }
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to report user: {str(e)}"
-        )
-
+    # The report is stored; alerting moderators can finish after the response
+    background_tasks.add_task(
+        send_report_alert, report.id, current_user_id, user_id, request.category
+    )
+    
+    return {
+        "message": "User reported successfully",
+        "report_id": report.id
+    }
+
+
+
+def _preferences_cache_key(user_id: Any) -> str:
+    """Redis key of a user's serialized notification preferences."""
+    return f"notif:prefs:{user_id}"
+
+
+def _cache_preferences(
+    user_id: Any,
+    preferences: NotificationPreference
+) -> NotificationPreferencesResponse:
+    """Build the preferences response and write it through to Redis."""
+    response = NotificationPreferencesResponse(
+        in_app_enabled=preferences.in_app_enabled,
+        email_enabled=preferences.email_enabled,
+        push_enabled=preferences.push_enabled,
+        match_notifications=preferences.match_notifications,
+        message_notifications=preferences.message_notifications,
+        like_notifications=preferences.like_notifications,
+        profile_view_notifications=preferences.profile_view_notifications,
+        system_notifications=preferences.system_notifications,
+        quiet_hours_start=preferences.quiet_hours_start,
+        quiet_hours_end=preferences.quiet_hours_end,
+        timezone=preferences.timezone,
+        email_digest_frequency=preferences.email_digest_frequency
+    )
+    set_cached_json(
+        _preferences_cache_key(user_id),
+        orjson.dumps(response.model_dump()),
+        PREFERENCES_CACHE_TTL_SECONDS
+    )
+    return response
 
 
 @router.get("/preferences", response_model=NotificationPreferencesResponse)
 async def get_notification_preferences(
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_notifications_db)
 ):
     """Get user's notification preferences."""
-    try:
-        from sqlalchemy import select
-        
-        # Get or create preferences
-        query = select(NotificationPreference).where(
-            NotificationPreference.user_id == current_user.id
+    # Read at every app start, changed rarely: serve from Redis when cached
+    cached = get_cached_json(_preferences_cache_key(current_user_id))
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
+    from sqlalchemy import select, lambda_stmt
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    
+    # Get or create preferences
+    query = lambda_stmt(lambda: select(NotificationPreference).where(
+        NotificationPreference.user_id == current_user_id
+    ))
+    result = await db.execute(query)
+    preferences = result.scalar_one_or_none()
+    
+    if not preferences:
+        # Create default preferences and get the row back in one
+        # statement; a concurrent first read may insert it first
+        result = await db.execute(
+            pg_insert(NotificationPreference)
+            .values(user_id=current_user_id)
+            .on_conflict_do_nothing(index_elements=[NotificationPreference.user_id])
+            .returning(NotificationPreference)
         )
-        result = await db.execute(query)
         preferences = result.scalar_one_or_none()
+        await db.commit()
         
         if not preferences:
-            # Create default preferences
-            preferences = NotificationPreference(user_id=current_user.id)
-            db.add(preferences)
-            await db.commit()
-            await db.refresh(preferences)
-        
-        return NotificationPreferencesResponse(
-            in_app_enabled=preferences.in_app_enabled,
-            email_enabled=preferences.email_enabled,
-            push_enabled=preferences.push_enabled,
-            match_notifications=preferences.match_notifications,
-            message_notifications=preferences.message_notifications,
-            like_notifications=preferences.like_notifications,
-            profile_view_notifications=preferences.profile_view_notifications,
-            system_notifications=preferences.system_notifications,
-            quiet_hours_start=preferences.quiet_hours_start,
-            quiet_hours_end=preferences.quiet_hours_end,
-            timezone=preferences.timezone,
-            email_digest_frequency=preferences.email_digest_frequency
-        )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get notification preferences: {str(e)}"
-        )
+            result = await db.execute(query)
+            preferences = result.scalar_one()
+    
+    return _cache_preferences(current_user_id, preferences)
 
 
 @router.put("/preferences", response_model=NotificationPreferencesResponse)
 async def update_notification_preferences(
     request: NotificationPreferencesRequest,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_notifications_db)
 ):
     """Update user's notification preferences."""
-    try:
-        from sqlalchemy import select
-        
-        # Get or create preferences
-        query = select(NotificationPreference).where(
-            NotificationPreference.user_id == current_user.id
-        )
-        result = await db.execute(query)
-        preferences = result.scalar_one_or_none()
-        
-        if not preferences:
-            preferences = NotificationPreference(user_id=current_user.id)
-            db.add(preferences)
-        
-        # Update preferences
-        if request.in_app_enabled is not None:
-            preferences.in_app_enabled = request.in_app_enabled
-        if request.email_enabled is not None:
-            preferences.email_enabled = request.email_enabled
-        if request.push_enabled is not None:
-            preferences.push_enabled = request.push_enabled
-        if request.match_notifications is not None:
-            preferences.match_notifications = request.match_notifications
-        if request.message_notifications is not None:
-            preferences.message_notifications = request.message_notifications
-        if request.like_notifications is not None:
-            preferences.like_notifications = request.like_notifications
-        if request.profile_view_notifications is not None:
-            preferences.profile_view_notifications = request.profile_view_notifications
-        if request.system_notifications is not None:
-            preferences.system_notifications = request.system_notifications
-        if request.quiet_hours_start is not None:
-            preferences.quiet_hours_start = request.quiet_hours_start
-        if request.quiet_hours_end is not None:
-            preferences.quiet_hours_end = request.quiet_hours_end
-        if request.timezone is not None:
-            preferences.timezone = request.timezone
-        if request.email_digest_frequency is not None:
-            preferences.email_digest_frequency = request.email_digest_frequency
-        
-        await db.commit()
-        await db.refresh(preferences)
-        
-        return NotificationPreferencesResponse(
-            in_app_enabled=preferences.in_app_enabled,
-            email_enabled=preferences.email_enabled,
-            push_enabled=preferences.push_enabled,
-            match_notifications=preferences.match_notifications,
-            message_notifications=preferences.message_notifications,
-            like_notifications=preferences.like_notifications,
-            profile_view_notifications=preferences.profile_view_notifications,
-            system_notifications=preferences.system_notifications,
-            quiet_hours_start=preferences.quiet_hours_start,
-            quiet_hours_end=preferences.quiet_hours_end,
-            timezone=preferences.timezone,
-            email_digest_frequency=preferences.email_digest_frequency
-        )
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to update notification preferences: {str(e)}"
-        )
+    from sqlalchemy import select, lambda_stmt
+    
+    # Get or create preferences
+    query = lambda_stmt(lambda: select(NotificationPreference).where(
+        NotificationPreference.user_id == current_user_id
+    ))
+    result = await db.execute(query)
+    preferences = result.scalar_one_or_none()
+    
+    if not preferences:
+        preferences = NotificationPreference(user_id=current_user_id)
+        db.add(preferences)
+    
+    # Update preferences
+    if request.in_app_enabled is not None:
+        preferences.in_app_enabled = request.in_app_enabled
+    if request.email_enabled is not None:
+        preferences.email_enabled = request.email_enabled
+    if request.push_enabled is not None:
+        preferences.push_enabled = request.push_enabled
+    if request.match_notifications is not None:
+        preferences.match_notifications = request.match_notifications
+    if request.message_notifications is not None:
+        preferences.message_notifications = request.message_notifications
+    if request.like_notifications is not None:
+        preferences.like_notifications = request.like_notifications
+    if request.profile_view_notifications is not None:
+        preferences.profile_view_notifications = request.profile_view_notifications
+    if request.system_notifications is not None:
+        preferences.system_notifications = request.system_notifications
+    if request.quiet_hours_start is not None:
+        preferences.quiet_hours_start = request.quiet_hours_start
+    if request.quiet_hours_end is not None:
+        preferences.quiet_hours_end = request.quiet_hours_end
+    if request.timezone is not None:
+        preferences.timezone = request.timezone
+    if request.email_digest_frequency is not None:
+        preferences.email_digest_frequency = request.email_digest_frequency
+    
+    await db.commit()
+    await db.refresh(preferences)
+    
+    return _cache_preferences(current_user_id, preferences)
 
 
 @router.post("/push/subscribe")
 async def subscribe_to_push_notifications(
     request: PushSubscriptionRequest,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_notifications_db)
 ):
     """Subscribe to push notifications."""
-    try:
-        from sqlalchemy import select
-        from datetime import datetime
-        
-        # Check if subscription already exists
-        query = select(PushSubscription).where(
-            PushSubscription.endpoint == request.endpoint
-        )
-        result = await db.execute(query)
-        subscription = result.scalar_one_or_none()
-        
-        if subscription:
-            # Update existing subscription
-            subscription.user_id = current_user.id
-            subscription.p256dh_key = request.keys.get('p256dh', '')
-            subscription.auth_key = request.keys.get('auth', '')
-            subscription.user_agent = request.user_agent
-            subscription.device_name = request.device_name
-            subscription.is_active = True
-            subscription.last_used = datetime.utcnow()
-        else:
-            # Create new subscription
-            subscription = PushSubscription(
-                user_id=current_user.id,
-                endpoint=request.endpoint,
-                p256dh_key=request.keys.get('p256dh', ''),
-                auth_key=request.keys.get('auth', ''),
-                user_agent=request.user_agent,
-                device_name=request.device_name,
-                is_active=True,
-                last_used=datetime.utcnow()
-            )
-            db.add(subscription)
-        
-        await db.commit()
-        
-        return {"message": "Successfully subscribed to push notifications"}
-        
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to subscribe to push notifications: {str(e)}"
-        )
+    from sqlalchemy import func
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    
+    subscription = {
+        "user_id": current_user_id,
+        "p256dh_key": request.keys.get('p256dh', ''),
+        "auth_key": request.keys.get('auth', ''),
+        "user_agent": request.user_agent,
+        "device_name": request.device_name,
+        "is_active": True,
+        "last_used": func.now(),
+    }
+    
+    # Create the subscription or take over an existing one for this
+    # endpoint in one atomic statement
+    stmt = pg_insert(PushSubscription).values(
+        endpoint=request.endpoint, **subscription
+    ).on_conflict_do_update(
+        index_elements=[PushSubscription.endpoint],
+        set_={**subscription, "updated_at": func.now()}
+    )
+    await db.execute(stmt)
+    await db.commit()
+    
+    return {"message": "Successfully subscribed to push notifications"}
 
 
 @router.post("/push/unsubscribe")
 async def unsubscribe_from_push_notifications(
     endpoint: str,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    current_user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_notifications_db)
 ):
     """Unsubscribe from push notifications."""
-    try:
-        from sqlalchemy import select, and_
-        
-        # Find and deactivate subscription
-        query = select(PushSubscription).where(
-            and_(
-                PushSubscription.user_id == current_user.id,
-                PushSubscription.endpoint == endpoint
-            )
+    from sqlalchemy import select, and_
+    
+    # Find and deactivate subscription
+    query = select(PushSubscription).where(
+        and_(
+            PushSubscription.user_id == current_user_id,
+            PushSubscription.endpoint == endpoint
         )
-        result = await db.execute(query)
-        subscription = result.scalar_one_or_none()
-        
-        if subscription:
-            subscription.is_active = False
-            await db.commit()
-            return {"message": "Successfully unsubscribed from push notifications"}
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Subscription not found"
-            )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
+    )
+    result = await db.execute(query)
+    subscription = result.scalar_one_or_none()
+    
+    if subscription:
+        subscription.is_active = False
+        await db.commit()
+        return {"message": "Successfully unsubscribed from push notifications"}
+    else:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to unsubscribe from push notifications: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Subscription not found"
         )
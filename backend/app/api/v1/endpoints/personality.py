@@ -1,16 +1,23 @@
 """
 Personality assessment endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
+from typing_extensions import NotRequired, TypedDict
 from uuid import UUID
 import uuid
 
+import orjson
+
+from app.api.v1.json_body import json_body, json_body_openapi
 from app.core.database import get_db
+from app.core.http_cache import cacheable_json_response, compute_etag
 from app.models.user import User, PersonalityProfile
+from app.services.compatibility_service import CompatibilityService, invalidate_user_profile_cache
 
 router = APIRouter()
 
@@ -27,11 +34,12 @@ class PersonalityQuestion(BaseModel):
     scale_labels: Optional[Dict[str, str]] = None
 
 
-class PersonalityAnswer(BaseModel):
+class PersonalityAnswer(TypedDict):
     """User's answer to a personality question."""
     question_id: str
-    answer: Any  # Can be int, str, or list depending on question type
-    confidence: Optional[float] = None
+    # Scale answers are numbers, multiple choice a string, ranking a list
+    answer: Union[int, float, str, List[str]]
+    confidence: NotRequired[Optional[float]]
 
 
 class PersonalityAssessmentRequest(BaseModel):
@@ -75,10 +83,10 @@ class AssessmentProgress(BaseModel):
     insights: List[PersonalityInsight] = Field(default_factory=list)
 
 
-# Predefined personality questions
+# Predefined personality questions; the literals are trusted, so they skip validation
 PERSONALITY_QUESTIONS = [
     # Openness questions
-    PersonalityQuestion(
+    PersonalityQuestion.model_construct(
         id="open_1",
         category="openness",
         question="I enjoy exploring new ideas and concepts",
@@ -87,7 +95,7 @@ PERSONALITY_QUESTIONS = [
         scale_max=7,
         scale_labels={"1": "Strongly Disagree", "4": "Neutral", "7": "Strongly Agree"}
     ),
-    PersonalityQuestion(
+    PersonalityQuestion.model_construct(
         id="open_2",
         category="openness",
         question="I prefer routine and familiar experiences",
@@ -96,7 +104,7 @@ PERSONALITY_QUESTIONS = [
         scale_max=7,
         scale_labels={"1": "Strongly Disagree", "4": "Neutral", "7": "Strongly Agree"}
     ),
-    PersonalityQuestion(
+    PersonalityQuestion.model_construct(
         id="open_3",
         category="openness",
         question="Which activities appeal to you most?",
@@ -105,7 +113,7 @@ PERSONALITY_QUESTIONS = [
     ),
     
     # Conscientiousness questions
-    PersonalityQuestion(
+    PersonalityQuestion.model_construct(
         id="cons_1",
         category="conscientiousness",
         question="I am always prepared and organized",
@@ -114,7 +122,7 @@ PERSONALITY_QUESTIONS = [
         scale_max=7,
         scale_labels={"1": "Strongly Disagree", "4": "Neutral", "7": "Strongly Agree"}
     ),
-    PersonalityQuestion(
+    PersonalityQuestion.model_construct(
         id="cons_2",
         category="conscientiousness",
         question="I often leave tasks until the last minute",
@@ -125,7 +133,7 @@ PERSONALITY_QUESTIONS = [
     ),
     
     # Extraversion questions
-    PersonalityQuestion(
+    PersonalityQuestion.model_construct(
         id="extra_1",
         category="extraversion",
         question="I feel energized by social interactions",
@@ -134,7 +142,7 @@ PERSONALITY_QUESTIONS = [
         scale_max=7,
         scale_labels={"1": "Strongly Disagree", "4": "Neutral", "7": "Strongly Agree"}
     ),
-    PersonalityQuestion(
+    PersonalityQuestion.model_construct(
         id="extra_2",
         category="extraversion",
         question="I prefer quiet, intimate gatherings over large parties",
@@ -145,7 +153,7 @@ PERSONALITY_QUESTIONS = [
     ),
     
     # Agreeableness questions
-    PersonalityQuestion(
+    PersonalityQuestion.model_construct(
         id="agree_1",
         category="agreeableness",
         question="I try to be cooperative and avoid conflicts",
@@ -154,7 +162,7 @@ PERSONALITY_QUESTIONS = [
         scale_max=7,
         scale_labels={"1": "Strongly Disagree", "4": "Neutral", "7": "Strongly Agree"}
     ),
-    PersonalityQuestion(
+    PersonalityQuestion.model_construct(
         id="agree_2",
         category="agreeableness",
         question="I tend to be skeptical of others' motives",
@@ -165,7 +173,7 @@ PERSONALITY_QUESTIONS = [
     ),
     
     # Neuroticism questions
-    PersonalityQuestion(
+    PersonalityQuestion.model_construct(
         id="neuro_1",
         category="neuroticism",
         question="I often feel anxious or worried",
@@ -174,7 +182,7 @@ PERSONALITY_QUESTIONS = [
         scale_max=7,
         scale_labels={"1": "Strongly Disagree", "4": "Neutral", "7": "Strongly Agree"}
     ),
-    PersonalityQuestion(
+    PersonalityQuestion.model_construct(
         id="neuro_2",
         category="neuroticism",
         question="I remain calm under pressure",
@@ -185,14 +193,14 @@ PERSONALITY_QUESTIONS = [
     ),
     
     # Values questions
-    PersonalityQuestion(
+    PersonalityQuestion.model_construct(
         id="values_1",
         category="values",
         question="Rank these values by importance to you",
         question_type="ranking",
         options=["Family", "Career Success", "Personal Growth", "Adventure", "Security", "Creativity"]
     ),
-    PersonalityQuestion(
+    PersonalityQuestion.model_construct(
         id="values_2",
         category="values",
         question="What matters most in a relationship?",
@@ -201,14 +209,14 @@ PERSONALITY_QUESTIONS = [
     ),
     
     # Communication style questions
-    PersonalityQuestion(
+    PersonalityQuestion.model_construct(
         id="comm_1",
         category="communication",
         question="How do you prefer to resolve disagreements?",
         question_type="multiple_choice",
         options=["Direct discussion", "Give it time to cool down", "Seek compromise", "Avoid confrontation", "Get help from others"]
     ),
-    PersonalityQuestion(
+    PersonalityQuestion.model_construct(
         id="comm_2",
         category="communication",
         question="Your communication style is more:",
@@ -218,11 +226,30 @@ PERSONALITY_QUESTIONS = [
 ]
 
 
-@router.get("/questions", response_model=List[PersonalityQuestion])
+QUESTIONS_PER_STEP = 5
+# The question set only changes with a deploy
+QUESTIONS_MAX_AGE_SECONDS = 3600
+
+# The question set is static, so its JSON and ETags are built once at import
+_QUESTION_PAYLOADS = [question.model_dump() for question in PERSONALITY_QUESTIONS]
+_QUESTIONS_JSON = orjson.dumps(_QUESTION_PAYLOADS)
+_QUESTIONS_ETAG = compute_etag(_QUESTIONS_JSON)
+_STEP_QUESTIONS_JSON = {
+    step: orjson.dumps(_QUESTION_PAYLOADS[start:start + QUESTIONS_PER_STEP])
+    for step, start in enumerate(range(0, len(_QUESTION_PAYLOADS), QUESTIONS_PER_STEP), start=1)
+}
+_STEP_QUESTIONS_ETAGS = {step: compute_etag(payload) for step, payload in _STEP_QUESTIONS_JSON.items()}
+
+
+@router.get(
+    "/questions",
+    response_class=Response,
+    responses={200: {"model": List[PersonalityQuestion]}},
+)
 async def get_personality_questions(
+    request: Request,
     step: Optional[int] = None,
-    previous_answers: Optional[str] = None,
-    db: AsyncSession = Depends(get_db)
+    previous_answers: Optional[str] = None
 ):
     """
     Get personality assessment questions.
@@ -230,32 +257,39 @@ async def get_personality_questions(
     """
     # For now, return all questions. In a real implementation,
     # this would adapt based on previous answers
-    if step is not None:
-        # Return questions for specific step (5 questions per step)
-        start_idx = (step - 1) * 5
-        end_idx = start_idx + 5
-        return PERSONALITY_QUESTIONS[start_idx:end_idx]
+    if step is None:
+        payload, etag = _QUESTIONS_JSON, _QUESTIONS_ETAG
+    elif step in _STEP_QUESTIONS_JSON:
+        payload, etag = _STEP_QUESTIONS_JSON[step], _STEP_QUESTIONS_ETAGS[step]
+    else:
+        # Steps past the end have no questions
+        start_idx = (step - 1) * QUESTIONS_PER_STEP
+        payload = orjson.dumps(_QUESTION_PAYLOADS[start_idx:start_idx + QUESTIONS_PER_STEP])
+        etag = None
     
-    return PERSONALITY_QUESTIONS
+    return cacheable_json_response(request, payload, QUESTIONS_MAX_AGE_SECONDS, etag=etag)
 
 
-@router.get("/progress/{user_id}", response_model=AssessmentProgress)
+@router.get(
+    "/progress/{user_id}",
+    response_class=Response,
+    responses={200: {"model": AssessmentProgress}},
+)
 async def get_assessment_progress(
     user_id: UUID,
     db: AsyncSession = Depends(get_db)
 ):
     """Get user's assessment progress and real-time insights."""
-    # Check if user exists
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    # Get existing personality profile if any
+    # Check the user exists and get their profile, if any, in one query
     result = await db.execute(
-        select(PersonalityProfile).where(PersonalityProfile.user_id == user_id)
+        select(User.id, PersonalityProfile)
+        .outerjoin(PersonalityProfile, PersonalityProfile.user_id == User.id)
+        .where(User.id == user_id)
     )
-    profile = result.scalar_one_or_none()
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    profile = row.PersonalityProfile
     
     # Calculate progress based on existing data
     total_questions = len(PERSONALITY_QUESTIONS)
@@ -270,130 +304,102 @@ async def get_assessment_progress(
         
         # Generate insights
         if profile.openness is not None:
-            insights.append(PersonalityInsight(
-                trait="Openness",
-                score=profile.openness,
-                description="Your openness to new experiences",
-                confidence=0.8
-            ))
+            insights.append({
+                "trait": "Openness",
+                "score": profile.openness,
+                "description": "Your openness to new experiences",
+                "confidence": 0.8
+            })
         if profile.extraversion is not None:
-            insights.append(PersonalityInsight(
-                trait="Extraversion",
-                score=profile.extraversion,
-                description="Your social energy and outgoingness",
-                confidence=0.8
-            ))
+            insights.append({
+                "trait": "Extraversion",
+                "score": profile.extraversion,
+                "description": "Your social energy and outgoingness",
+                "confidence": 0.8
+            })
     
     completion_percentage = (completed_questions / total_questions) * 100
     estimated_time = max(1, int((total_questions - completed_questions) * 0.5))  # 30 seconds per question
     
-    return AssessmentProgress(
-        current_step=min(completed_questions // 5 + 1, total_questions // 5),
-        total_steps=total_questions // 5,
-        completion_percentage=completion_percentage,
-        estimated_time_remaining=estimated_time,
-        insights=insights
-    )
+    progress = {
+        "current_step": min(completed_questions // 5 + 1, total_questions // 5),
+        "total_steps": total_questions // 5,
+        "completion_percentage": completion_percentage,
+        "estimated_time_remaining": estimated_time,
+        "insights": insights
+    }
+    return Response(content=orjson.dumps(progress), media_type="application/json")
 
 
-@router.post("/submit", response_model=PersonalityProfileResponse)
+@router.post(
+    "/submit",
+    response_class=Response,
+    responses={200: {"model": PersonalityProfileResponse}},
+    openapi_extra=json_body_openapi(PersonalityAssessmentRequest),
+)
 async def submit_personality_assessment(
     user_id: UUID,
-    assessment_data: PersonalityAssessmentRequest,
+    assessment_data: PersonalityAssessmentRequest = Depends(json_body(PersonalityAssessmentRequest)),
     db: AsyncSession = Depends(get_db)
 ):
     """Submit personality assessment answers and generate profile."""
     # Check if user exists
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if not user:
+    result = await db.execute(select(User.id).where(User.id == user_id))
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Process answers and calculate personality scores
     scores = _calculate_personality_scores(assessment_data.answers)
+    assessment = {
+        "openness": scores.get("openness"),
+        "conscientiousness": scores.get("conscientiousness"),
+        "extraversion": scores.get("extraversion"),
+        "agreeableness": scores.get("agreeableness"),
+        "neuroticism": scores.get("neuroticism"),
+        "values": scores.get("values", {}),
+        "communication_style": scores.get("communication_style"),
+        "conflict_resolution_style": scores.get("conflict_resolution_style"),
+        "assessment_version": assessment_data.assessment_version,
+        "completeness_score": _calculate_completeness_score(scores),
+    }
     
-    # Get or create personality profile
+    # Create or update the profile in one statement
     result = await db.execute(
-        select(PersonalityProfile).where(PersonalityProfile.user_id == user_id)
+        pg_insert(PersonalityProfile)
+        .values(id=uuid.uuid4(), user_id=user_id, **assessment)
+        .on_conflict_do_update(
+            index_elements=[PersonalityProfile.user_id],
+            set_={**assessment, "updated_at": func.now()}
+        )
+        .returning(PersonalityProfile)
     )
-    profile = result.scalar_one_or_none()
+    profile = result.scalar_one()
     
-    if profile:
-        # Update existing profile
-        profile.openness = scores.get("openness")
-        profile.conscientiousness = scores.get("conscientiousness")
-        profile.extraversion = scores.get("extraversion")
-        profile.agreeableness = scores.get("agreeableness")
-        profile.neuroticism = scores.get("neuroticism")
-        profile.values = scores.get("values", {})
-        profile.communication_style = scores.get("communication_style")
-        profile.conflict_resolution_style = scores.get("conflict_resolution_style")
-        profile.assessment_version = assessment_data.assessment_version
-        profile.completeness_score = _calculate_completeness_score(scores)
-    else:
-        # Create new profile
-        profile = PersonalityProfile(
-            id=uuid.uuid4(),
-            user_id=user_id,
-            openness=scores.get("openness"),
-            conscientiousness=scores.get("conscientiousness"),
-            extraversion=scores.get("extraversion"),
-            agreeableness=scores.get("agreeableness"),
-            neuroticism=scores.get("neuroticism"),
-            values=scores.get("values", {}),
-            communication_style=scores.get("communication_style"),
-            conflict_resolution_style=scores.get("conflict_resolution_style"),
-            assessment_version=assessment_data.assessment_version,
-            completeness_score=_calculate_completeness_score(scores)
-        )
-        db.add(profile)
+    # Stored compatibility scores include personality compatibility
+    await CompatibilityService(db).clear_stored_compatibility_scores(user_id)
     
     await db.commit()
-    await db.refresh(profile)
+    invalidate_user_profile_cache(user_id)
     
     # Trigger avatar creation/update
     try:
         from app.services.avatar_service import AvatarService
         avatar_service = AvatarService(db)
         
-        # Check if avatar exists
-        existing_avatar = await avatar_service.get_avatar_by_user_id(str(user_id))
-        
-        if existing_avatar:
-            # Update existing avatar
-            await avatar_service.update_avatar_from_personality(
-                str(existing_avatar.id),
-                str(profile.id)
-            )
-        else:
-            # Create new avatar
-            await avatar_service.create_avatar_from_personality(
-                str(user_id),
-                str(profile.id)
-            )
+        # Create the avatar, or update the existing one
+        await avatar_service.upsert_from_personality(user_id)
     except Exception as e:
         # Log error but don't fail the personality assessment
         print(f"Failed to update avatar for user {user_id}: {e}")
     
-    return PersonalityProfileResponse(
-        id=str(profile.id),
-        user_id=str(profile.user_id),
-        openness=profile.openness,
-        conscientiousness=profile.conscientiousness,
-        extraversion=profile.extraversion,
-        agreeableness=profile.agreeableness,
-        neuroticism=profile.neuroticism,
-        values=profile.values,
-        communication_style=profile.communication_style,
-        conflict_resolution_style=profile.conflict_resolution_style,
-        completeness_score=profile.completeness_score,
-        assessment_version=profile.assessment_version,
-        created_at=profile.created_at.isoformat(),
-        updated_at=profile.updated_at.isoformat()
-    )
+    return Response(content=orjson.dumps(_serialize_profile(profile)), media_type="application/json")
 
 
-@router.get("/profile/{user_id}", response_model=PersonalityProfileResponse)
+@router.get(
+    "/profile/{user_id}",
+    response_class=Response,
+    responses={200: {"model": PersonalityProfileResponse}},
+)
 async def get_personality_profile(
     user_id: UUID,
     db: AsyncSession = Depends(get_db)
@@ -407,22 +413,49 @@ async def get_personality_profile(
     if not profile:
         raise HTTPException(status_code=404, detail="Personality profile not found")
     
-    return PersonalityProfileResponse(
-        id=str(profile.id),
-        user_id=str(profile.user_id),
-        openness=profile.openness,
-        conscientiousness=profile.conscientiousness,
-        extraversion=profile.extraversion,
-        agreeableness=profile.agreeableness,
-        neuroticism=profile.neuroticism,
-        values=profile.values,
-        communication_style=profile.communication_style,
-        conflict_resolution_style=profile.conflict_resolution_style,
-        completeness_score=profile.completeness_score,
-        assessment_version=profile.assessment_version,
-        created_at=profile.created_at.isoformat(),
-        updated_at=profile.updated_at.isoformat()
-    )
+    return Response(content=orjson.dumps(_serialize_profile(profile)), media_type="application/json")
+
+
+# (trait, question ids, reverse-scored question ids) for each Big Five trait
+_BIG_FIVE_QUESTIONS = (
+    ("openness", ("open_1",), ("open_2",)),
+    ("conscientiousness", ("cons_1",), ("cons_2",)),
+    ("extraversion", ("extra_1",), ("extra_2",)),
+    ("agreeableness", ("agree_1",), ("agree_2",)),
+    ("neuroticism", ("neuro_1",), ("neuro_2",)),
+)
+
+_COMMUNICATION_STYLES = frozenset({
+    "Direct and straightforward", "Diplomatic and tactful",
+    "Emotional and expressive", "Logical and analytical"
+})
+_CONFLICT_RESOLUTION_STYLES = frozenset({
+    "Direct discussion", "Give it time to cool down",
+    "Seek compromise", "Avoid confrontation", "Get help from others"
+})
+
+
+def _serialize_profile(profile: PersonalityProfile) -> Dict[str, Any]:
+    """Build the ``PersonalityProfileResponse`` payload from an ORM profile.
+    
+    UUID and datetime values are left as-is for orjson to encode natively.
+    """
+    return {
+        "id": profile.id,
+        "user_id": profile.user_id,
+        "openness": profile.openness,
+        "conscientiousness": profile.conscientiousness,
+        "extraversion": profile.extraversion,
+        "agreeableness": profile.agreeableness,
+        "neuroticism": profile.neuroticism,
+        "values": profile.values or {},
+        "communication_style": profile.communication_style,
+        "conflict_resolution_style": profile.conflict_resolution_style,
+        "completeness_score": profile.completeness_score or 0.0,
+        "assessment_version": profile.assessment_version,
+        "created_at": profile.created_at,
+        "updated_at": profile.updated_at
+    }
 
 
 def _calculate_personality_scores(answers: List[PersonalityAnswer]) -> Dict[str, Any]:
@@ -439,92 +472,61 @@ def _calculate_personality_scores(answers: List[PersonalityAnswer]) -> Dict[str,
     }
     
     # Create answer lookup
-    answer_map = {answer.question_id: answer.answer for answer in answers}
-    
-    # Calculate Big Five scores (simplified algorithm)
-    # Openness
-    open_scores = []
-    if "open_1" in answer_map:
-        open_scores.append(answer_map["open_1"] / 7.0)
-    if "open_2" in answer_map:
-        open_scores.append(1.0 - (answer_map["open_2"] / 7.0))  # Reverse scored
-    if open_scores:
-        scores["openness"] = sum(open_scores) / len(open_scores)
-    
-    # Conscientiousness
-    cons_scores = []
-    if "cons_1" in answer_map:
-        cons_scores.append(answer_map["cons_1"] / 7.0)
-    if "cons_2" in answer_map:
-        cons_scores.append(1.0 - (answer_map["cons_2"] / 7.0))  # Reverse scored
-    if cons_scores:
-        scores["conscientiousness"] = sum(cons_scores) / len(cons_scores)
-    
-    # Extraversion
-    extra_scores = []
-    if "extra_1" in answer_map:
-        extra_scores.append(answer_map["extra_1"] / 7.0)
-    if "extra_2" in answer_map:
-        extra_scores.append(1.0 - (answer_map["extra_2"] / 7.0))  # Reverse scored
-    if extra_scores:
-        scores["extraversion"] = sum(extra_scores) / len(extra_scores)
-    
-    # Agreeableness
-    agree_scores = []
-    if "agree_1" in answer_map:
-        agree_scores.append(answer_map["agree_1"] / 7.0)
-    if "agree_2" in answer_map:
-        agree_scores.append(1.0 - (answer_map["agree_2"] / 7.0))  # Reverse scored
-    if agree_scores:
-        scores["agreeableness"] = sum(agree_scores) / len(agree_scores)
-    
-    # Neuroticism
-    neuro_scores = []
-    if "neuro_1" in answer_map:
-        neuro_scores.append(answer_map["neuro_1"] / 7.0)
-    if "neuro_2" in answer_map:
-        neuro_scores.append(1.0 - (answer_map["neuro_2"] / 7.0))  # Reverse scored
-    if neuro_scores:
-        scores["neuroticism"] = sum(neuro_scores) / len(neuro_scores)
+    answer_map = {answer["question_id"]: answer["answer"] for answer in answers}
+    
+    # Calculate Big Five scores (simplified algorithm): the mean answer on
+    # the 7-point scale, with reverse-scored questions flipped
+    for trait, question_ids, reverse_question_ids in _BIG_FIVE_QUESTIONS:
+        total = 0.0
+        answered = 0
+        for question_id in question_ids:
+            answer = answer_map.get(question_id)
+            if answer is not None:
+                total += answer
+                answered += 1
+        for question_id in reverse_question_ids:
+            answer = answer_map.get(question_id)
+            if answer is not None:
+                total += 7 - answer
+                answered += 1
+        if answered:
+            scores[trait] = total / (7.0 * answered)
     
     # Process values
-    if "values_1" in answer_map and isinstance(answer_map["values_1"], list):
+    values_ranking = answer_map.get("values_1")
+    if isinstance(values_ranking, list) and values_ranking:
         # Convert ranking to importance scores
-        values_ranking = answer_map["values_1"]
-        for i, value in enumerate(values_ranking):
-            scores["values"][value] = 1.0 - (i / len(values_ranking))
+        count = len(values_ranking)
+        scores["values"] = {value: 1.0 - i / count for i, value in enumerate(values_ranking)}
     
     # Communication style
-    if "comm_2" in answer_map:
-        comm_styles = ["Direct and straightforward", "Diplomatic and tactful", 
-                      "Emotional and expressive", "Logical and analytical"]
-        if answer_map["comm_2"] in comm_styles:
-            scores["communication_style"] = answer_map["comm_2"]
+    communication_style = answer_map.get("comm_2")
+    if isinstance(communication_style, str) and communication_style in _COMMUNICATION_STYLES:
+        scores["communication_style"] = communication_style
     
     # Conflict resolution style
-    if "comm_1" in answer_map:
-        conflict_styles = ["Direct discussion", "Give it time to cool down", 
-                          "Seek compromise", "Avoid confrontation", "Get help from others"]
-        if answer_map["comm_1"] in conflict_styles:
-            scores["conflict_resolution_style"] = answer_map["comm_1"]
+    conflict_style = answer_map.get("comm_1")
+    if isinstance(conflict_style, str) and conflict_style in _CONFLICT_RESOLUTION_STYLES:
+        scores["conflict_resolution_style"] = conflict_style
     
     return scores
 
 
 def _calculate_completeness_score(scores: Dict[str, Any]) -> float:
     """Calculate profile completeness score."""
-    required_fields = ["openness", "conscientiousness", "extraversion", 
-                      "agreeableness", "neuroticism"]
-    completed_fields = sum(1 for field in required_fields if scores.get(field) is not None)
-    
-    base_score = completed_fields / len(required_fields)
-    
-    # Bonus for additional data
-    if scores.get("values"):
-        base_score += 0.1
-    if scores.get("communication_style"):
-        base_score += 0.05
-    if scores.get("conflict_resolution_style"):
-        base_score += 0.05
-    
-    return min(1.0, base_score)
\ No newline at end of file
+    # Booleans add as 0/1: a fifth per Big Five trait, plus bonuses for
+    # additional data
+    completed_traits = (
+        (scores.get("openness") is not None)
+        + (scores.get("conscientiousness") is not None)
+        + (scores.get("extraversion") is not None)
+        + (scores.get("agreeableness") is not None)
+        + (scores.get("neuroticism") is not None)
+    )
+    return min(
+        1.0,
+        completed_traits / 5
+        + bool(scores.get("values")) * 0.1
+        + bool(scores.get("communication_style")) * 0.05
+        + bool(scores.get("conflict_resolution_style")) * 0.05
+    )
@@ -2,15 +2,20 @@
 Scenario and simulation API endpoints.
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 from uuid import UUID
+import orjson
 
 from app.core.database import get_db
+from app.core.http_cache import cacheable_json_response, compute_etag
 from app.core.security import get_current_user
 from app.models.user import User
-from app.services.scenario_service import ScenarioService
+from app.models.redis_models import get_cached_json, set_cached_json
+from app.services.scenario_service import (
+    ScenarioService, SCENARIO_LIBRARY_CACHE_TTL_SECONDS, scenario_library_cache_key
+)
 
 router = APIRouter()
 
@@ -93,8 +98,44 @@ class SimulationMessageResponse(BaseModel):
     timestamp: str
 
 
-@router.get("/library", response_model=List[ScenarioResponse])
+# Static catalog metadata; its JSON and ETags are built once at import
+_SCENARIO_CATEGORIES = [
+    {"value": "financial", "label": "Financial Decisions", "description": "Money management and financial planning scenarios"},
+    {"value": "family", "label": "Family Matters", "description": "Family relationships and parenting scenarios"},
+    {"value": "lifestyle", "label": "Lifestyle Choices", "description": "Daily life and lifestyle preference scenarios"},
+    {"value": "career", "label": "Career & Work", "description": "Professional life and career decision scenarios"},
+    {"value": "social", "label": "Social Situations", "description": "Social interactions and friendship scenarios"},
+    {"value": "conflict_resolution", "label": "Conflict Resolution", "description": "Disagreement and conflict handling scenarios"},
+    {"value": "values", "label": "Values & Beliefs", "description": "Core values and belief system scenarios"},
+    {"value": "communication", "label": "Communication", "description": "Communication style and expression scenarios"},
+    {"value": "future_planning", "label": "Future Planning", "description": "Long-term goals and planning scenarios"},
+    {"value": "daily_life", "label": "Daily Life", "description": "Everyday situations and routine scenarios"}
+]
+
+_DIFFICULTY_LEVELS = [
+    {"value": 1, "label": "Easy", "description": "Simple scenarios for getting started"},
+    {"value": 2, "label": "Moderate", "description": "Standard scenarios with some complexity"},
+    {"value": 3, "label": "Challenging", "description": "Complex scenarios requiring deeper discussion"},
+    {"value": 4, "label": "Difficult", "description": "Advanced scenarios with multiple considerations"},
+    {"value": 5, "label": "Expert", "description": "Highly complex scenarios for experienced users"}
+]
+
+# The catalog metadata only changes with a deploy
+CATALOG_MAX_AGE_SECONDS = 3600
+
+_SCENARIO_CATEGORIES_JSON = orjson.dumps(_SCENARIO_CATEGORIES)
+_SCENARIO_CATEGORIES_ETAG = compute_etag(_SCENARIO_CATEGORIES_JSON)
+_DIFFICULTY_LEVELS_JSON = orjson.dumps(_DIFFICULTY_LEVELS)
+_DIFFICULTY_LEVELS_ETAG = compute_etag(_DIFFICULTY_LEVELS_JSON)
+
+
+@router.get(
+    "/library",
+    response_class=Response,
+    responses={200: {"model": List[ScenarioResponse]}},
+)
 async def get_scenario_library(
+    request: Request,
     category: Optional[str] = Query(None, description="Filter by category"),
     difficulty: Optional[int] = Query(None, ge=1, le=5, description="Filter by difficulty level"),
     cultural_context: Optional[str] = Query(None, description="Cultural adaptation context"),
@@ -108,6 +149,11 @@ async def get_scenario_library(
     Returns a list of scenario templates that can be used for simulations,
     optionally filtered by category, difficulty, and cultural context.
     """
+    cache_key = scenario_library_cache_key(category, difficulty, cultural_context, language)
+    cached = get_cached_json(cache_key)
+    if cached is not None:
+        return cacheable_json_response(request, cached)
+    
     scenario_service = ScenarioService(db)
     
     try:
@@ -118,7 +164,9 @@ async def get_scenario_library(
             language=language
         )
         
-        return [ScenarioResponse(**scenario) for scenario in scenarios]
+        payload = orjson.dumps(scenarios)
+        set_cached_json(cache_key, payload, SCENARIO_LIBRARY_CACHE_TTL_SECONDS)
+        return cacheable_json_response(request, payload)
         
     except Exception as e:
         import traceback
@@ -269,20 +317,17 @@ async def add_simulation_message(
     
     try:
         # Verify user has access to this session
-        session_data = await scenario_service.get_simulation_session(session_id)
-        if not session_data:
+        can_access = await scenario_service.user_can_access_session(session_id, current_user.id)
+        if can_access is None:
             raise HTTPException(status_code=404, detail="Simulation session not found")
         
-        user_id = str(current_user.id)
-        participant_ids = [p["user_id"] for p in session_data["participants"]]
-        
-        if user_id not in participant_ids:
+        if not can_access:
             raise HTTPException(status_code=403, detail="Access denied to this simulation session")
         
         # Add message
         message_data = await scenario_service.add_simulation_message(
             session_id=session_id,
-            sender_id=user_id,
+            sender_id=str(current_user.id),
             sender_type=request.sender_type,
             sender_name=f"{current_user.first_name} {current_user.last_name[0]}.",
             content=request.content,
@@ -313,14 +358,11 @@ async def complete_simulation(
     
     try:
         # Verify user has access to this session
-        session_data = await scenario_service.get_simulation_session(session_id)
-        if not session_data:
+        can_access = await scenario_service.user_can_access_session(session_id, current_user.id)
+        if can_access is None:
             raise HTTPException(status_code=404, detail="Simulation session not found")
         
-        user_id = str(current_user.id)
-        participant_ids = [p["user_id"] for p in session_data["participants"]]
-        
-        if user_id not in participant_ids:
+        if not can_access:
             raise HTTPException(status_code=403, detail="Access denied to this simulation session")
         
         # Complete simulation
@@ -333,9 +375,13 @@ async def complete_simulation(
         raise HTTPException(status_code=500, detail=f"Failed to complete simulation: {str(e)}")
 
 
-@router.get("/categories", response_model=List[dict])
+@router.get(
+    "/categories",
+    response_class=Response,
+    responses={200: {"model": List[dict]}},
+)
 async def get_scenario_categories(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -343,25 +389,18 @@ async def get_scenario_categories(
     
     Returns a list of all available scenario categories with descriptions.
     """
-    categories = [
-        {"value": "financial", "label": "Financial Decisions", "description": "Money management and financial planning scenarios"},
-        {"value": "family", "label": "Family Matters", "description": "Family relationships and parenting scenarios"},
-        {"value": "lifestyle", "label": "Lifestyle Choices", "description": "Daily life and lifestyle preference scenarios"},
-        {"value": "career", "label": "Career & Work", "description": "Professional life and career decision scenarios"},
-        {"value": "social", "label": "Social Situations", "description": "Social interactions and friendship scenarios"},
-        {"value": "conflict_resolution", "label": "Conflict Resolution", "description": "Disagreement and conflict handling scenarios"},
-        {"value": "values", "label": "Values & Beliefs", "description": "Core values and belief system scenarios"},
-        {"value": "communication", "label": "Communication", "description": "Communication style and expression scenarios"},
-        {"value": "future_planning", "label": "Future Planning", "description": "Long-term goals and planning scenarios"},
-        {"value": "daily_life", "label": "Daily Life", "description": "Everyday situations and routine scenarios"}
-    ]
-    
-    return categories
+    return cacheable_json_response(
+        request, _SCENARIO_CATEGORIES_JSON, CATALOG_MAX_AGE_SECONDS, etag=_SCENARIO_CATEGORIES_ETAG
+    )
 
 
-@router.get("/difficulty-levels", response_model=List[dict])
+@router.get(
+    "/difficulty-levels",
+    response_class=Response,
+    responses={200: {"model": List[dict]}},
+)
 async def get_difficulty_levels(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -369,12 +408,6 @@ async def get_difficulty_levels(
     
     Returns a list of difficulty levels with descriptions.
     """
-    levels = [
-        {"value": 1, "label": "Easy", "description": "Simple scenarios for getting started"},
-        {"value": 2, "label": "Moderate", "description": "Standard scenarios with some complexity"},
-        {"value": 3, "label": "Challenging", "description": "Complex scenarios requiring deeper discussion"},
-        {"value": 4, "label": "Difficult", "description": "Advanced scenarios with multiple considerations"},
-        {"value": 5, "label": "Expert", "description": "Highly complex scenarios for experienced users"}
-    ]
-    
-    return levels
\ No newline at end of file
+    return cacheable_json_response(
+        request, _DIFFICULTY_LEVELS_JSON, CATALOG_MAX_AGE_SECONDS, etag=_DIFFICULTY_LEVELS_ETAG
+    )
\ No newline at end of file
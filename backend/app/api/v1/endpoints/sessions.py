@@ -3,13 +3,15 @@ AI matching session endpoints.
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from pydantic import BaseModel
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import load_only, raiseload
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 import uuid
 
 from app.core.database import get_db
+from app.core.pagination import encode_cursor, decode_seek_cursor
 from app.models.conversation import ConversationSession, SessionStatus
 from app.models.match import Match
 from app.api.v1.endpoints.auth import get_current_user
@@ -35,13 +37,21 @@ class SessionResponse(BaseModel):
 
 
 class ConversationMessage(BaseModel):
-    """Conversation message."""
-    message_id: str
+    """Conversation message, validated straight from the ORM row."""
+    model_config = ConfigDict(from_attributes=True)
+    
+    message_id: uuid.UUID = Field(validation_alias="id")
     sender_type: str
     sender_name: str
     content: str
     timestamp: datetime
     emotion_indicators: List[str] = []
+    
+    @field_validator("emotion_indicators", mode="before")
+    @classmethod
+    def _default_emotion_indicators(cls, value):
+        """Older rows store NULL rather than an empty list."""
+        return value or []
 
 
 @router.post("/create", response_model=SessionResponse)
@@ -52,11 +62,12 @@ async def create_session(
 ):
     """Create a new AI matching session."""
     try:
-        # Verify match exists and user has access
+        # Verify match exists and user has access; only the participant
+        # ids are needed, so the match row is not loaded as an entity
         result = await db.execute(
-            select(Match).where(Match.id == session_data.match_id)
+            select(Match.id, Match.user1_id, Match.user2_id).where(Match.id == session_data.match_id)
         )
-        match = result.scalar_one_or_none()
+        match = result.one_or_none()
 
         if not match:
             raise HTTPException(status_code=404, detail="Match not found")
@@ -148,9 +159,9 @@ async def get_match_sessions(
     try:
         # Verify match exists and user has access
         result = await db.execute(
-            select(Match).where(Match.id == match_id)
+            select(Match.user1_id, Match.user2_id).where(Match.id == match_id)
         )
-        match = result.scalar_one_or_none()
+        match = result.one_or_none()
         
         if not match:
             raise HTTPException(status_code=404, detail="Match not found")
@@ -162,6 +173,20 @@ async def get_match_sessions(
         # Get all sessions for this match
         sessions_result = await db.execute(
             select(DBConversationSession)
+            .options(
+                load_only(
+                    DBConversationSession.id,
+                    DBConversationSession.status,
+                    DBConversationSession.session_type,
+                    DBConversationSession.started_at,
+                    DBConversationSession.ended_at,
+                    DBConversationSession.message_count,
+                    DBConversationSession.created_at
+                ),
+                # The listing reads columns only; fail loudly rather than
+                # lazy-load a relationship once per session
+                raiseload("*")
+            )
             .where(
                 and_(
                     or_(
@@ -208,19 +233,35 @@ async def get_session_messages(
     session_id: str,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get session conversation messages."""
+    """
+    Get session conversation messages, oldest first.
+    
+    Pass the next_cursor of the previous page to seek past it on the
+    (session_id, timestamp) index; offset paging remains as a fallback.
+    """
     from app.models.conversation import ConversationMessage as DBConversationMessage
-    from sqlalchemy import desc
+    
+    after = decode_seek_cursor(cursor) if cursor else None
     
     try:
-        # Verify session exists and user has access
+        # Verify session exists and user has access; only the participants
+        # and the summary columns are read, so the session is not loaded as
+        # an entity
         session_result = await db.execute(
-            select(ConversationSession).where(ConversationSession.id == session_id)
+            select(
+                ConversationSession.id,
+                ConversationSession.user1_id,
+                ConversationSession.user2_id,
+                ConversationSession.status,
+                ConversationSession.started_at,
+                ConversationSession.ended_at
+            ).where(ConversationSession.id == session_id)
         )
-        session = session_result.scalar_one_or_none()
+        session = session_result.one_or_none()
         
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -229,39 +270,64 @@ async def get_session_messages(
         if str(session.user1_id) != str(current_user.id) and str(session.user2_id) != str(current_user.id):
             raise HTTPException(status_code=403, detail="Access denied to this session")
         
-        # Get total count
-        count_result = await db.execute(
-            select(DBConversationMessage).where(DBConversationMessage.session_id == session_id)
-        )
-        total_count = len(count_result.scalars().all())
+        if after is not None:
+            # Keyset page: seek past the last row of the previous page and
+            # fetch one extra row to learn whether another page follows
+            messages_result = await db.execute(
+                select(DBConversationMessage)
+                .where(
+                    DBConversationMessage.session_id == session_id,
+                    tuple_(DBConversationMessage.timestamp, DBConversationMessage.id) > after
+                )
+                .order_by(DBConversationMessage.timestamp, DBConversationMessage.id)
+                .limit(limit + 1)
+            )
+            messages = messages_result.scalars().all()
+            has_more = len(messages) > limit
+            messages = messages[:limit]
+            
+            count_result = await db.execute(
+                select(func.count()).where(DBConversationMessage.session_id == session_id)
+            )
+            total_count = count_result.scalar_one()
+        else:
+            # Get messages with pagination; the window count carries the total
+            # on every row so the page and the count share one round trip
+            messages_result = await db.execute(
+                select(DBConversationMessage, func.count().over().label("total_count"))
+                .where(DBConversationMessage.session_id == session_id)
+                .order_by(DBConversationMessage.timestamp, DBConversationMessage.id)
+                .offset(offset)
+                .limit(limit)
+            )
+            rows = messages_result.all()
+            messages = [row[0] for row in rows]
+            
+            if rows:
+                total_count = rows[0].total_count
+            elif offset:
+                # A page past the end has no row to carry the total
+                count_result = await db.execute(
+                    select(func.count()).where(DBConversationMessage.session_id == session_id)
+                )
+                total_count = count_result.scalar_one()
+            else:
+                total_count = 0
+            has_more = offset + limit < total_count
         
-        # Get messages with pagination
-        messages_result = await db.execute(
-            select(DBConversationMessage)
-            .where(DBConversationMessage.session_id == session_id)
-            .order_by(DBConversationMessage.timestamp)
-            .offset(offset)
-            .limit(limit)
-        )
-        messages = messages_result.scalars().all()
+        next_cursor = None
+        if has_more and messages:
+            last = messages[-1]
+            next_cursor = encode_cursor(last.timestamp.isoformat(), str(last.id))
         
         # Convert to response format
-        message_list = [
-            ConversationMessage(
-                message_id=str(msg.id),
-                sender_type=msg.sender_type,
-                sender_name=msg.sender_name,
-                content=msg.content,
-                timestamp=msg.timestamp,
-                emotion_indicators=msg.emotion_indicators or []
-            )
-            for msg in messages
-        ]
+        message_list = [ConversationMessage.model_validate(msg) for msg in messages]
         
         return {
             "messages": message_list,
             "total_count": total_count,
-            "has_more": offset + limit < total_count,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
             "session": {
                 "session_id": str(session.id),
                 "status": session.status,
@@ -3,7 +3,7 @@ User management endpoints.
 """
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, constr
 from typing import Optional, List
 from datetime import datetime
 import uuid
@@ -12,6 +12,7 @@ import os
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.user import User, UserPhoto
+from app.services.compatibility_service import invalidate_user_profile_cache
 
 router = APIRouter()
 
@@ -27,6 +28,7 @@ class UserProfile(BaseModel):
     location: Optional[str] = None
     date_of_birth: Optional[str] = None
     gender: Optional[str] = None
+    interests: List[str] = []
     photos: List[dict] = []
     profile_completeness: float = 0.0
     is_verified: bool = False
@@ -39,7 +41,10 @@ class ProfileUpdate(BaseModel):
     last_name: Optional[str] = None
     bio: Optional[str] = None
     location: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     gender: Optional[str] = None
+    interests: Optional[List[constr(max_length=50)]] = Field(None, max_length=50)
 
 
 class PrivacySettings(BaseModel):
@@ -141,6 +146,7 @@ async def get_user_profile(
             location=user.location,
             date_of_birth=user.date_of_birth.isoformat() if user.date_of_birth else None,
             gender=user.gender,
+            interests=user.interests or [],
             photos=photos,
             profile_completeness=min(completeness, 1.0),
             is_verified=user.is_verified,
@@ -192,13 +198,23 @@ async def update_user_profile(
         user.bio = profile_data.bio
     if profile_data.location is not None:
         user.location = profile_data.location
+    if profile_data.latitude is not None:
+        user.latitude = profile_data.latitude
+    if profile_data.longitude is not None:
+        user.longitude = profile_data.longitude
     if profile_data.gender is not None:
         user.gender = profile_data.gender
+    if profile_data.interests is not None:
+        # Normalised so array overlap in discovery matches across users
+        user.interests = list(dict.fromkeys(
+            interest.strip().lower() for interest in profile_data.interests if interest.strip()
+        ))
     
     user.updated_at = datetime.utcnow()
     
     await db.commit()
     await db.refresh(user)
+    invalidate_user_profile_cache(user.id)
     
     # Return updated profile
     return await get_user_profile(current_user=user, db=db)
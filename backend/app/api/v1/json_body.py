@@ -0,0 +1,37 @@
+"""
+Single-pass JSON request body parsing for API endpoints.
+"""
+from typing import Any, Awaitable, Callable, Dict, Type, TypeVar
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def json_body(model: Type[ModelT]) -> Callable[[Request], Awaitable[ModelT]]:
+    """Build a dependency that validates the raw request body in a single pass.
+    
+    Pydantic parses and validates the JSON bytes directly, skipping FastAPI's
+    intermediate ``json.loads`` into a dict.
+    """
+    async def parse_body(request: Request) -> ModelT:
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError([
+                {**error, "loc": ("body", *error["loc"])}
+                for error in e.errors(include_url=False)
+            ])
+    
+    return parse_body
+
+
+def json_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAPI request body for endpoints using ``json_body``."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}},
+        }
+    }
@@ -6,6 +6,8 @@ from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy import MetaData
 from typing import AsyncGenerator
 
+import orjson
+
 from app.core.config import settings
 
 
@@ -14,6 +16,8 @@ engine = create_async_engine(
     settings.DATABASE_URL,
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+    pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
     echo=settings.DEBUG,
 )
 
@@ -24,6 +28,25 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Notification endpoints are short and frequent; a pool of their own keeps
+# them from queueing behind slow queries on the main pool
+notifications_engine = create_async_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.NOTIFICATIONS_DB_POOL_SIZE,
+    max_overflow=settings.NOTIFICATIONS_DB_MAX_OVERFLOW,
+    pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+    pool_recycle=settings.NOTIFICATIONS_DB_POOL_RECYCLE_SECONDS,
+    json_serializer=lambda value: orjson.dumps(value).decode(),
+    json_deserializer=orjson.loads,
+    echo=settings.DEBUG,
+)
+
+NotificationsSessionLocal = async_sessionmaker(
+    notifications_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
 
 class Base(DeclarativeBase):
     """Base class for all database models."""
@@ -47,6 +70,12 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_notifications_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get a session from the notifications pool."""
+    async with NotificationsSessionLocal() as session:
+        yield session
+
+
 async def init_db() -> None:
     """Initialize database tables."""
     async with engine.begin() as conn:
@@ -0,0 +1,56 @@
+"""
+Typed service errors and the global handlers that map errors to HTTP responses.
+"""
+import logging
+
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+
+# Unexpected errors get one fixed body so internals never reach the client
+_INTERNAL_ERROR_BODY = b'{"detail":"Internal server error"}'
+
+
+class ServiceError(Exception):
+    """Base class for errors raised by services for the client to see."""
+
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+
+class NotFoundError(ServiceError):
+    """The requested resource does not exist."""
+
+    status_code = status.HTTP_404_NOT_FOUND
+
+
+class PermissionDeniedError(ServiceError, ValueError):
+    """The user may not act on the requested resource."""
+
+    status_code = status.HTTP_403_FORBIDDEN
+
+
+class InvalidRequestError(ServiceError, ValueError):
+    """The request is well-formed but cannot be carried out."""
+
+    status_code = status.HTTP_400_BAD_REQUEST
+
+
+async def service_error_handler(request: Request, exc: ServiceError) -> JSONResponse:
+    """Render a ServiceError with the same body shape as HTTPException."""
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+
+
+async def unhandled_error_handler(request: Request, exc: Exception) -> Response:
+    """Log an unexpected error and answer with a generic 500."""
+    logger.exception(f"Unhandled error on {request.method} {request.url.path}", exc_info=exc)
+    return Response(
+        content=_INTERNAL_ERROR_BODY,
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        media_type="application/json"
+    )
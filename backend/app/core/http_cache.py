@@ -0,0 +1,87 @@
+"""
+HTTP caching helpers for idempotent JSON reads.
+"""
+from hashlib import blake2b
+from typing import Any, Dict, Optional, Union
+
+from fastapi import Request, Response
+
+
+# Short enough that clients pick up writes quickly, long enough to absorb
+# the repeat requests of a single page render
+DEFAULT_MAX_AGE_SECONDS = 30
+
+
+def compute_etag(payload: bytes) -> str:
+    """Strong ETag for a serialized response body."""
+    return f'"{blake2b(payload, digest_size=16).hexdigest()}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def version_etag(*parts: Any) -> str:
+    """
+    Strong ETag derived from data version markers rather than the body.
+
+    Lets an endpoint answer a revalidation before running the query that
+    would build the response.
+    """
+    return compute_etag(":".join(str(part) for part in parts).encode())
+
+
+def _cache_headers(etag: str, max_age: int) -> Dict[str, str]:
+    """Validator and freshness headers shared by 200 and 304 responses."""
+    return {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={max_age}",
+    }
+
+
+def not_modified_response(
+    request: Request,
+    etag: str,
+    max_age: int = DEFAULT_MAX_AGE_SECONDS
+) -> Optional[Response]:
+    """Return a 304 response if the client already holds this ETag."""
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=_cache_headers(etag, max_age))
+    return None
+
+
+def cacheable_json_response(
+    request: Request,
+    payload: Union[bytes, str],
+    max_age: int = DEFAULT_MAX_AGE_SECONDS,
+    etag: Optional[str] = None
+) -> Response:
+    """
+    Return a JSON body with ETag and Cache-Control headers.
+
+    Answers 304 Not Modified without a body when the client already holds
+    the current representation. The ETag is hashed from the body unless
+    one is given.
+    """
+    if isinstance(payload, str):
+        payload = payload.encode()
+
+    if etag is None:
+        etag = compute_etag(payload)
+
+    not_modified = not_modified_response(request, etag, max_age)
+    if not_modified is not None:
+        return not_modified
+
+    return Response(
+        content=payload,
+        media_type="application/json",
+        headers=_cache_headers(etag, max_age)
+    )
@@ -0,0 +1,54 @@
+"""
+Opaque cursors for keyset pagination.
+"""
+import base64
+import binascii
+import uuid
+from datetime import datetime
+from typing import Tuple
+
+import orjson
+
+from app.core.exceptions import InvalidRequestError
+
+
+def encode_cursor(*values: str) -> str:
+    """Pack the sort key of the last row on a page into a URL-safe token."""
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple[str, ...]:
+    """
+    Unpack a cursor produced by encode_cursor.
+
+    Raises InvalidRequestError (a ValueError) if the token is malformed or
+    does not hold exactly `size` values.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = orjson.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError) as e:
+        raise InvalidRequestError("Invalid pagination cursor") from e
+
+    if (
+        not isinstance(values, list)
+        or len(values) != size
+        or not all(isinstance(value, str) for value in values)
+    ):
+        raise InvalidRequestError("Invalid pagination cursor")
+
+    return tuple(values)
+
+
+def decode_seek_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Unpack a cursor holding the (timestamp, id) sort key of the last row.
+
+    Raises InvalidRequestError if either value does not parse, so a tampered
+    but well-formed token is rejected like a malformed one.
+    """
+    timestamp, last_id = decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(timestamp), uuid.UUID(last_id)
+    except ValueError as e:
+        raise InvalidRequestError("Invalid pagination cursor") from e
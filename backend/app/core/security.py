@@ -2,14 +2,17 @@
 Security utilities for authentication and authorization.
 """
 from datetime import datetime, timedelta
-from typing import Optional, Union, Dict, Any
-from jose import JWTError, jwt
+from collections import OrderedDict
+from typing import Optional, Union, Dict, Any, Tuple
+from jose import JWTError, jwk, jwt
 import bcrypt
 from fastapi import HTTPException, status, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 import secrets
 import hashlib
+import logging
+import time
 import uuid
 
 from app.core.config import settings
@@ -17,9 +20,20 @@ from app.core.database import get_db
 from app.models.user import User
 from app.models.redis_models import UserSession, redis_client
 
+logger = logging.getLogger(__name__)
+
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
+# JWT signing key, constructed once instead of on every encode/decode
+JWT_ALGORITHM = "HS256"
+_jwt_key = jwk.construct(settings.SECRET_KEY, JWT_ALGORITHM)
+
+# Recently verified tokens: token -> (payload, cache expiry timestamp)
+TOKEN_CACHE_TTL_SECONDS = 30
+TOKEN_CACHE_MAX_SIZE = 1024
+_verified_tokens: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+
 
 class AuthenticationError(HTTPException):
     """Custom authentication error."""
@@ -51,7 +65,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
+    encoded_jwt = jwt.encode(to_encode, _jwt_key, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
 
@@ -60,19 +74,50 @@ def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
+    encoded_jwt = jwt.encode(to_encode, _jwt_key, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
 
+def _get_cached_token_payload(token: str) -> Optional[dict]:
+    """Get payload of a recently verified token, if still cached."""
+    cached = _verified_tokens.get(token)
+    if cached is None:
+        return None
+    
+    payload, expires_at = cached
+    if expires_at <= time.time():
+        _verified_tokens.pop(token, None)
+        return None
+    
+    _verified_tokens.move_to_end(token)
+    return payload
+
+
+def _cache_token_payload(token: str, payload: dict) -> None:
+    """Cache a verified token payload until min(TTL, token expiry)."""
+    expires_at = time.time() + TOKEN_CACHE_TTL_SECONDS
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, exp)
+    
+    _verified_tokens[token] = (payload, expires_at)
+    if len(_verified_tokens) > TOKEN_CACHE_MAX_SIZE:
+        _verified_tokens.popitem(last=False)
+
+
 def verify_token(token: str, token_type: str = "access") -> dict:
     """Verify JWT token."""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        if payload.get("type") != token_type:
-            raise AuthenticationError("Invalid token type")
-        return payload
-    except JWTError:
-        raise AuthenticationError("Could not validate credentials")
+    payload = _get_cached_token_payload(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, _jwt_key, algorithms=[JWT_ALGORITHM])
+        except JWTError:
+            raise AuthenticationError("Could not validate credentials")
+        _cache_token_payload(token, payload)
+    
+    if payload.get("type") != token_type:
+        raise AuthenticationError("Invalid token type")
+    return payload
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -151,11 +196,29 @@ async def create_user_session(
     return session
 
 
-async def get_current_user(
+async def _load_active_user(db: AsyncSession, user_id: Union[str, uuid.UUID]) -> User:
+    """Load a user row, rejecting missing or disabled accounts."""
+    user = await db.get(User, uuid.UUID(str(user_id)))
+    if not user:
+        raise AuthenticationError("User not found")
+    
+    if not user.is_active:
+        raise AuthenticationError("User account is disabled")
+    
+    return user
+
+
+async def get_current_user_id(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get current authenticated user."""
+) -> uuid.UUID:
+    """
+    Get the authenticated user's ID without loading the user row.
+    
+    Tokens bound to a live Redis session tracked under the user are trusted
+    on their own, since deactivating an account revokes those sessions.
+    Other tokens still go through the database to check the account.
+    """
     
     token = credentials.credentials
     
@@ -170,22 +233,27 @@ async def get_current_user(
         
         # Check if session exists in Redis (optional but recommended)
         if session_token:
-            session = UserSession.get_session(session_token)
+            session, tracked = UserSession.get_tracked_session(session_token, user_id)
             if not session or session.user_id != user_id:
                 raise AuthenticationError("Session not found or invalid")
-        
-        # Get user from database
-        user = await db.get(User, uuid.UUID(user_id))
-        if not user:
-            raise AuthenticationError("User not found")
-        
-        if not user.is_active:
-            raise AuthenticationError("User account is disabled")
-        
-        return user
+            if tracked:
+                return uuid.UUID(user_id)
         
     except JWTError:
         raise AuthenticationError("Could not validate credentials")
+    
+    user = await _load_active_user(db, user_id)
+    return user.id
+
+
+async def get_current_user(
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """Get current authenticated user."""
+    # Served from the session's identity map if get_current_user_id
+    # already loaded the row
+    return await _load_active_user(db, user_id)
 
 
 async def get_current_active_user(
@@ -247,28 +315,17 @@ async def revoke_session(session_token: str) -> bool:
 
 
 async def revoke_all_user_sessions(user_id: str) -> bool:
-    """Revoke all sessions for a user."""
+    """
+    Revoke all sessions for a user.
+    
+    Returns False if Redis could not be reached, in which case sessions
+    may still be live.
+    """
     try:
-        # Get all session keys for the user
-        pattern = "session:*"
-        keys = redis_client.keys(pattern)
-        
-        sessions_to_delete = []
-        for key in keys:
-            session_data = redis_client.get(key)
-            if session_data:
-                try:
-                    session = UserSession.model_validate_json(session_data)
-                    if session.user_id == user_id:
-                        sessions_to_delete.append(key)
-                except Exception:
-                    continue
-        
-        if sessions_to_delete:
-            redis_client.delete(*sessions_to_delete)
-        
+        UserSession.delete_user_sessions(user_id)
         return True
     except Exception:
+        logger.exception(f"Failed to revoke sessions for user {user_id}")
         return False
 
 
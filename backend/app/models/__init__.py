@@ -1,7 +1,7 @@
 # Database models
 from .user import User, UserPhoto, PersonalityProfile, DatingPreferences
 from .avatar import AIAvatar, AvatarCustomization, AvatarTrainingSession, AvatarStatus
-from .match import Match, MatchSession, CompatibilityReport, MatchStatus, MatchSessionStatus, InterestLevel
+from .match import Match, MatchSession, CompatibilityReport, CompatibilityScore, MatchStatus, MatchSessionStatus, InterestLevel
 from .conversation import ConversationSession, ConversationMessage, ConversationCompatibilityReport, SessionType, SessionStatus, AgentType, MessageType
 from .scenario import ScenarioTemplate, SimulationSession, SimulationMessage, ScenarioResult, ScenarioLibrary, ScenarioCategory, ScenarioDifficulty, SimulationStatus
 from .notification import (
@@ -30,6 +30,7 @@ __all__ = [
     "Match",
     "MatchSession",
     "CompatibilityReport",
+    "CompatibilityScore",
     "MatchStatus",
     "MatchSessionStatus",
     "InterestLevel",
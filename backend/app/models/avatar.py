@@ -1,7 +1,7 @@
 """
 AI Avatar database models.
 """
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, JSON, Float, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, JSON, Float, ForeignKey, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -135,5 +135,9 @@ class AvatarTrainingSession(Base):
     completed_at = Column(DateTime(timezone=True))
     duration_seconds = Column(Integer)
     
+    __table_args__ = (
+        Index("ix_avatar_training_sessions_avatar_id_started_at", avatar_id, started_at.desc()),
+    )
+    
     # Relationships
     avatar = relationship("AIAvatar", back_populates="training_sessions")
\ No newline at end of file
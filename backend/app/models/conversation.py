@@ -1,7 +1,7 @@
 """
 Conversation and session database models.
 """
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, JSON, Float, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, JSON, Float, ForeignKey, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -153,6 +153,10 @@ class ConversationMessage(Base):
     
     # Relationships
     session = relationship("ConversationSession", back_populates="messages")
+    
+    __table_args__ = (
+        Index("ix_conversation_messages_session_id_timestamp", session_id, timestamp),
+    )
 
 
 class ConversationCompatibilityReport(Base):
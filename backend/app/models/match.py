@@ -1,7 +1,7 @@
 """
 Match and compatibility database models.
 """
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, JSON, Float, Enum, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, JSON, Float, Enum, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -157,4 +157,27 @@ class CompatibilityReport(Base):
     
     # Relationships
     match = relationship("Match", back_populates="compatibility_reports")
-    session = relationship("MatchSession", back_populates="compatibility_report")
\ No newline at end of file
+    session = relationship("MatchSession", back_populates="compatibility_report")
+
+
+class CompatibilityScore(Base):
+    """Precomputed compatibility scores for a user pair, refreshed when simulations complete."""
+    
+    __tablename__ = "compatibility_scores"
+    __table_args__ = (
+        UniqueConstraint("user1_id", "user2_id", name="uq_compatibility_scores_user_pair"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Pair is stored in canonical order (user1_id < user2_id)
+    user1_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user2_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    # Scores across all completed simulations of the pair
+    scores = Column(JSON, nullable=False, default=dict)
+    sessions_count = Column(Integer, default=0)
+    last_simulation_at = Column(DateTime(timezone=True))  # updated_at of the latest simulation
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
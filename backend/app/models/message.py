@@ -1,7 +1,7 @@
 """
 Direct messaging database models.
 """
-from sqlalchemy import Column, String, DateTime, Boolean, Text, JSON, ForeignKey, Integer
+from sqlalchemy import Column, String, DateTime, Boolean, Text, JSON, ForeignKey, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -47,6 +47,10 @@ class DirectMessage(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    __table_args__ = (
+        Index("ix_direct_messages_match_id_created_at", match_id, created_at.desc()),
+    )
+    
     # Relationships
     sender = relationship("User", foreign_keys=[sender_id])
     recipient = relationship("User", foreign_keys=[recipient_id])
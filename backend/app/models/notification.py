@@ -1,7 +1,7 @@
 """
 Notification database models.
 """
-from sqlalchemy import Column, String, DateTime, Boolean, Text, JSON, Enum, ForeignKey
+from sqlalchemy import Column, String, DateTime, Boolean, Text, JSON, Enum, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -64,6 +64,10 @@ class Notification(Base):
     delivered_at = Column(DateTime(timezone=True))
     expires_at = Column(DateTime(timezone=True))
     
+    __table_args__ = (
+        Index("ix_notifications_user_id_created_at", user_id, created_at.desc()),
+    )
+    
     # Relationships
     user = relationship("User", foreign_keys=[user_id])
     related_user = relationship("User", foreign_keys=[related_user_id])
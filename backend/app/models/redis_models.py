@@ -1,7 +1,7 @@
 """
 Redis models for caching and real-time data.
 """
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
 import json
@@ -73,11 +73,25 @@ class UserSession(RedisBaseModel):
     last_activity: datetime = Field(default_factory=datetime.utcnow)
     expires_at: datetime
     
+    @staticmethod
+    def user_sessions_key(user_id: str) -> str:
+        """Redis key of the set of a user's session tokens."""
+        return f"user_sessions:{user_id}"
+    
     def save_session(self) -> bool:
-        """Save session to Redis with TTL."""
+        """Save session to Redis with TTL and track it under its user."""
         key = self.to_redis_key("session", self.session_token)
         ttl = int((self.expires_at - datetime.utcnow()).total_seconds())
-        return self.save_to_redis(key, ttl)
+        try:
+            pipe = redis_client.pipeline()
+            pipe.setex(key, ttl, self.model_dump_json())
+            pipe.sadd(self.user_sessions_key(self.user_id), self.session_token)
+            # Sessions share one lifetime, so the newest outlives the rest
+            pipe.expire(self.user_sessions_key(self.user_id), ttl)
+            pipe.execute()
+            return True
+        except Exception:
+            return False
     
     @classmethod
     def get_session(cls, session_token: str) -> Optional['UserSession']:
@@ -85,10 +99,54 @@ class UserSession(RedisBaseModel):
         key = f"session:{session_token}"
         return cls.load_from_redis(key)
     
+    @classmethod
+    def get_tracked_session(
+        cls,
+        session_token: str,
+        user_id: str
+    ) -> Tuple[Optional['UserSession'], bool]:
+        """
+        Get a session and whether it is tracked under the user, in one round trip.
+        
+        Only tracked sessions are removed by revoking all of a user's sessions.
+        """
+        try:
+            pipe = redis_client.pipeline()
+            pipe.get(f"session:{session_token}")
+            pipe.sismember(cls.user_sessions_key(user_id), session_token)
+            data, tracked = pipe.execute()
+            if not data:
+                return None, False
+            return cls.model_validate_json(data), bool(tracked)
+        except Exception:
+            return None, False
+    
     def delete_session(self) -> bool:
         """Delete session from Redis."""
         key = self.to_redis_key("session", self.session_token)
-        return self.delete_from_redis(key)
+        try:
+            pipe = redis_client.pipeline()
+            pipe.delete(key)
+            pipe.srem(self.user_sessions_key(self.user_id), self.session_token)
+            pipe.execute()
+            return True
+        except Exception:
+            return False
+    
+    @classmethod
+    def delete_user_sessions(cls, user_id: str) -> None:
+        """
+        Delete every tracked session of a user.
+        
+        Redis errors propagate, so callers can refuse to proceed when
+        sessions may still be live.
+        """
+        user_sessions_key = cls.user_sessions_key(user_id)
+        session_tokens = redis_client.smembers(user_sessions_key)
+        redis_client.delete(
+            user_sessions_key,
+            *(f"session:{session_token}" for session_token in session_tokens)
+        )
 
 
 class LiveSessionData(RedisBaseModel):
@@ -263,6 +321,61 @@ class CachedCompatibilityScore(RedisBaseModel):
 
 
 # Utility functions for Redis operations
+def get_cached_json(key: str) -> Optional[str]:
+    """Get a cached, already serialized JSON payload."""
+    try:
+        return redis_client.get(key)
+    except Exception:
+        return None
+
+
+def get_cached_json_many(keys: List[str]) -> List[Optional[str]]:
+    """Get several cached JSON payloads in one round-trip."""
+    try:
+        return redis_client.mget(keys)
+    except Exception:
+        return [None] * len(keys)
+
+
+def set_cached_json(key: str, payload: bytes, ttl: int) -> bool:
+    """Cache a serialized JSON payload with TTL."""
+    try:
+        redis_client.setex(key, ttl, payload)
+        return True
+    except Exception:
+        return False
+
+
+def get_cached_json_field(key: str, field: str) -> Optional[str]:
+    """Get one cached JSON payload from a hash of related payloads."""
+    try:
+        return redis_client.hget(key, field)
+    except Exception:
+        return None
+
+
+def set_cached_json_field(key: str, field: str, payload: bytes, ttl: int) -> bool:
+    """Cache a serialized JSON payload in a hash, refreshing the hash TTL."""
+    try:
+        pipe = redis_client.pipeline()
+        pipe.hset(key, field, payload)
+        pipe.expire(key, ttl)
+        pipe.execute()
+        return True
+    except Exception:
+        return False
+
+
+def delete_cached_json(*keys: str) -> bool:
+    """Invalidate cached JSON payloads."""
+    try:
+        if keys:
+            redis_client.delete(*keys)
+        return True
+    except Exception:
+        return False
+
+
 def clear_user_cache(user_id: str) -> bool:
     """Clear all cached data for a user."""
     try:
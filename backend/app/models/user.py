@@ -1,8 +1,8 @@
 """
 User and profile database models.
 """
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, JSON, Date, Float, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, JSON, Date, Float, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime, date
@@ -27,7 +27,10 @@ class User(Base):
     date_of_birth = Column(Date)
     gender = Column(String(20))
     location = Column(String(255))
+    latitude = Column(Float)
+    longitude = Column(Float)
     bio = Column(Text)
+    interests = Column(ARRAY(String(50)), default=list)
     
     # Account status
     is_verified = Column(Boolean, default=False)
@@ -44,6 +47,11 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     last_active = Column(DateTime(timezone=True))
     
+    __table_args__ = (
+        Index("ix_users_latitude_longitude", latitude, longitude),
+        Index("ix_users_interests", interests, postgresql_using="gin"),
+    )
+    
     # Relationships
     photos = relationship("UserPhoto", back_populates="user", cascade="all, delete-orphan")
     personality_profile = relationship("PersonalityProfile", back_populates="user", uselist=False, cascade="all, delete-orphan")
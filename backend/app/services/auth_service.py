@@ -20,7 +20,8 @@ from app.schemas.auth import (
 from app.core.security import (
     get_password_hash, verify_password, create_access_token, 
     create_refresh_token, create_user_session, generate_verification_token,
-    generate_reset_token, AuthenticationError, AuthorizationError
+    generate_reset_token, AuthenticationError, AuthorizationError,
+    revoke_all_user_sessions
 )
 from app.core.config import settings
 
@@ -418,11 +419,10 @@ class AuthService:
         user.is_active = False
         user.updated_at = datetime.utcnow()
         
+        # Session-backed tokens are authorized without reloading the user
+        await self._revoke_sessions_or_rollback(user)
         await self.db.commit()
         
-        # TODO: Revoke all sessions
-        # await revoke_all_user_sessions(str(user.id))
-        
         return {"message": "Account deactivated successfully"}
     
     async def delete_account(self, user: User) -> Dict[str, str]:
@@ -438,9 +438,23 @@ class AuthService:
         user.username = f"deleted_{user.id}"
         user.updated_at = datetime.utcnow()
         
+        await self._revoke_sessions_or_rollback(user)
         await self.db.commit()
         
         # TODO: Clean up related data
-        # TODO: Revoke all sessions
         
-        return {"message": "Account deletion initiated"}
\ No newline at end of file
+        return {"message": "Account deletion initiated"}
+    
+    async def _revoke_sessions_or_rollback(self, user: User) -> None:
+        """
+        Revoke a user's sessions before an account change is committed.
+        
+        If Redis cannot be reached the change is rolled back, so an account
+        is never disabled while its session-backed tokens keep working.
+        """
+        if not await revoke_all_user_sessions(str(user.id)):
+            await self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Could not revoke sessions; account was not changed"
+            )
\ No newline at end of file
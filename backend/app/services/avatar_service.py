@@ -4,15 +4,36 @@ AI Avatar service for creating and managing user avatars.
 from typing import Dict, List, Optional, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
+from sqlalchemy.orm import raiseload
 from datetime import datetime
 import json
 import uuid
 
 from app.models.user import User, PersonalityProfile
 from app.models.avatar import AIAvatar, AvatarCustomization, AvatarTrainingSession, AvatarStatus
+from app.models.redis_models import delete_cached_json
 from app.core.config import settings
 
 
+# Cached avatar read responses, invalidated whenever the avatar changes
+AVATAR_CACHE_TTL_SECONDS = 300
+
+
+def avatar_cache_key(user_id: Any) -> str:
+    """Redis key of the cached avatar response for a user."""
+    return f"avatar:{user_id}"
+
+
+def avatar_customizations_cache_key(avatar_id: Any) -> str:
+    """Redis key of the cached customizations response for an avatar."""
+    return f"avatar:{avatar_id}:customizations"
+
+
+def avatar_completeness_cache_key(avatar_id: Any) -> str:
+    """Redis key of the cached completeness analysis for an avatar."""
+    return f"avatar:{avatar_id}:completeness"
+
+
 class AvatarService:
     """Service for AI avatar creation and management."""
     
@@ -21,8 +42,8 @@ class AvatarService:
     
     async def create_avatar_from_personality(
         self, 
-        user_id: str, 
-        personality_profile_id: str
+        user_id: uuid.UUID, 
+        personality_profile_id: uuid.UUID
     ) -> AIAvatar:
         """Create an AI avatar from a user's personality profile."""
         
@@ -46,7 +67,59 @@ class AvatarService:
         existing_avatar = existing_result.scalar_one_or_none()
         if existing_avatar:
             # Update existing avatar instead of creating new one
-            return await self.update_avatar_from_personality(existing_avatar.id, personality_profile_id)
+            return await self._update_avatar(existing_avatar, personality_profile)
+        
+        return await self._create_avatar(user, personality_profile)
+    
+    async def update_avatar_from_personality(
+        self, 
+        avatar_id: uuid.UUID, 
+        personality_profile_id: uuid.UUID
+    ) -> AIAvatar:
+        """Update an existing avatar when personality data changes."""
+        
+        # Get avatar and personality profile
+        avatar_result = await self.db.execute(select(AIAvatar).where(AIAvatar.id == avatar_id))
+        avatar = avatar_result.scalar_one_or_none()
+        if not avatar:
+            raise ValueError("Avatar not found")
+        
+        profile_result = await self.db.execute(
+            select(PersonalityProfile).where(PersonalityProfile.id == personality_profile_id)
+        )
+        personality_profile = profile_result.scalar_one_or_none()
+        if not personality_profile:
+            raise ValueError("Personality profile not found")
+        
+        return await self._update_avatar(avatar, personality_profile)
+    
+    async def upsert_from_personality(self, user_id: uuid.UUID) -> Optional[AIAvatar]:
+        """
+        Create or update a user's avatar from their current personality profile.
+        
+        Loads the user, profile and any existing avatar in a single query.
+        Returns None if the user does not exist.
+        """
+        result = await self.db.execute(
+            select(User, PersonalityProfile, AIAvatar)
+            .outerjoin(PersonalityProfile, PersonalityProfile.user_id == User.id)
+            .outerjoin(AIAvatar, AIAvatar.user_id == User.id)
+            .where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        
+        user, personality_profile, avatar = row
+        if not personality_profile:
+            raise ValueError("User has no personality profile")
+        
+        if avatar:
+            return await self._update_avatar(avatar, personality_profile)
+        return await self._create_avatar(user, personality_profile)
+    
+    async def _create_avatar(self, user: User, personality_profile: PersonalityProfile) -> AIAvatar:
+        """Create and train a new avatar for a loaded user and profile."""
         
         # Generate avatar configuration from personality data
         avatar_config = await self._generate_avatar_config(personality_profile)
@@ -54,8 +127,8 @@ class AvatarService:
         # Create avatar
         avatar = AIAvatar(
             id=uuid.uuid4(),
-            user_id=user_id,
-            personality_profile_id=personality_profile_id,
+            user_id=user.id,
+            personality_profile_id=personality_profile.id,
             name=f"{user.first_name}'s Avatar",
             description=f"AI representation of {user.first_name}",
             personality_traits=avatar_config["personality_traits"],
@@ -77,39 +150,21 @@ class AvatarService:
         await self.db.commit()
         await self.db.refresh(avatar)
         
-        # Start initial training
-        await self._start_avatar_training(avatar.id, "initial", "Avatar creation")
-        
-        # Refresh avatar after training to get updated status and training info
-        await self.db.refresh(avatar)
-        
-        return avatar
+        # Start initial training; returns the avatar refreshed with training info
+        return await self._start_avatar_training(avatar.id, "initial", "Avatar creation")
     
-    async def update_avatar_from_personality(
-        self, 
-        avatar_id: str, 
-        personality_profile_id: str
+    async def _update_avatar(
+        self,
+        avatar: AIAvatar,
+        personality_profile: PersonalityProfile
     ) -> AIAvatar:
-        """Update an existing avatar when personality data changes."""
-        
-        # Get avatar and personality profile
-        avatar_result = await self.db.execute(select(AIAvatar).where(AIAvatar.id == avatar_id))
-        avatar = avatar_result.scalar_one_or_none()
-        if not avatar:
-            raise ValueError("Avatar not found")
-        
-        profile_result = await self.db.execute(
-            select(PersonalityProfile).where(PersonalityProfile.id == personality_profile_id)
-        )
-        personality_profile = profile_result.scalar_one_or_none()
-        if not personality_profile:
-            raise ValueError("Personality profile not found")
+        """Regenerate and retrain a loaded avatar from a loaded profile."""
         
         # Generate updated avatar configuration
         avatar_config = await self._generate_avatar_config(personality_profile)
         
         # Update avatar
-        avatar.personality_profile_id = personality_profile_id
+        avatar.personality_profile_id = personality_profile.id
         avatar.personality_traits = avatar_config["personality_traits"]
         avatar.communication_patterns = avatar_config["communication_patterns"]
         avatar.response_style = avatar_config["response_style"]
@@ -126,24 +181,20 @@ class AvatarService:
         await self.db.commit()
         await self.db.refresh(avatar)
         
-        # Start retraining
-        await self._start_avatar_training(avatar.id, "personality_update", "Personality profile updated")
-        
-        # Refresh avatar after training to get updated status and training info
-        await self.db.refresh(avatar)
-        
-        return avatar
+        # Start retraining; returns the avatar refreshed with training info
+        return await self._start_avatar_training(avatar.id, "personality_update", "Personality profile updated")
     
-    async def get_avatar_by_user_id(self, user_id: str) -> Optional[AIAvatar]:
+    async def get_avatar_by_user_id(self, user_id: uuid.UUID) -> Optional[AIAvatar]:
         """Get a user's AI avatar."""
+        # Callers only read avatar columns; fail loudly instead of lazy loading relationships
         result = await self.db.execute(
-            select(AIAvatar).where(AIAvatar.user_id == user_id)
+            select(AIAvatar).options(raiseload("*")).where(AIAvatar.user_id == user_id)
         )
         return result.scalar_one_or_none()
     
     async def customize_avatar(
         self, 
-        avatar_id: str, 
+        avatar_id: uuid.UUID, 
         customization_type: str,
         field_name: str,
         custom_value: Any,
@@ -186,10 +237,11 @@ class AvatarService:
         
         await self.db.commit()
         await self.db.refresh(customization)
+        self._invalidate_avatar_cache(avatar)
         
         return customization
     
-    async def get_avatar_completeness_analysis(self, avatar_id: str) -> Dict[str, Any]:
+    async def get_avatar_completeness_analysis(self, avatar_id: uuid.UUID) -> Dict[str, Any]:
         """Get detailed completeness analysis and improvement suggestions."""
         
         avatar_result = await self.db.execute(select(AIAvatar).where(AIAvatar.id == avatar_id))
@@ -591,11 +643,11 @@ class AvatarService:
     
     async def _start_avatar_training(
         self, 
-        avatar_id: str, 
+        avatar_id: uuid.UUID, 
         training_type: str, 
         trigger_reason: str
-    ) -> AvatarTrainingSession:
-        """Start avatar training session."""
+    ) -> AIAvatar:
+        """Start avatar training session and return the updated avatar."""
         
         training_session = AvatarTrainingSession(
             id=uuid.uuid4(),
@@ -620,17 +672,15 @@ class AvatarService:
         
         # In a real implementation, this would trigger actual AI training
         # For now, we'll simulate successful training
-        await self._complete_avatar_training(training_session.id, True)
-        
-        return training_session
+        return await self._complete_avatar_training(training_session.id, True)
     
     async def _complete_avatar_training(
         self, 
-        training_session_id: str, 
+        training_session_id: uuid.UUID, 
         success: bool,
         error_message: Optional[str] = None
-    ):
-        """Complete avatar training session."""
+    ) -> AIAvatar:
+        """Complete avatar training session and return the updated avatar."""
         
         # Update training session
         await self.db.execute(
@@ -644,17 +694,9 @@ class AvatarService:
             )
         )
         
-        # Get training session to find avatar
-        session_result = await self.db.execute(
-            select(AvatarTrainingSession).where(AvatarTrainingSession.id == training_session_id)
-        )
-        session = session_result.scalar_one()
-        
-        # Get current avatar to increment training iterations
-        avatar_result = await self.db.execute(
-            select(AIAvatar).where(AIAvatar.id == session.avatar_id)
-        )
-        avatar = avatar_result.scalar_one()
+        # Both rows are usually already in the session's identity map, so no SELECT is issued
+        session = await self.db.get(AvatarTrainingSession, training_session_id)
+        avatar = await self.db.get(AIAvatar, session.avatar_id)
         
         # Update avatar status and training count
         new_status = AvatarStatus.ACTIVE.value if success else AvatarStatus.ERROR.value
@@ -669,6 +711,19 @@ class AvatarService:
         )
         
         await self.db.commit()
+        
+        # Single reload so callers get server-side values such as updated_at
+        await self.db.refresh(avatar)
+        self._invalidate_avatar_cache(avatar)
+        return avatar
+    
+    def _invalidate_avatar_cache(self, avatar: AIAvatar) -> None:
+        """Drop cached read responses for an avatar after it changed."""
+        delete_cached_json(
+            avatar_cache_key(avatar.user_id),
+            avatar_customizations_cache_key(avatar.id),
+            avatar_completeness_cache_key(avatar.id)
+        )
     
     def _calculate_customization_impact(self, customization_type: str, field_name: str) -> float:
         """Calculate the impact score of a customization."""
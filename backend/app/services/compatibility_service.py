@@ -1,21 +1,110 @@
 """
 Compatibility analysis and reporting service.
 """
-from typing import List, Dict, Any, Optional, Tuple
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, desc
+from sqlalchemy import select, delete, and_, or_, func, desc
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
 from datetime import datetime, timedelta
+import asyncio
+from uuid import UUID, uuid4
 import statistics
 import json
+import orjson
 
 from app.models.scenario import (
     SimulationSession, ScenarioResult, SimulationMessage,
     ScenarioTemplate, SimulationStatus
 )
 from app.models.user import User, PersonalityProfile
-from app.models.match import Match
-from app.core.database import get_db
+from app.models.match import Match, CompatibilityScore
+from app.models.redis_models import (
+    get_cached_json, get_cached_json_many, set_cached_json, delete_cached_json
+)
+from app.core.database import get_db, AsyncSessionLocal
+
+
+# Computed scores are keyed on the profiles and simulation history they were
+# derived from, so a resubmitted assessment or a new completed session
+# naturally misses the cache
+COMPATIBILITY_SCORES_CACHE_TTL_SECONDS = 300
+
+
+def _profile_version(user: User) -> int:
+    """Last update of a user's personality profile in microseconds, 0 if none."""
+    profile = user.personality_profile
+    if not profile or not profile.updated_at:
+        return 0
+    return int(profile.updated_at.timestamp() * 1_000_000)
+
+
+def compatibility_inputs_version(
+    user1: User,
+    user2: User,
+    simulation_history: List[SimulationSession]
+) -> Tuple[Any, ...]:
+    """Markers that change whenever the inputs of a compatibility analysis do."""
+    last_updated = (
+        int(simulation_history[-1].updated_at.timestamp())
+        if simulation_history and simulation_history[-1].updated_at else 0
+    )
+    return (
+        user1.id, user2.id, _profile_version(user1), _profile_version(user2),
+        len(simulation_history), last_updated
+    )
+
+
+def compatibility_scores_cache_key(
+    user1: User,
+    user2: User,
+    simulation_history: List[SimulationSession]
+) -> str:
+    """Redis key of the cached compatibility scores for two profiles and a history."""
+    version = compatibility_inputs_version(user1, user2, simulation_history)
+    return "compat:scores:" + ":".join(str(part) for part in version)
+
+
+# Profiles change rarely, so the columns the analysis reads are cached per user
+USER_PROFILE_CACHE_TTL_SECONDS = 60
+_CACHED_USER_FIELDS = ("first_name", "last_name")
+_CACHED_PROFILE_FIELDS = (
+    "openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism",
+    "values", "communication_style", "conflict_resolution_style", "completeness_score",
+    "updated_at"
+)
+
+
+def user_profile_cache_key(user_id: Any) -> str:
+    """Redis key of the cached compatibility profile for a user."""
+    return f"compat:profile:{user_id}"
+
+
+def invalidate_user_profile_cache(user_id: Any) -> None:
+    """Drop a user's cached compatibility profile after it changes."""
+    delete_cached_json(user_profile_cache_key(user_id))
+
+
+def _user_profile_payload(user: User) -> Dict[str, Any]:
+    """Project a user and personality profile onto the cached fields."""
+    profile = user.personality_profile
+    payload = {field: getattr(user, field) for field in _CACHED_USER_FIELDS}
+    payload["personality_profile"] = (
+        {field: getattr(profile, field) for field in _CACHED_PROFILE_FIELDS}
+        if profile else None
+    )
+    return payload
+
+
+def _user_from_profile_payload(user_id: UUID, payload: Dict[str, Any]) -> User:
+    """Rebuild a detached user with its personality profile from the cache."""
+    profile_fields = payload.pop("personality_profile")
+    user = User(id=user_id, **payload)
+    if profile_fields is not None:
+        if profile_fields.get("updated_at"):
+            profile_fields["updated_at"] = datetime.fromisoformat(profile_fields["updated_at"])
+        user.personality_profile = PersonalityProfile(user_id=user_id, **profile_fields)
+    return user
 
 
 class CompatibilityService:
@@ -26,9 +115,9 @@ class CompatibilityService:
     
     async def generate_compatibility_report(
         self,
-        user1_id: str,
-        user2_id: str,
-        match_id: Optional[str] = None,
+        user1_id: UUID,
+        user2_id: UUID,
+        match_id: Optional[UUID] = None,
         include_trends: bool = True
     ) -> Dict[str, Any]:
         """
@@ -43,16 +132,15 @@ class CompatibilityService:
         Returns:
             Comprehensive compatibility report
         """
-        # Get user profiles
-        users = await self._get_user_profiles(user1_id, user2_id)
+        # Get user profiles and simulation history
+        users, simulation_history = await self._get_profiles_and_history(
+            user1_id, user2_id, match_id
+        )
         if not users:
             raise ValueError("Users not found")
         
         user1, user2 = users
         
-        # Get simulation history
-        simulation_history = await self._get_simulation_history(user1_id, user2_id, match_id)
-        
         # Calculate compatibility scores
         compatibility_scores = await self._calculate_compatibility_scores(
             user1, user2, simulation_history
@@ -73,44 +161,191 @@ class CompatibilityService:
             user1, user2, compatibility_scores, insights, simulation_history
         )
         
+        generated_at = datetime.utcnow()
         return {
-            "report_id": f"compat_{user1_id}_{user2_id}_{int(datetime.utcnow().timestamp())}",
-            "generated_at": datetime.utcnow().isoformat(),
-            "users": {
-                "user1": {
-                    "id": str(user1.id),
-                    "name": f"{user1.first_name} {user1.last_name[0]}.",
-                    "personality_summary": self._summarize_personality(user1.personality_profile)
-                },
-                "user2": {
-                    "id": str(user2.id),
-                    "name": f"{user2.first_name} {user2.last_name[0]}.",
-                    "personality_summary": self._summarize_personality(user2.personality_profile)
-                }
-            },
+            "report_id": self._report_id(user1_id, user2_id, generated_at),
+            "generated_at": generated_at.isoformat(),
+            "users": self._summarize_report_users(user1, user2),
             "compatibility_scores": compatibility_scores,
             "insights": insights,
             "trends": trends,
             "recommendations": recommendations,
-            "simulation_summary": {
-                "total_sessions": len(simulation_history),
-                "total_duration_minutes": sum(
-                    (s.duration_seconds or 0) / 60 for s in simulation_history
-                ),
-                "scenarios_explored": list(set(
-                    s.scenario_template.category.value for s in simulation_history
-                )),
-                "average_engagement": statistics.mean([
-                    s.engagement_score for s in simulation_history if s.engagement_score
-                ]) if simulation_history else 0.0
+            "simulation_summary": self._summarize_simulations(simulation_history)
+        }
+    
+    async def stream_compatibility_report(
+        self,
+        user1: User,
+        user2: User,
+        simulation_history: List[SimulationSession],
+        include_trends: bool = True
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream a compatibility report as JSON, one top-level section at a time.
+        
+        Produces the same document as ``generate_compatibility_report`` for
+        already loaded users and history, but each section is encoded and
+        emitted as soon as it is computed instead of holding the whole report.
+        
+        The first chunk carries the header and the compatibility scores, so
+        a caller that awaits it before sending headers still reports scoring
+        failures as errors.
+        """
+        generated_at = datetime.utcnow()
+        compatibility_scores = await self._calculate_compatibility_scores(
+            user1, user2, simulation_history
+        )
+        yield (
+            b'{"report_id":' + orjson.dumps(self._report_id(user1.id, user2.id, generated_at))
+            + b',"generated_at":' + orjson.dumps(generated_at.isoformat())
+            + b',"users":' + orjson.dumps(self._summarize_report_users(user1, user2))
+            + b',"compatibility_scores":' + orjson.dumps(compatibility_scores)
+        )
+        
+        insights = await self._generate_compatibility_insights(
+            user1, user2, simulation_history, compatibility_scores
+        )
+        yield b',"insights":' + orjson.dumps(insights)
+        
+        trends = None
+        if include_trends and len(simulation_history) > 1:
+            trends = await self._analyze_compatibility_trends(simulation_history)
+        yield b',"trends":' + orjson.dumps(trends)
+        
+        recommendations = await self._generate_recommendations(
+            user1, user2, compatibility_scores, insights, simulation_history
+        )
+        yield b',"recommendations":' + orjson.dumps(recommendations)
+        
+        yield (
+            b',"simulation_summary":' + orjson.dumps(self._summarize_simulations(simulation_history))
+            + b'}'
+        )
+    
+    def _report_id(self, user1_id: UUID, user2_id: UUID, generated_at: datetime) -> str:
+        """Build the identifier of a compatibility report."""
+        return f"compat_{user1_id}_{user2_id}_{int(generated_at.timestamp())}"
+    
+    def _summarize_report_users(self, user1: User, user2: User) -> Dict[str, Any]:
+        """Summarize both users for the report header."""
+        return {
+            "user1": {
+                "id": str(user1.id),
+                "name": f"{user1.first_name} {user1.last_name[0]}.",
+                "personality_summary": self._summarize_personality(user1.personality_profile)
+            },
+            "user2": {
+                "id": str(user2.id),
+                "name": f"{user2.first_name} {user2.last_name[0]}.",
+                "personality_summary": self._summarize_personality(user2.personality_profile)
             }
         }
     
+    def _summarize_simulations(self, simulation_history: List[SimulationSession]) -> Dict[str, Any]:
+        """Summarize the simulation history covered by a report."""
+        return {
+            "total_sessions": len(simulation_history),
+            "total_duration_minutes": sum(
+                (s.duration_seconds or 0) / 60 for s in simulation_history
+            ),
+            "scenarios_explored": list(set(
+                s.scenario_template.category.value for s in simulation_history
+            )),
+            "average_engagement": statistics.mean([
+                s.engagement_score for s in simulation_history if s.engagement_score
+            ]) if simulation_history else 0.0
+        }
+    
+    async def get_stored_compatibility_scores(
+        self,
+        user1_id: UUID,
+        user2_id: UUID
+    ) -> Optional[CompatibilityScore]:
+        """Get the precomputed scores of a user pair, if any have been stored."""
+        pair_user1_id, pair_user2_id = sorted((user1_id, user2_id))
+        result = await self.db.execute(
+            select(CompatibilityScore).where(
+                and_(
+                    CompatibilityScore.user1_id == pair_user1_id,
+                    CompatibilityScore.user2_id == pair_user2_id
+                )
+            )
+        )
+        return result.scalar_one_or_none()
+    
+    async def refresh_compatibility_scores(
+        self,
+        user1_id: UUID,
+        user2_id: UUID
+    ) -> Optional[CompatibilityScore]:
+        """
+        Recompute and store a user pair's scores from all completed simulations.
+        
+        Args:
+            user1_id: First user ID
+            user2_id: Second user ID
+            
+        Returns:
+            The stored scores row, or None if either user no longer exists
+        """
+        users, simulation_history = await self._get_profiles_and_history(user1_id, user2_id)
+        if not users:
+            return None
+        
+        user1, user2 = users
+        scores = await self._calculate_compatibility_scores(user1, user2, simulation_history)
+        
+        refreshed = {
+            "scores": scores,
+            "sessions_count": len(simulation_history),
+            "last_simulation_at": simulation_history[-1].updated_at if simulation_history else None,
+        }
+        
+        # Create or update the pair's row in one statement, so simulations of
+        # the same pair completing together cannot race on the unique pair
+        pair_user1_id, pair_user2_id = sorted((user1_id, user2_id))
+        result = await self.db.execute(
+            pg_insert(CompatibilityScore)
+            .values(id=uuid4(), user1_id=pair_user1_id, user2_id=pair_user2_id, **refreshed)
+            .on_conflict_do_update(
+                index_elements=[CompatibilityScore.user1_id, CompatibilityScore.user2_id],
+                set_={**refreshed, "updated_at": func.now()}
+            )
+            .returning(CompatibilityScore)
+        )
+        stored = result.scalar_one()
+        
+        await self.db.commit()
+        return stored
+    
+    async def delete_stored_compatibility_scores(self, user1_id: UUID, user2_id: UUID) -> None:
+        """Drop a user pair's stored scores row; the caller commits."""
+        pair_user1_id, pair_user2_id = sorted((user1_id, user2_id))
+        await self.db.execute(
+            delete(CompatibilityScore).where(
+                and_(
+                    CompatibilityScore.user1_id == pair_user1_id,
+                    CompatibilityScore.user2_id == pair_user2_id
+                )
+            )
+        )
+    
+    async def clear_stored_compatibility_scores(self, user_id: UUID) -> None:
+        """Drop every stored scores row involving a user; the caller commits."""
+        await self.db.execute(
+            delete(CompatibilityScore).where(
+                or_(
+                    CompatibilityScore.user1_id == user_id,
+                    CompatibilityScore.user2_id == user_id
+                )
+            )
+        )
+    
     async def get_compatibility_dashboard_data(
         self,
-        user1_id: str,
-        user2_id: str,
-        match_id: Optional[str] = None
+        user1_id: UUID,
+        user2_id: UUID,
+        match_id: Optional[UUID] = None
     ) -> Dict[str, Any]:
         """
         Get compatibility dashboard data for interactive display.
@@ -148,8 +383,8 @@ class CompatibilityService:
     
     async def track_compatibility_trends(
         self,
-        user1_id: str,
-        user2_id: str,
+        user1_id: UUID,
+        user2_id: UUID,
         time_period_days: int = 30
     ) -> Dict[str, Any]:
         """
@@ -197,25 +432,108 @@ class CompatibilityService:
         
         return await self._analyze_compatibility_trends(sessions)
     
+    async def get_compatibility_analysis(
+        self,
+        user1_id: UUID,
+        user2_id: UUID,
+        match_id: Optional[UUID] = None
+    ) -> Dict[str, Any]:
+        """
+        Compute scores, insights and recommendations in a single pass.
+        
+        Args:
+            user1_id: First user ID
+            user2_id: Second user ID
+            match_id: Optional match ID for context
+            
+        Returns:
+            Scores, insights and recommendations sharing one set of inputs
+        """
+        users, simulation_history = await self._get_profiles_and_history(
+            user1_id, user2_id, match_id
+        )
+        if not users:
+            raise ValueError("Users not found")
+        
+        user1, user2 = users
+        return await self.analyze_compatibility(user1, user2, simulation_history)
+    
+    async def analyze_compatibility(
+        self,
+        user1: User,
+        user2: User,
+        simulation_history: List[SimulationSession]
+    ) -> Dict[str, Any]:
+        """Compute scores, insights and recommendations for already loaded inputs."""
+        scores = await self._calculate_compatibility_scores(user1, user2, simulation_history)
+        insights = await self._generate_compatibility_insights(
+            user1, user2, simulation_history, scores
+        )
+        recommendations = await self._generate_recommendations(
+            user1, user2, scores, insights, simulation_history
+        )
+        
+        return {
+            "scores": scores,
+            "insights": insights,
+            "recommendations": recommendations,
+            "last_updated": simulation_history[-1].updated_at.isoformat() if simulation_history else None,
+            "sessions_count": len(simulation_history)
+        }
+    
+    async def _get_profiles_and_history(
+        self,
+        user1_id: UUID,
+        user2_id: UUID,
+        match_id: Optional[UUID] = None
+    ) -> Tuple[Optional[Tuple[User, User]], List[SimulationSession]]:
+        """
+        Fetch user profiles and simulation history concurrently.
+        
+        An AsyncSession runs one statement at a time, so the profiles are
+        loaded through a short-lived session of their own while the history
+        query runs on the request session.
+        """
+        async def fetch_profiles() -> Optional[Tuple[User, User]]:
+            async with AsyncSessionLocal() as session:
+                return await CompatibilityService(session)._get_user_profiles(user1_id, user2_id)
+        
+        return await asyncio.gather(
+            fetch_profiles(),
+            self._get_simulation_history(user1_id, user2_id, match_id)
+        )
+    
     async def _get_user_profiles(
         self, 
-        user1_id: str, 
-        user2_id: str
+        user1_id: UUID, 
+        user2_id: UUID
     ) -> Optional[Tuple[User, User]]:
-        """Get user profiles with personality data."""
-        user1_query = select(User).options(
-            selectinload(User.personality_profile)
-        ).where(User.id == user1_id)
-        
-        user2_query = select(User).options(
-            selectinload(User.personality_profile)
-        ).where(User.id == user2_id)
+        """Get user profiles with personality data, served from Redis when cached."""
+        user_ids = (user1_id, user2_id)
+        cached = get_cached_json_many([user_profile_cache_key(user_id) for user_id in user_ids])
+        users_by_id = {
+            user_id: _user_from_profile_payload(user_id, orjson.loads(payload))
+            for user_id, payload in zip(user_ids, cached)
+            if payload is not None
+        }
         
-        user1_result = await self.db.execute(user1_query)
-        user2_result = await self.db.execute(user2_query)
+        missing_ids = [user_id for user_id in user_ids if user_id not in users_by_id]
+        if missing_ids:
+            query = select(User).options(
+                selectinload(User.personality_profile)
+            ).where(User.id.in_(missing_ids))
+            
+            result = await self.db.execute(query)
+            for user in result.scalars().all():
+                users_by_id[user.id] = user
+                set_cached_json(
+                    user_profile_cache_key(user.id),
+                    orjson.dumps(_user_profile_payload(user)),
+                    USER_PROFILE_CACHE_TTL_SECONDS
+                )
         
-        user1 = user1_result.scalar_one_or_none()
-        user2 = user2_result.scalar_one_or_none()
+        user1 = users_by_id.get(user1_id)
+        user2 = users_by_id.get(user2_id)
         
         if not user1 or not user2:
             return None
@@ -224,9 +542,9 @@ class CompatibilityService:
     
     async def _get_simulation_history(
         self,
-        user1_id: str,
-        user2_id: str,
-        match_id: Optional[str] = None
+        user1_id: UUID,
+        user2_id: UUID,
+        match_id: Optional[UUID] = None
     ) -> List[SimulationSession]:
         """Get simulation history between two users."""
         query = select(SimulationSession).options(
@@ -263,7 +581,23 @@ class CompatibilityService:
         user2: User,
         simulation_history: List[SimulationSession]
     ) -> Dict[str, float]:
-        """Calculate comprehensive compatibility scores."""
+        """Calculate comprehensive compatibility scores, reusing cached results."""
+        cache_key = compatibility_scores_cache_key(user1, user2, simulation_history)
+        cached = get_cached_json(cache_key)
+        if cached is not None:
+            return orjson.loads(cached)
+        
+        scores = self._compute_compatibility_scores(user1, user2, simulation_history)
+        set_cached_json(cache_key, orjson.dumps(scores), COMPATIBILITY_SCORES_CACHE_TTL_SECONDS)
+        return scores
+    
+    def _compute_compatibility_scores(
+        self,
+        user1: User,
+        user2: User,
+        simulation_history: List[SimulationSession]
+    ) -> Dict[str, float]:
+        """Compute compatibility scores from profiles and simulation results."""
         scores = {
             "overall_compatibility": 0.0,
             "personality_compatibility": 0.0,
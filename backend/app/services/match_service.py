@@ -3,14 +3,28 @@ Match discovery and management service.
 """
 from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, text
+from sqlalchemy import select, lambda_stmt, and_, or_, func, text, tuple_
 from sqlalchemy.orm import selectinload
 from datetime import datetime, date
 import math
+from operator import attrgetter
 
 from app.models.user import User, PersonalityProfile, DatingPreferences, UserPhoto
 from app.models.match import Match, MatchStatus, InterestLevel
 from app.core.database import get_db
+from app.core.pagination import encode_cursor, decode_seek_cursor
+from app.services.messaging_service import invalidate_mutual_connections_cache
+
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.0
+
+# Big Five traits compared by the discovery preview, with how strongly a
+# difference counts against the pair. Extraversion differences are
+# penalised less since some contrast there can be complementary.
+_PREVIEW_TRAITS = ("openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism")
+_TRAIT_DIFF_WEIGHTS = (1.0, 1.0, 0.7, 1.0, 1.0)
+_trait_vector = attrgetter(*_PREVIEW_TRAITS)
 
 
 class MatchService:
@@ -23,21 +37,26 @@ class MatchService:
         self,
         user_id: str,
         limit: int = 10,
-        offset: int = 0,
+        cursor: Optional[str] = None,
         filters: Optional[dict] = None
-    ) -> Tuple[List[dict], int]:
+    ) -> Tuple[List[dict], Optional[str]]:
         """
         Discover potential matches for a user.
         
         Args:
             user_id: ID of the user looking for matches
             limit: Maximum number of matches to return
-            offset: Number of matches to skip
+            cursor: Opaque cursor from the previous page, if any
             filters: Optional filters to apply
             
         Returns:
-            Tuple of (matches list, total count)
+            Tuple of (matches list, next page cursor)
+            
+        Raises:
+            ValueError: If the cursor is malformed
         """
+        after = decode_seek_cursor(cursor) if cursor else None
+        
         # Get the current user's preferences and profile
         current_user_query = select(User).options(
             selectinload(User.dating_preferences),
@@ -48,7 +67,7 @@ class MatchService:
         current_user = result.scalar_one_or_none()
         
         if not current_user:
-            return [], 0
+            return [], None
         
         # Build the base query for potential matches
         query = select(User).options(
@@ -59,21 +78,40 @@ class MatchService:
             User.id != user_id  # Only exclude self
         )
         
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await self.db.execute(count_query)
-        total_count = total_result.scalar()
-        
-        # Apply pagination and execute
-        query = query.offset(offset).limit(limit)
+        max_distance = (filters or {}).get('max_distance')
+        if max_distance and current_user.latitude is not None and current_user.longitude is not None:
+            query = query.where(*self._distance_filter(
+                current_user.latitude, current_user.longitude, max_distance
+            ))
+        
+        # Candidates sharing at least one of the requested interests; the
+        # array overlap is answered from the GIN index on users.interests
+        if filters and filters.get('interests'):
+            query = query.where(User.interests.overlap(filters['interests']))
+        
+        # Seek past the previous page and fetch one extra row to detect more
+        if after:
+            query = query.where(tuple_(User.created_at, User.id) < after)
+        query = query.order_by(User.created_at.desc(), User.id.desc()).limit(limit + 1)
         result = await self.db.execute(query)
         potential_matches = result.scalars().all()
         
+        next_cursor = None
+        if len(potential_matches) > limit:
+            potential_matches = potential_matches[:limit]
+            last = potential_matches[-1]
+            next_cursor = encode_cursor(last.created_at.isoformat(), str(last.id))
+        
         # Convert to response format with compatibility scores
+        current_traits = (
+            _trait_vector(current_user.personality_profile)
+            if current_user.personality_profile else None
+        )
+        current_interests = set(current_user.interests or ())
         matches = []
         for match_user in potential_matches:
-            compatibility_score = await self._calculate_compatibility_preview(
-                current_user, match_user
+            compatibility_score = self._calculate_compatibility_preview(
+                current_traits, match_user
             )
             
             # Get primary photo
@@ -93,8 +131,7 @@ class MatchService:
                    (today.month == match_user.date_of_birth.month and today.day < match_user.date_of_birth.day):
                     age -= 1
             
-            # Get shared interests (simplified for now)
-            shared_interests = await self._get_shared_interests(current_user, match_user)
+            shared_interests = self._get_shared_interests(current_interests, match_user)
             
             matches.append({
                 "user_id": str(match_user.id),
@@ -105,12 +142,12 @@ class MatchService:
                 "bio_preview": (match_user.bio[:100] + "...") if match_user.bio and len(match_user.bio) > 100 else (match_user.bio or "No bio available"),
                 "compatibility_preview": round(compatibility_score, 2),
                 "shared_interests": shared_interests,
-                "personality_highlights": await self._get_personality_highlights(match_user),
+                "personality_highlights": self._get_personality_highlights(match_user),
                 "is_online": self._is_user_online(match_user),
                 "mutual_connections": 0  # TODO: Implement mutual connections
             })
         
-        return matches, total_count
+        return matches, next_cursor
     
     async def like_user(self, user_id: str, target_user_id: str) -> dict:
         """
@@ -127,15 +164,7 @@ class MatchService:
         from app.services.notification_service import NotificationService
         
         # Check if match already exists
-        existing_match_query = select(Match).where(
-            or_(
-                and_(Match.user1_id == user_id, Match.user2_id == target_user_id),
-                and_(Match.user1_id == target_user_id, Match.user2_id == user_id)
-            )
-        )
-        
-        result = await self.db.execute(existing_match_query)
-        existing_match = result.scalar_one_or_none()
+        existing_match = await self._get_pair_match(user_id, target_user_id)
         
         notification_service = NotificationService(self.db)
         
@@ -195,6 +224,9 @@ class MatchService:
         
         await self.db.commit()
         
+        if not existing_match:
+            await self._invalidate_mutual_connections(user_id, target_user_id)
+        
         return {
             "message": f"Liked user {target_user_id}",
             "is_mutual": is_mutual,
@@ -213,15 +245,7 @@ class MatchService:
             Dictionary with pass result
         """
         # Check if match already exists
-        existing_match_query = select(Match).where(
-            or_(
-                and_(Match.user1_id == user_id, Match.user2_id == target_user_id),
-                and_(Match.user1_id == target_user_id, Match.user2_id == user_id)
-            )
-        )
-        
-        result = await self.db.execute(existing_match_query)
-        existing_match = result.scalar_one_or_none()
+        existing_match = await self._get_pair_match(user_id, target_user_id)
         
         if existing_match:
             # Update existing match
@@ -244,26 +268,66 @@ class MatchService:
         
         await self.db.commit()
         
+        if not existing_match:
+            await self._invalidate_mutual_connections(user_id, target_user_id)
+        
         return {"message": f"Passed on user {target_user_id}"}
     
-    async def get_match_history(self, user_id: str) -> List[dict]:
+    async def _get_pair_match(self, user1_id: str, user2_id: str) -> Optional[Match]:
+        """Get the match row between two users, in either direction."""
+        # Built through lambda_stmt so the statement and its cache key are
+        # only constructed once; user IDs are extracted as bound parameters
+        query = lambda_stmt(lambda: select(Match).where(
+            or_(
+                and_(Match.user1_id == user1_id, Match.user2_id == user2_id),
+                and_(Match.user1_id == user2_id, Match.user2_id == user1_id)
+            )
+        ))
+        
+        result = await self.db.execute(query)
+        return result.scalar_one_or_none()
+    
+    async def get_match_history_version(self, user_id: str) -> Tuple[int, Optional[datetime]]:
+        """Cheap version marker for a user's mutual match history."""
+        query = select(func.count(Match.id), func.max(Match.updated_at)).where(
+            and_(
+                or_(Match.user1_id == user_id, Match.user2_id == user_id),
+                Match.status == MatchStatus.MUTUAL
+            )
+        )
+        result = await self.db.execute(query)
+        return tuple(result.one())
+    
+    async def get_match_history(
+        self,
+        user_id: str,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[dict]:
         """
         Get user's match history.
         
         Args:
             user_id: ID of the user
+            limit: Maximum number of matches to return
+            offset: Number of matches to skip
             
         Returns:
             List of match history items
         """
-        query = select(Match).options(
-            selectinload(Match.user1).selectinload(User.photos),
-            selectinload(Match.user2).selectinload(User.photos)
-        ).where(
+        # Paginate over match IDs only, then load users and photos for the page
+        page_ids = select(Match.id).where(
             and_(
                 or_(Match.user1_id == user_id, Match.user2_id == user_id),
                 Match.status == MatchStatus.MUTUAL
             )
+        ).order_by(Match.created_at.desc()).limit(limit).offset(offset)
+        
+        query = select(Match).options(
+            selectinload(Match.user1).selectinload(User.photos),
+            selectinload(Match.user2).selectinload(User.photos)
+        ).where(
+            Match.id.in_(page_ids.scalar_subquery())
         ).order_by(Match.created_at.desc())
         
         result = await self.db.execute(query)
@@ -298,35 +362,88 @@ class MatchService:
         
         return history
     
-    async def _calculate_compatibility_preview(self, user1: User, user2: User) -> float:
-        """Calculate a quick compatibility preview score."""
-        if not user1.personality_profile or not user2.personality_profile:
-            return 0.5  # Default neutral score
+    async def _invalidate_mutual_connections(self, user1_id: str, user2_id: str) -> None:
+        """
+        Drop cached mutual connections touched by a new match between two users.
         
-        p1 = user1.personality_profile
-        p2 = user2.personality_profile
+        The new match makes each user a mutual connection for the other's
+        existing partners, so those pairs are invalidated on both sides.
+        """
+        query = select(Match.user1_id, Match.user2_id).where(
+            or_(
+                Match.user1_id.in_([user1_id, user2_id]),
+                Match.user2_id.in_([user1_id, user2_id])
+            )
+        )
+        result = await self.db.execute(query)
         
-        # Simple compatibility calculation based on personality traits
-        # This is a simplified version - in production, use more sophisticated algorithms
-        trait_scores = []
+        partners = {str(user1_id): set(), str(user2_id): set()}
+        for match_user1_id, match_user2_id in result.all():
+            if str(match_user1_id) in partners:
+                partners[str(match_user1_id)].add(match_user2_id)
+            if str(match_user2_id) in partners:
+                partners[str(match_user2_id)].add(match_user1_id)
         
-        if p1.openness is not None and p2.openness is not None:
-            trait_scores.append(1 - abs(p1.openness - p2.openness))
+        invalidate_mutual_connections_cache(user1_id, list(partners[str(user2_id)]))
+        invalidate_mutual_connections_cache(user2_id, list(partners[str(user1_id)]))
+    
+    def _distance_filter(self, latitude: float, longitude: float, max_distance_km: float) -> list:
+        """
+        Build WHERE clauses limiting candidates to max_distance_km.
         
-        if p1.conscientiousness is not None and p2.conscientiousness is not None:
-            trait_scores.append(1 - abs(p1.conscientiousness - p2.conscientiousness))
+        A latitude/longitude bounding box comes first so the index on
+        (latitude, longitude) prunes rows before the great-circle distance
+        is evaluated on the survivors.
+        """
+        lat_delta = max_distance_km / KM_PER_DEGREE
+        clauses = [
+            User.latitude.between(latitude - lat_delta, latitude + lat_delta),
+            User.longitude.isnot(None),
+        ]
+        
+        # Longitude degrees shrink towards the poles; skip the box where it
+        # would wrap around the globe
+        lon_scale = math.cos(math.radians(latitude))
+        if lon_scale > 0:
+            lon_delta = max_distance_km / (KM_PER_DEGREE * lon_scale)
+            if lon_delta < 180 and abs(longitude) + lon_delta <= 180:
+                clauses.append(User.longitude.between(longitude - lon_delta, longitude + lon_delta))
+        
+        # Spherical law of cosines, clamped against rounding just above 1
+        lat1, lon1 = math.radians(latitude), math.radians(longitude)
+        cos_angle = (
+            math.sin(lat1) * func.sin(func.radians(User.latitude))
+            + math.cos(lat1) * func.cos(func.radians(User.latitude))
+            * func.cos(func.radians(User.longitude) - lon1)
+        )
+        clauses.append(EARTH_RADIUS_KM * func.acos(func.least(cos_angle, 1.0)) <= max_distance_km)
         
-        if p1.extraversion is not None and p2.extraversion is not None:
-            # For extraversion, some difference can be good (complementary)
-            diff = abs(p1.extraversion - p2.extraversion)
-            trait_scores.append(1 - (diff * 0.7))  # Reduce penalty for differences
+        return clauses
+    
+    def _calculate_compatibility_preview(
+        self,
+        traits: Optional[Tuple[Optional[float], ...]],
+        user: User
+    ) -> float:
+        """
+        Calculate a quick compatibility preview score.
         
-        if p1.agreeableness is not None and p2.agreeableness is not None:
-            trait_scores.append(1 - abs(p1.agreeableness - p2.agreeableness))
+        Args:
+            traits: Trait vector of the viewing user, from _trait_vector
+            user: Candidate user with personality_profile loaded
+        """
+        if traits is None or not user.personality_profile:
+            return 0.5  # Default neutral score
         
-        if p1.neuroticism is not None and p2.neuroticism is not None:
-            # Lower neuroticism difference is better
-            trait_scores.append(1 - abs(p1.neuroticism - p2.neuroticism))
+        # Simple compatibility calculation based on personality traits
+        # This is a simplified version - in production, use more sophisticated algorithms
+        trait_scores = [
+            1 - abs(mine - theirs) * weight
+            for mine, theirs, weight in zip(
+                traits, _trait_vector(user.personality_profile), _TRAIT_DIFF_WEIGHTS
+            )
+            if mine is not None and theirs is not None
+        ]
         
         if trait_scores:
             return sum(trait_scores) / len(trait_scores)
@@ -339,13 +456,11 @@ class MatchService:
         # For now, return a placeholder
         return 0.85
     
-    async def _get_shared_interests(self, user1: User, user2: User) -> List[str]:
-        """Get shared interests between two users."""
-        # This would analyze user profiles, preferences, and other data
-        # For now, return placeholder interests
-        return ["music", "travel", "fitness"]
+    def _get_shared_interests(self, interests: set, user: User) -> List[str]:
+        """Get a candidate's interests that the viewing user also has."""
+        return [interest for interest in user.interests or () if interest in interests]
     
-    async def _get_personality_highlights(self, user: User) -> List[str]:
+    def _get_personality_highlights(self, user: User) -> List[str]:
         """Get personality highlights for a user."""
         if not user.personality_profile:
             return []
@@ -3,20 +3,73 @@ Messaging service for direct communication between matched users.
 """
 from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, desc
+from sqlalchemy import select, lambda_stmt, update, case, and_, or_, func, desc, tuple_
 from sqlalchemy.orm import selectinload
 from datetime import datetime
+from uuid import UUID
 import logging
 
+import orjson
+
 from app.models.message import DirectMessage, Conversation, ProfileView, MutualConnection
 from app.models.user import User
 from app.models.match import Match
 from app.services.notification_service import NotificationService
+from app.services.profile_view_buffer import buffer_profile_view
 from app.models.notification import NotificationType
+from app.models.redis_models import (
+    get_cached_json, set_cached_json, delete_cached_json,
+    get_cached_json_field, set_cached_json_field
+)
+from app.core.pagination import encode_cursor, decode_seek_cursor
+from app.core.exceptions import InvalidRequestError, PermissionDeniedError
 
 logger = logging.getLogger(__name__)
 
 
+MUTUAL_CONNECTIONS_CACHE_TTL_SECONDS = 300
+CONVERSATIONS_CACHE_TTL_SECONDS = 60
+
+# Only display names are read from senders and conversation partners
+_NAME_COLUMNS = (User.id, User.first_name, User.last_name)
+
+
+def mutual_connections_cache_key(user1_id: Any, user2_id: Any) -> str:
+    """
+    Redis key of the cached mutual connections seen by user1 for user2.
+    
+    Not symmetric: the result lists user1's side of each mutual match.
+    """
+    return f"mc:{user1_id}:{user2_id}"
+
+
+def invalidate_mutual_connections_cache(user_id: Any, other_user_ids: List[Any]) -> None:
+    """Drop cached mutual connections between a user and others, both ways."""
+    delete_cached_json(*(
+        key
+        for other_user_id in other_user_ids
+        for key in (
+            mutual_connections_cache_key(user_id, other_user_id),
+            mutual_connections_cache_key(other_user_id, user_id),
+        )
+    ))
+
+
+def conversations_cache_key(user_id: Any) -> str:
+    """
+    Redis hash holding a user's cached first conversation pages.
+    
+    One field per (include_archived, limit) combination, so a single DEL
+    drops them all.
+    """
+    return f"conv:{user_id}"
+
+
+def invalidate_conversations_cache(*user_ids: Any) -> None:
+    """Drop the cached conversation lists of the given users."""
+    delete_cached_json(*(conversations_cache_key(user_id) for user_id in user_ids))
+
+
 class MessagingService:
     """Service for managing direct messages and conversations."""
     
@@ -46,16 +99,19 @@ class MessagingService:
             
         Returns:
             Created message
+            
+        Raises:
+            InvalidRequestError: If the users are not matched or the sender is blocked
         """
         # Verify users are matched
         match = await self._get_match(sender_id, recipient_id)
         if not match:
-            raise ValueError("Users are not matched")
+            raise InvalidRequestError("Users are not matched")
         
         # Check if sender is blocked by recipient
         is_blocked = await self.notification_service._is_user_blocked(sender_id, recipient_id)
         if is_blocked:
-            raise ValueError("Cannot send message to this user")
+            raise InvalidRequestError("Cannot send message to this user")
         
         # Create message
         message = DirectMessage(
@@ -77,6 +133,9 @@ class MessagingService:
         await self.db.commit()
         await self.db.refresh(message)
         
+        # Both participants' lists now show a new last message
+        invalidate_conversations_cache(sender_id, recipient_id)
+        
         # Send notification to recipient
         await self._notify_new_message(sender_id, recipient_id, content)
         
@@ -87,23 +146,59 @@ class MessagingService:
         user_id: str,
         include_archived: bool = False,
         limit: int = 20,
-        offset: int = 0
-    ) -> List[Dict[str, Any]]:
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
         """
-        Get user's conversations.
+        Get user's conversations, most recently active first.
         
         Args:
             user_id: ID of the user
             include_archived: Whether to include archived conversations
             limit: Maximum number of conversations to return
-            offset: Number of conversations to skip
+            cursor: Opaque cursor from the previous page, if any
             
         Returns:
-            List of conversations with metadata
+            Tuple of (conversations with metadata, next page cursor)
+            
+        Raises:
+            InvalidRequestError: If the cursor is malformed
         """
+        if cursor:
+            return await self._load_conversations(user_id, include_archived, limit, cursor)
+        
+        # First pages are served from Redis until a write invalidates them
+        cache_key = conversations_cache_key(user_id)
+        cache_field = f"{int(include_archived)}:{limit}"
+        cached = get_cached_json_field(cache_key, cache_field)
+        if cached is not None:
+            page = orjson.loads(cached)
+            return page["conversations"], page["next_cursor"]
+        
+        conversations, next_cursor = await self._load_conversations(
+            user_id, include_archived, limit, None
+        )
+        set_cached_json_field(
+            cache_key,
+            cache_field,
+            orjson.dumps({"conversations": conversations, "next_cursor": next_cursor}),
+            CONVERSATIONS_CACHE_TTL_SECONDS
+        )
+        return conversations, next_cursor
+    
+    async def _load_conversations(
+        self,
+        user_id: str,
+        include_archived: bool,
+        limit: int,
+        cursor: Optional[str]
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Query and format one page of a user's conversations."""
+        # Conversations without messages yet sort by when they were opened
+        activity_at = func.coalesce(Conversation.last_message_at, Conversation.created_at)
+        
         query = select(Conversation).options(
-            selectinload(Conversation.user1),
-            selectinload(Conversation.user2),
+            selectinload(Conversation.user1).load_only(*_NAME_COLUMNS),
+            selectinload(Conversation.user2).load_only(*_NAME_COLUMNS),
             selectinload(Conversation.last_message)
         ).where(
             or_(
@@ -120,11 +215,23 @@ class MessagingService:
                 )
             )
         
-        query = query.order_by(desc(Conversation.last_message_at)).offset(offset).limit(limit)
+        if cursor:
+            query = query.where(tuple_(activity_at, Conversation.id) < decode_seek_cursor(cursor))
+        
+        # Fetch one extra row to know whether another page follows
+        query = query.order_by(desc(activity_at), desc(Conversation.id)).limit(limit + 1)
         
         result = await self.db.execute(query)
         conversations = result.scalars().all()
         
+        next_cursor = None
+        if len(conversations) > limit:
+            conversations = conversations[:limit]
+            last = conversations[-1]
+            next_cursor = encode_cursor(
+                (last.last_message_at or last.created_at).isoformat(), str(last.id)
+            )
+        
         # Format conversations
         formatted_conversations = []
         for conv in conversations:
@@ -151,7 +258,24 @@ class MessagingService:
                 "created_at": conv.created_at.isoformat()
             })
         
-        return formatted_conversations
+        return formatted_conversations, next_cursor
+    
+    async def get_conversations_version(self, user_id: str) -> Tuple[int, Optional[datetime]]:
+        """
+        Cheap version marker for a user's conversation list.
+        
+        Any new message, flag change or read receipt bumps updated_at on
+        the conversation row, so (count, latest updated_at) changes
+        whenever the list would.
+        """
+        query = select(func.count(Conversation.id), func.max(Conversation.updated_at)).where(
+            or_(
+                Conversation.user1_id == user_id,
+                Conversation.user2_id == user_id
+            )
+        )
+        result = await self.db.execute(query)
+        return tuple(result.one())
     
     async def get_messages(
         self,
@@ -171,15 +295,17 @@ class MessagingService:
             
         Returns:
             List of messages
+            
+        Raises:
+            PermissionDeniedError: If the user is not part of the match
         """
         # Verify user is part of the match
         match = await self._get_match_by_id(match_id)
         if not match or (str(match.user1_id) != user_id and str(match.user2_id) != user_id):
-            raise ValueError("User is not part of this match")
+            raise PermissionDeniedError("User is not part of this match")
         
-        query = select(DirectMessage).options(
-            selectinload(DirectMessage.sender)
-        ).where(
+        # Paginate over message IDs only, then load full rows for the page
+        page_ids = select(DirectMessage.id).where(
             and_(
                 DirectMessage.match_id == match_id,
                 DirectMessage.is_deleted == False
@@ -188,20 +314,26 @@ class MessagingService:
         
         if before_message_id:
             # Get messages before a specific message (for pagination)
-            before_message_query = select(DirectMessage).where(DirectMessage.id == before_message_id)
-            result = await self.db.execute(before_message_query)
-            before_message = result.scalar_one_or_none()
-            
-            if before_message:
-                query = query.where(DirectMessage.created_at < before_message.created_at)
+            before_created_at = select(DirectMessage.created_at).where(
+                DirectMessage.id == before_message_id
+            ).scalar_subquery()
+            page_ids = page_ids.where(
+                or_(before_created_at.is_(None), DirectMessage.created_at < before_created_at)
+            )
         
-        query = query.order_by(desc(DirectMessage.created_at)).limit(limit)
+        page_ids = page_ids.order_by(desc(DirectMessage.created_at)).limit(limit)
+        
+        query = select(DirectMessage).options(
+            selectinload(DirectMessage.sender).load_only(*_NAME_COLUMNS)
+        ).where(
+            DirectMessage.id.in_(page_ids.scalar_subquery())
+        ).order_by(desc(DirectMessage.created_at))
         
         result = await self.db.execute(query)
         messages = result.scalars().all()
         
         # Mark messages as read
-        await self._mark_messages_read(user_id, match_id)
+        await self.update_conversation(user_id, match_id, mark_read=True)
         
         # Format messages
         formatted_messages = []
@@ -219,84 +351,78 @@ class MessagingService:
         
         return formatted_messages
     
-    async def mark_conversation_read(self, user_id: str, match_id: str) -> bool:
-        """Mark all messages in a conversation as read."""
-        return await self._mark_messages_read(user_id, match_id)
-    
-    async def archive_conversation(self, user_id: str, match_id: str) -> bool:
-        """Archive a conversation for a user."""
-        query = select(Conversation).where(Conversation.match_id == match_id)
-        result = await self.db.execute(query)
-        conversation = result.scalar_one_or_none()
-        
-        if not conversation:
-            return False
-        
-        if str(conversation.user1_id) == user_id:
-            conversation.is_archived_by_user1 = True
-        elif str(conversation.user2_id) == user_id:
-            conversation.is_archived_by_user2 = True
-        else:
-            return False
-        
-        await self.db.commit()
-        return True
-    
-    async def unarchive_conversation(self, user_id: str, match_id: str) -> bool:
-        """Unarchive a conversation for a user."""
-        query = select(Conversation).where(Conversation.match_id == match_id)
-        result = await self.db.execute(query)
-        conversation = result.scalar_one_or_none()
-        
-        if not conversation:
-            return False
+    async def update_conversation(
+        self,
+        user_id: str,
+        match_id: str,
+        is_archived: Optional[bool] = None,
+        is_muted: Optional[bool] = None,
+        mark_read: bool = False
+    ) -> bool:
+        """
+        Update a user's conversation flags in a single statement.
         
-        if str(conversation.user1_id) == user_id:
-            conversation.is_archived_by_user1 = False
-        elif str(conversation.user2_id) == user_id:
-            conversation.is_archived_by_user2 = False
-        else:
-            return False
+        Args:
+            user_id: ID of the user applying the changes
+            match_id: ID of the match the conversation belongs to
+            is_archived: New archived state, or None to leave it
+            is_muted: New muted state, or None to leave it
+            mark_read: Whether to mark the conversation as read
+            
+        Returns:
+            False if the user has no conversation for this match
+        """
+        is_user1 = Conversation.user1_id == user_id
+        
+        def for_user(column1, column2, value) -> dict:
+            # Set the caller's side of a per-user column pair, keep the other
+            return {
+                column1: case((is_user1, value), else_=column1),
+                column2: case((is_user1, column2), else_=value),
+            }
+        
+        values = {}
+        if is_archived is not None:
+            values.update(for_user(
+                Conversation.is_archived_by_user1, Conversation.is_archived_by_user2, is_archived
+            ))
+        if is_muted is not None:
+            values.update(for_user(
+                Conversation.is_muted_by_user1, Conversation.is_muted_by_user2, is_muted
+            ))
+        if mark_read:
+            values.update(for_user(
+                Conversation.user1_unread_count, Conversation.user2_unread_count, 0
+            ))
+            values.update(for_user(
+                Conversation.user1_last_read_at, Conversation.user2_last_read_at, func.now()
+            ))
+        
+        participant = and_(
+            Conversation.match_id == match_id,
+            or_(Conversation.user1_id == user_id, Conversation.user2_id == user_id)
+        )
         
-        await self.db.commit()
-        return True
-    
-    async def mute_conversation(self, user_id: str, match_id: str) -> bool:
-        """Mute notifications for a conversation."""
-        query = select(Conversation).where(Conversation.match_id == match_id)
-        result = await self.db.execute(query)
-        conversation = result.scalar_one_or_none()
+        if not values:
+            result = await self.db.execute(select(Conversation.id).where(participant))
+            return result.first() is not None
         
-        if not conversation:
+        result = await self.db.execute(
+            update(Conversation)
+            .where(participant)
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
             return False
         
-        if str(conversation.user1_id) == user_id:
-            conversation.is_muted_by_user1 = True
-        elif str(conversation.user2_id) == user_id:
-            conversation.is_muted_by_user2 = True
-        else:
-            return False
+        if mark_read:
+            await self._mark_direct_messages_read(user_id, match_id)
         
         await self.db.commit()
-        return True
-    
-    async def unmute_conversation(self, user_id: str, match_id: str) -> bool:
-        """Unmute notifications for a conversation."""
-        query = select(Conversation).where(Conversation.match_id == match_id)
-        result = await self.db.execute(query)
-        conversation = result.scalar_one_or_none()
-        
-        if not conversation:
-            return False
-        
-        if str(conversation.user1_id) == user_id:
-            conversation.is_muted_by_user1 = False
-        elif str(conversation.user2_id) == user_id:
-            conversation.is_muted_by_user2 = False
-        else:
-            return False
         
-        await self.db.commit()
+        # Flags and unread counts are per user, so only this user's list changed
+        invalidate_conversations_cache(user_id)
         return True
     
     async def delete_message(self, user_id: str, message_id: str) -> bool:
@@ -313,29 +439,23 @@ class MessagingService:
         await self.db.commit()
         return True
     
-    async def record_profile_view(
+    def record_profile_view(
         self,
-        viewer_id: str,
-        viewed_user_id: str,
+        viewer_id: UUID,
+        viewed_user_id: UUID,
         source: str = "discover",
         duration_seconds: Optional[int] = None
-    ) -> ProfileView:
-        """Record a profile view for social features."""
-        view = ProfileView(
-            viewer_id=viewer_id,
-            viewed_user_id=viewed_user_id,
-            source=source,
-            view_duration_seconds=duration_seconds
-        )
+    ) -> None:
+        """
+        Record a profile view for social features.
         
-        self.db.add(view)
-        await self.db.commit()
-        await self.db.refresh(view)
+        Views are buffered and written in batches in the background, so this
+        returns before the row exists.
+        """
+        buffer_profile_view(viewer_id, viewed_user_id, source, duration_seconds)
         
         # Optionally notify the viewed user
         # await self.notification_service.create_notification(...)
-        
-        return view
     
     async def get_profile_views(
         self,
@@ -372,6 +492,11 @@ class MessagingService:
         user2_id: str
     ) -> Dict[str, Any]:
         """Get mutual connections between two users."""
+        cache_key = mutual_connections_cache_key(user1_id, user2_id)
+        cached = get_cached_json(cache_key)
+        if cached is not None:
+            return orjson.loads(cached)
+        
         # Find mutual matches
         query = select(Match).where(
             or_(
@@ -387,26 +512,30 @@ class MessagingService:
         result = await self.db.execute(query)
         mutual_matches = result.scalars().all()
         
-        return {
+        connections = {
             "count": len(mutual_matches),
             "mutual_match_ids": [str(match.id) for match in mutual_matches]
         }
+        set_cached_json(cache_key, orjson.dumps(connections), MUTUAL_CONNECTIONS_CACHE_TTL_SECONDS)
+        return connections
     
     async def _get_match(self, user1_id: str, user2_id: str) -> Optional[Match]:
         """Get match between two users."""
-        query = select(Match).where(
+        # lambda_stmt caches statement construction for these per-message
+        # lookups; the IDs are extracted as bound parameters
+        query = lambda_stmt(lambda: select(Match).where(
             or_(
                 and_(Match.user1_id == user1_id, Match.user2_id == user2_id),
                 and_(Match.user1_id == user2_id, Match.user2_id == user1_id)
             )
-        )
+        ))
         
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
     
     async def _get_match_by_id(self, match_id: str) -> Optional[Match]:
         """Get match by ID."""
-        query = select(Match).where(Match.id == match_id)
+        query = lambda_stmt(lambda: select(Match).where(Match.id == match_id))
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
     
@@ -418,7 +547,7 @@ class MessagingService:
         message: DirectMessage
     ):
         """Update or create conversation metadata."""
-        query = select(Conversation).where(Conversation.match_id == match_id)
+        query = lambda_stmt(lambda: select(Conversation).where(Conversation.match_id == match_id))
         result = await self.db.execute(query)
         conversation = result.scalar_one_or_none()
         
@@ -448,40 +577,20 @@ class MessagingService:
         
         await self.db.flush()
     
-    async def _mark_messages_read(self, user_id: str, match_id: str) -> bool:
-        """Mark all unread messages in a conversation as read."""
-        # Get unread messages
-        query = select(DirectMessage).where(
-            and_(
+    async def _mark_direct_messages_read(self, user_id: str, match_id: str) -> None:
+        """Flag the user's unread messages in a match as read, without committing."""
+        await self.db.execute(
+            update(DirectMessage)
+            .where(
                 DirectMessage.match_id == match_id,
                 DirectMessage.recipient_id == user_id,
                 DirectMessage.is_read == False
             )
+            .values(is_read=True, read_at=datetime.utcnow())
+            # Keeps already-loaded messages (e.g. the page get_messages
+            # just fetched) in sync; uses RETURNING where supported
+            .execution_options(synchronize_session="fetch")
         )
-        
-        result = await self.db.execute(query)
-        messages = result.scalars().all()
-        
-        # Mark as read
-        for message in messages:
-            message.is_read = True
-            message.read_at = datetime.utcnow()
-        
-        # Update conversation unread count
-        conv_query = select(Conversation).where(Conversation.match_id == match_id)
-        result = await self.db.execute(conv_query)
-        conversation = result.scalar_one_or_none()
-        
-        if conversation:
-            if str(conversation.user1_id) == user_id:
-                conversation.user1_unread_count = 0
-                conversation.user1_last_read_at = datetime.utcnow()
-            else:
-                conversation.user2_unread_count = 0
-                conversation.user2_last_read_at = datetime.utcnow()
-        
-        await self.db.commit()
-        return True
     
     async def _notify_new_message(self, sender_id: str, recipient_id: str, content: str):
         """Send notification for new message."""
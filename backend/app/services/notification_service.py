@@ -1,25 +1,62 @@
 """
 Notification service for managing user notifications.
 """
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, desc
+from sqlalchemy import select, update, lambda_stmt, and_, or_, func, desc, null
 from sqlalchemy.orm import selectinload
 from datetime import datetime, timedelta
+from uuid import UUID
 import asyncio
 import logging
 
+import orjson
+
 from app.models.notification import (
     Notification, NotificationPreference, NotificationType, 
     NotificationChannel, UserBlock, UserReport
 )
 from app.models.user import User
 from app.models.match import Match
+from app.core.database import AsyncSessionLocal
+from app.models.redis_models import get_cached_json, set_cached_json, delete_cached_json
 from app.services.email_service import email_service
 
 logger = logging.getLogger(__name__)
 
 
+UNREAD_COUNT_CACHE_TTL_SECONDS = 30
+NOTIFICATION_STREAM_BATCH_SIZE = 50
+
+# Columns read from the related user when listing notifications
+_RELATED_USER_COLUMNS = (User.id, User.first_name, User.last_name)
+
+
+def unread_count_cache_key(user_id: Any) -> str:
+    """Redis key of a user's cached unread notification count."""
+    return f"notif:unread:{user_id}"
+
+
+def invalidate_unread_count_cache(user_id: Any) -> None:
+    """Drop a user's cached unread notification count."""
+    delete_cached_json(unread_count_cache_key(user_id))
+
+
+async def send_report_alert(report_id: UUID, reporter_id: UUID, reported_id: UUID, category: str):
+    """
+    Alert moderators about a report outside the request that filed it.
+    
+    Runs after the response is sent, so it opens its own session.
+    """
+    try:
+        async with AsyncSessionLocal() as session:
+            await NotificationService(session).notify_report_filed(
+                report_id, reporter_id, reported_id, category
+            )
+    except Exception as e:
+        logger.error(f"Failed to send alert for report {report_id}: {e}")
+
+
 class NotificationService:
     """Service for managing notifications and social interactions."""
     
@@ -88,34 +125,51 @@ class NotificationService:
         self.db.add(notification)
         await self.db.commit()
         await self.db.refresh(notification)
+        invalidate_unread_count_cache(user_id)
+        await self._push_unread_count(user_id)
         
         # Schedule delivery
         await self._deliver_notification(notification, preferences)
         
         return notification
     
-    async def get_user_notifications(
+    async def stream_user_notifications(
         self,
-        user_id: str,
+        user_id: UUID,
         limit: int = 20,
         offset: int = 0,
-        unread_only: bool = False
-    ) -> List[Notification]:
+        unread_only: bool = False,
+        before_id: Optional[UUID] = None
+    ) -> AsyncIterator[Tuple[Notification, int]]:
         """
-        Get notifications for a user.
+        Stream a page of notifications for a user with their unread count.
+        
+        Rows are read from a server-side cursor in batches, so a page is
+        never held in memory as a whole.
         
         Args:
             user_id: ID of the user
             limit: Maximum number of notifications to return
             offset: Number of notifications to skip
             unread_only: Whether to return only unread notifications
+            before_id: Only return notifications older than this one (for
+                keyset pagination)
             
-        Returns:
-            List of notifications
+        Yields:
+            Tuples of (notification, unread notification count); the count
+            is the same on every row, or None when paging with before_id
         """
-        query = select(Notification).options(
-            selectinload(Notification.related_user),
-            selectinload(Notification.related_match)
+        # Counted over every matching row before LIMIT/OFFSET, so the page
+        # and the unread badge come back in one round trip. A keyset page
+        # only matches older rows, so the count is left to the caller there
+        if before_id:
+            unread_count = null()
+        else:
+            unread_count = func.count().filter(Notification.is_read == False).over()
+        
+        # Callers only render the related user's name; the match is not shown
+        query = select(Notification, unread_count).options(
+            selectinload(Notification.related_user).load_only(*_RELATED_USER_COLUMNS)
         ).where(
             and_(
                 Notification.user_id == user_id,
@@ -129,12 +183,24 @@ class NotificationService:
         if unread_only:
             query = query.where(Notification.is_read == False)
         
+        if before_id:
+            # Seek past the last notification of the previous page
+            before_created_at = select(Notification.created_at).where(
+                Notification.id == before_id
+            ).scalar_subquery()
+            query = query.where(
+                or_(before_created_at.is_(None), Notification.created_at < before_created_at)
+            )
+        
         query = query.order_by(desc(Notification.created_at)).offset(offset).limit(limit)
         
-        result = await self.db.execute(query)
-        return result.scalars().all()
+        result = await self.db.stream(
+            query.execution_options(yield_per=NOTIFICATION_STREAM_BATCH_SIZE)
+        )
+        async for notification, count in result:
+            yield notification, count
     
-    async def mark_notification_read(self, notification_id: str, user_id: str) -> bool:
+    async def mark_notification_read(self, notification_id: UUID, user_id: UUID) -> bool:
         """
         Mark a notification as read.
         
@@ -145,25 +211,46 @@ class NotificationService:
         Returns:
             True if successful, False otherwise
         """
-        query = select(Notification).where(
-            and_(
-                Notification.id == notification_id,
-                Notification.user_id == user_id
+        return bool(await self.mark_notifications_read([notification_id], user_id))
+    
+    async def mark_notifications_read(self, notification_ids: List[UUID], user_id: UUID) -> List[UUID]:
+        """
+        Mark several of a user's notifications as read in one statement.
+        
+        Args:
+            notification_ids: IDs of the notifications
+            user_id: ID of the user (for security)
+            
+        Returns:
+            IDs of the notifications that were unread and are now read
+        """
+        if not notification_ids:
+            return []
+        
+        stmt = (
+            update(Notification)
+            .where(
+                and_(
+                    Notification.id.in_(notification_ids),
+                    Notification.user_id == user_id,
+                    Notification.is_read == False
+                )
             )
+            .values(is_read=True, read_at=func.now())
+            .returning(Notification.id)
+            .execution_options(synchronize_session=False)
         )
         
-        result = await self.db.execute(query)
-        notification = result.scalar_one_or_none()
-        
-        if notification and not notification.is_read:
-            notification.is_read = True
-            notification.read_at = datetime.utcnow()
-            await self.db.commit()
-            return True
+        result = await self.db.execute(stmt)
+        marked_ids = list(result.scalars())
+        await self.db.commit()
         
-        return False
+        if marked_ids:
+            invalidate_unread_count_cache(user_id)
+            await self._push_unread_count(user_id)
+        return marked_ids
     
-    async def mark_all_notifications_read(self, user_id: str) -> int:
+    async def mark_all_notifications_read(self, user_id: UUID) -> int:
         """
         Mark all notifications as read for a user.
         
@@ -173,23 +260,26 @@ class NotificationService:
         Returns:
             Number of notifications marked as read
         """
-        query = select(Notification).where(
-            and_(
-                Notification.user_id == user_id,
-                Notification.is_read == False
+        # One UPDATE regardless of how many notifications are unread
+        stmt = (
+            update(Notification)
+            .where(
+                and_(
+                    Notification.user_id == user_id,
+                    Notification.is_read == False
+                )
             )
+            .values(is_read=True, read_at=func.now())
+            .returning(Notification.id)
+            .execution_options(synchronize_session=False)
         )
         
-        result = await self.db.execute(query)
-        notifications = result.scalars().all()
-        
-        count = 0
-        for notification in notifications:
-            notification.is_read = True
-            notification.read_at = datetime.utcnow()
-            count += 1
+        result = await self.db.execute(stmt)
+        count = len(result.fetchall())
         
         await self.db.commit()
+        invalidate_unread_count_cache(user_id)
+        await self._push_unread_count(user_id, 0)
         return count
     
     async def get_unread_count(self, user_id: str) -> int:
@@ -202,21 +292,34 @@ class NotificationService:
         Returns:
             Number of unread notifications
         """
-        query = select(func.count()).where(
+        # Polled constantly by clients, so served from Redis between writes
+        cache_key = unread_count_cache_key(user_id)
+        cached = get_cached_json(cache_key)
+        if cached is not None:
+            return orjson.loads(cached)
+        
+        # lambda_stmt caches statement construction for this polled query.
+        # The timestamp is taken outside the lambda so it is bound per call
+        # rather than frozen into the cached statement
+        now = datetime.utcnow()
+        query = lambda_stmt(lambda: select(func.count()).where(
             and_(
                 Notification.user_id == user_id,
                 Notification.is_read == False,
                 or_(
                     Notification.expires_at.is_(None),
-                    Notification.expires_at > datetime.utcnow()
+                    Notification.expires_at > now
                 )
             )
-        )
+        ))
         
         result = await self.db.execute(query)
-        return result.scalar()
+        count = result.scalar()
+        
+        set_cached_json(cache_key, orjson.dumps(count), UNREAD_COUNT_CACHE_TTL_SECONDS)
+        return count
     
-    async def block_user(self, blocker_id: str, blocked_id: str, reason: str = None, notes: str = None) -> bool:
+    async def block_user(self, blocker_id: UUID, blocked_id: UUID, reason: str = None, notes: str = None) -> bool:
         """
         Block a user.
         
@@ -254,7 +357,7 @@ class NotificationService:
         
         return True
     
-    async def unblock_user(self, blocker_id: str, blocked_id: str) -> bool:
+    async def unblock_user(self, blocker_id: UUID, blocked_id: UUID) -> bool:
         """
         Unblock a user.
         
@@ -284,8 +387,8 @@ class NotificationService:
     
     async def report_user(
         self,
-        reporter_id: str,
-        reported_id: str,
+        reporter_id: UUID,
+        reported_id: UUID,
         category: str,
         description: str,
         evidence: Optional[Dict[str, Any]] = None
@@ -301,7 +404,8 @@ class NotificationService:
             evidence: Evidence supporting the report
             
         Returns:
-            Created report
+            Created report; moderators are alerted separately through
+            notify_report_filed
         """
         report = UserReport(
             reporter_id=reporter_id,
@@ -315,6 +419,10 @@ class NotificationService:
         await self.db.commit()
         await self.db.refresh(report)
         
+        return report
+    
+    async def notify_report_filed(self, report_id: UUID, reporter_id: UUID, reported_id: UUID, category: str):
+        """Alert moderators about a new user report."""
         # Create notification for admins (simplified - in production, use proper admin notification system)
         await self.create_notification(
             user_id=reported_id,  # This would be admin user ID in production
@@ -322,12 +430,10 @@ class NotificationService:
             title="New User Report",
             message=f"User reported for {category}",
             related_user_id=reporter_id,
-            data={"report_id": str(report.id), "category": category}
+            data={"report_id": str(report_id), "category": category}
         )
-        
-        return report
     
-    async def get_blocked_users(self, user_id: str) -> List[Dict[str, Any]]:
+    async def get_blocked_users(self, user_id: UUID) -> List[Dict[str, Any]]:
         """
         Get list of users blocked by a user.
         
@@ -335,7 +441,7 @@ class NotificationService:
             user_id: ID of the user
             
         Returns:
-            List of blocked users
+            List of blocked users shaped like the BlockedUser response
         """
         query = select(UserBlock).options(
             selectinload(UserBlock.blocked)
@@ -347,7 +453,7 @@ class NotificationService:
         blocked_users = []
         for block in blocks:
             blocked_users.append({
-                "id": str(block.blocked.id),
+                "id": block.blocked.id,
                 "name": f"{block.blocked.first_name} {block.blocked.last_name}",
                 "reason": block.reason,
                 "blocked_at": block.created_at.isoformat()
@@ -357,21 +463,21 @@ class NotificationService:
     
     async def _is_user_blocked(self, user_id: str, other_user_id: str) -> bool:
         """Check if a user is blocked by another user."""
-        query = select(UserBlock).where(
+        query = lambda_stmt(lambda: select(UserBlock).where(
             and_(
                 UserBlock.blocker_id == other_user_id,
                 UserBlock.blocked_id == user_id
             )
-        )
+        ))
         
         result = await self.db.execute(query)
         return result.scalar_one_or_none() is not None
     
     async def _get_user_preferences(self, user_id: str) -> Optional[NotificationPreference]:
         """Get user's notification preferences."""
-        query = select(NotificationPreference).where(
+        query = lambda_stmt(lambda: select(NotificationPreference).where(
             NotificationPreference.user_id == user_id
-        )
+        ))
         
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
@@ -399,6 +505,18 @@ class NotificationService:
         
         return True
     
+    async def _push_unread_count(self, user_id: Any, unread_count: Optional[int] = None):
+        """Send the new unread count to the user's notification socket, if open."""
+        from app.websocket.manager import manager, send_unread_count
+        
+        user_id = str(user_id)
+        if not await manager.is_user_online(user_id):
+            return
+        
+        if unread_count is None:
+            unread_count = await self.get_unread_count(user_id)
+        await send_unread_count(user_id, unread_count)
+    
     async def _deliver_notification(
         self,
         notification: Notification,
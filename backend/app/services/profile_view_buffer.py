@@ -0,0 +1,149 @@
+"""
+Buffered profile view recording.
+
+Profile cards report a view on every render, so views are queued in memory
+and written in batches by a background task instead of one INSERT and
+commit per request.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal
+from app.models.message import ProfileView
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+PROFILE_VIEW_BATCH_SIZE = 500
+PROFILE_VIEW_FLUSH_INTERVAL_SECONDS = 1.0
+# Views beyond this are dropped rather than growing memory without bound
+PROFILE_VIEW_BUFFER_MAX_SIZE = 10000
+
+_view_buffer: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=PROFILE_VIEW_BUFFER_MAX_SIZE)
+_flush_task: Optional[asyncio.Task] = None
+_flushing = False
+
+
+def buffer_profile_view(
+    viewer_id: UUID,
+    viewed_user_id: UUID,
+    source: str = "discover",
+    duration_seconds: Optional[int] = None
+) -> None:
+    """Queue a profile view for the next batch insert."""
+    try:
+        _view_buffer.put_nowait({
+            "viewer_id": viewer_id,
+            "viewed_user_id": viewed_user_id,
+            "source": source,
+            "view_duration_seconds": duration_seconds,
+            "viewed_at": datetime.utcnow(),
+        })
+    except asyncio.QueueFull:
+        logger.warning("Profile view buffer full, dropping view")
+
+
+async def _next_batch() -> List[Dict[str, Any]]:
+    """Gather views until the batch fills or the flush interval elapses."""
+    batch: List[Dict[str, Any]] = []
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + PROFILE_VIEW_FLUSH_INTERVAL_SECONDS
+
+    while len(batch) < PROFILE_VIEW_BATCH_SIZE:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(_view_buffer.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+
+    return batch
+
+
+async def _known_user_views(session: AsyncSession, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop views naming a user that does not exist, which would fail the whole batch."""
+    user_ids = {view["viewer_id"] for view in batch} | {view["viewed_user_id"] for view in batch}
+    result = await session.execute(select(User.id).where(User.id.in_(user_ids)))
+    known_ids = set(result.scalars().all())
+
+    views = [
+        view for view in batch
+        if view["viewer_id"] in known_ids and view["viewed_user_id"] in known_ids
+    ]
+    if len(views) < len(batch):
+        logger.warning(f"Dropping {len(batch) - len(views)} profile views of unknown users")
+    return views
+
+
+async def _write_views_one_by_one(session: AsyncSession, views: List[Dict[str, Any]]) -> None:
+    """Insert views one at a time so a bad row only loses itself."""
+    failed = 0
+    for view in views:
+        try:
+            await session.execute(insert(ProfileView), [view])
+            await session.commit()
+        except DBAPIError:
+            await session.rollback()
+            failed += 1
+
+    if failed:
+        logger.error(f"Failed to write {failed} of {len(views)} profile views")
+
+
+async def _write_views(batch: List[Dict[str, Any]]) -> None:
+    """
+    Insert a batch of views in one executemany round trip.
+
+    If the batch is rejected anyway, for instance because a user was deleted
+    meanwhile, the views are retried one by one rather than all lost.
+    """
+    if not batch:
+        return
+
+    try:
+        async with AsyncSessionLocal() as session:
+            views = await _known_user_views(session, batch)
+            if not views:
+                return
+
+            try:
+                await session.execute(insert(ProfileView), views)
+                await session.commit()
+            except DBAPIError as e:
+                await session.rollback()
+                logger.warning(f"Profile view batch rejected, retrying row by row: {e}")
+                await _write_views_one_by_one(session, views)
+    except Exception as e:
+        logger.error(f"Failed to write {len(batch)} profile views: {e}")
+
+
+async def _flush_views() -> None:
+    """Write buffered views in batches, draining the queue once stopped."""
+    while _flushing or not _view_buffer.empty():
+        await _write_views(await _next_batch())
+
+
+async def start_profile_view_flusher() -> None:
+    """Start the background task that writes buffered views."""
+    global _flush_task, _flushing
+    if _flush_task is None:
+        _flushing = True
+        _flush_task = asyncio.create_task(_flush_views())
+
+
+async def stop_profile_view_flusher() -> None:
+    """Stop the background task after it writes whatever is still queued."""
+    global _flush_task, _flushing
+    if _flush_task is not None:
+        _flushing = False
+        await _flush_task
+        _flush_task = None
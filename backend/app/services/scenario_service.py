@@ -15,9 +15,25 @@ from app.models.scenario import (
 )
 from app.models.user import User, PersonalityProfile
 from app.models.match import Match
+from app.services.compatibility_service import CompatibilityService
 from app.core.database import get_db
 
 
+# The library is a near-static catalog; an hour of staleness in ratings and
+# usage counts is acceptable
+SCENARIO_LIBRARY_CACHE_TTL_SECONDS = 3600
+
+
+def scenario_library_cache_key(
+    category: Optional[str],
+    difficulty: Optional[int],
+    cultural_context: Optional[str],
+    language: str
+) -> str:
+    """Redis key of the cached scenario library response for a set of filters."""
+    return f"v1:scenarios:library:{category}:{difficulty}:{cultural_context}:{language}"
+
+
 class ScenarioService:
     """Service for scenario management and simulation orchestration."""
     
@@ -381,6 +397,27 @@ class ScenarioService:
             ]
         }
     
+    async def user_can_access_session(self, session_id: str, user_id: Any) -> Optional[bool]:
+        """
+        Check whether a user is a participant of a simulation session.
+        
+        Reads a single boolean instead of hydrating the session, its
+        participants and its messages.
+        
+        Args:
+            session_id: Simulation session ID
+            user_id: ID of the user to check
+            
+        Returns:
+            Whether the user participates, or None if the session does not exist
+        """
+        result = await self.db.execute(
+            select(
+                or_(SimulationSession.user1_id == user_id, SimulationSession.user2_id == user_id)
+            ).where(SimulationSession.id == session_id)
+        )
+        return result.scalar_one_or_none()
+    
     async def add_simulation_message(
         self,
         session_id: str,
@@ -509,13 +546,33 @@ class ScenarioService:
         
         await self.db.commit()
         
-        return {
+        # Built before the refresh, since a rollback below expires the session
+        completion = {
             "session_id": str(session.id),
             "status": session.status.value,
             "duration_seconds": session.duration_seconds,
             "results": results,
             "completed_at": session.ended_at.isoformat()
         }
+        session_id, user1_id, user2_id = session.id, session.user1_id, session.user2_id
+        
+        # Refresh the pair's precomputed compatibility scores
+        compatibility_service = CompatibilityService(self.db)
+        try:
+            await compatibility_service.refresh_compatibility_scores(user1_id, user2_id)
+        except Exception as e:
+            print(f"Error refreshing compatibility scores for session {session_id}: {e}")
+            await self.db.rollback()
+            # The stored row no longer covers this simulation; without it,
+            # reads fall back to live computation
+            try:
+                await compatibility_service.delete_stored_compatibility_scores(user1_id, user2_id)
+                await self.db.commit()
+            except Exception as e:
+                await self.db.rollback()
+                print(f"Error dropping stale compatibility scores for session {session_id}: {e}")
+        
+        return completion
     
     def _get_cultural_adaptation(
         self,
@@ -1070,6 +1070,10 @@ async def websocket_notifications_endpoint(
             "timestamp": datetime.utcnow().isoformat()
         }, websocket)
         
+        # Seed the badge so the client can stop polling /unread-count
+        from app.services.notification_service import NotificationService
+        await send_unread_count(user_id, await NotificationService(db).get_unread_count(user_id))
+        
         # Keep connection alive and handle ping/pong
         while True:
             try:
@@ -1174,6 +1178,15 @@ async def send_match_notification(user_id: str, match_data: dict):
     await manager.broadcast_to_user(notification, user_id)
 
 
+async def send_unread_count(user_id: str, unread_count: int):
+    """Push a user's current unread notification count."""
+    await manager.broadcast_to_user({
+        "type": "unread_count",
+        "unread_count": unread_count,
+        "timestamp": datetime.utcnow().isoformat()
+    }, user_id)
+
+
 async def send_session_invitation(user_id: str, session_data: dict):
     """Send real-time session invitation to user."""
     invitation = {
@@ -3,6 +3,7 @@ FastAPI main application for AI Matchmaker web platform.
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import uvicorn
@@ -10,10 +11,12 @@ import logging
 
 from app.core.config import settings
 from app.core.database import init_db
+from app.core.exceptions import ServiceError, service_error_handler, unhandled_error_handler
 from app.core.ai_config import initialize_ai_services
 from app.api.v1.api import api_router
 from app.websocket.manager import router as websocket_router
 from app.websocket.events import start_websocket_events, stop_websocket_events
+from app.services.profile_view_buffer import start_profile_view_flusher, stop_profile_view_flusher
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +39,10 @@ async def lifespan(app: FastAPI):
     await start_websocket_events()
     logger.info("WebSocket events started")
     
+    # Start batched profile view writes
+    await start_profile_view_flusher()
+    logger.info("Profile view flusher started")
+    
     logger.info("Application startup complete")
     
     yield
@@ -43,6 +50,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down application...")
     await stop_websocket_events()
+    await stop_profile_view_flusher()
     logger.info("Application shutdown complete")
 
 
@@ -63,6 +71,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON bodies; level 4 keeps the CPU cost low
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=4)
+
+# Map typed service errors to HTTP responses, anything else to a generic 500
+app.add_exception_handler(ServiceError, service_error_handler)
+app.add_exception_handler(Exception, unhandled_error_handler)
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 app.include_router(websocket_router, prefix="/ws")
@@ -97,6 +97,22 @@ class TestJWTTokens:
         with pytest.raises(Exception):  # Should raise AuthenticationError
             verify_token(access_token, "refresh")
 
+    def test_verified_token_cache(self):
+        """Test verified tokens are cached without bypassing type checks."""
+        from app.core.security import _verified_tokens
+
+        user_id = str(uuid.uuid4())
+        token = create_access_token({"sub": user_id})
+
+        # First verification populates the cache, second is served from it
+        assert verify_token(token, "access")["sub"] == user_id
+        assert token in _verified_tokens
+        assert verify_token(token, "access")["sub"] == user_id
+
+        # Cached payloads still go through token type validation
+        with pytest.raises(Exception):
+            verify_token(token, "refresh")
+
 
 class TestUserSchemas:
     """Test user schemas validation."""
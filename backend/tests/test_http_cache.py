@@ -0,0 +1,90 @@
+"""
+Tests for HTTP caching helpers.
+"""
+import pytest
+from fastapi import Request
+
+from app.core.http_cache import (
+    cacheable_json_response, compute_etag, not_modified_response, version_etag
+)
+
+
+def _request(if_none_match=None) -> Request:
+    """Build a bare GET request, optionally revalidating."""
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class TestEtags:
+    """Test ETag generation."""
+
+    def test_compute_etag_is_strong_and_stable(self):
+        """Test the same body always hashes to the same quoted ETag."""
+        etag = compute_etag(b'{"a":1}')
+
+        assert etag.startswith('"') and etag.endswith('"')
+        assert compute_etag(b'{"a":1}') == etag
+        assert compute_etag(b'{"a":2}') != etag
+
+    def test_version_etag_tracks_parts(self):
+        """Test version ETags change when any marker changes."""
+        assert version_etag("user", 1) == version_etag("user", 1)
+        assert version_etag("user", 1) != version_etag("user", 2)
+
+
+class TestConditionalRequests:
+    """Test If-None-Match handling."""
+
+    @pytest.mark.parametrize("header", [
+        '"{etag}"',
+        'W/"{etag}"',
+        '"other", "{etag}"',
+        '"other",W/"{etag}"',
+        "*",
+    ])
+    def test_matching_etag_returns_304(self, header):
+        """Test strong, weak, listed and wildcard validators match."""
+        etag = compute_etag(b"body")
+        header = header.replace('"{etag}"', etag)
+
+        response = not_modified_response(_request(header), etag)
+
+        assert response is not None
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert "max-age" in response.headers["cache-control"]
+
+    @pytest.mark.parametrize("header", [None, "", '"other"', 'W/"other"'])
+    def test_other_etag_does_not_match(self, header):
+        """Test missing or stale validators are not answered with 304."""
+        assert not_modified_response(_request(header), compute_etag(b"body")) is None
+
+    def test_cacheable_response_sets_headers(self):
+        """Test a fresh request gets the body with validator headers."""
+        response = cacheable_json_response(_request(), '{"a":1}')
+
+        assert response.status_code == 200
+        assert response.body == b'{"a":1}'
+        assert response.headers["etag"] == compute_etag(b'{"a":1}')
+        assert response.headers["cache-control"] == "private, max-age=30"
+
+    def test_cacheable_response_revalidates(self):
+        """Test a revalidation with the current ETag gets an empty 304."""
+        payload = b'{"a":1}'
+        etag = compute_etag(payload)
+
+        response = cacheable_json_response(_request(etag), payload)
+
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == etag
+
+    def test_explicit_etag_is_used(self):
+        """Test a version ETag overrides the body hash."""
+        etag = version_etag("conversations", 3)
+
+        response = cacheable_json_response(_request(), b"[]", etag=etag)
+
+        assert response.headers["etag"] == etag
@@ -0,0 +1,74 @@
+"""
+Tests for opaque pagination cursors.
+"""
+import base64
+import pytest
+from datetime import datetime
+import uuid
+
+import orjson
+
+from app.core.exceptions import InvalidRequestError
+from app.core.pagination import decode_cursor, decode_seek_cursor, encode_cursor
+
+
+def _raw_cursor(values) -> str:
+    """Build a token the way encode_cursor does, from arbitrary JSON."""
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode().rstrip("=")
+
+
+class TestCursorEncoding:
+    """Test cursor round-trips."""
+
+    def test_cursor_round_trip(self):
+        """Test values survive encoding and decoding."""
+        cursor = encode_cursor("2026-01-01T00:00:00", "abc")
+
+        assert "=" not in cursor
+        assert decode_cursor(cursor, 2) == ("2026-01-01T00:00:00", "abc")
+
+    def test_seek_cursor_round_trip(self):
+        """Test a (timestamp, id) sort key is parsed back to typed values."""
+        created_at = datetime(2026, 1, 1, 12, 30, 15, 123456)
+        row_id = uuid.uuid4()
+        cursor = encode_cursor(created_at.isoformat(), str(row_id))
+
+        assert decode_seek_cursor(cursor) == (created_at, row_id)
+
+
+class TestCursorValidation:
+    """Test malformed cursors are rejected."""
+
+    @pytest.mark.parametrize("cursor", [
+        "not base64!",
+        "%%%%",
+        _raw_cursor("just a string"),
+        _raw_cursor(["only one value"]),
+        _raw_cursor(["a", "b", "c"]),
+        _raw_cursor(["2026-01-01T00:00:00", 42]),
+    ])
+    def test_malformed_cursor_rejected(self, cursor):
+        """Test non-base64, non-JSON and wrongly shaped tokens."""
+        with pytest.raises(InvalidRequestError):
+            decode_cursor(cursor, 2)
+
+    def test_tampered_cursor_rejected(self):
+        """Test a cursor with its payload altered no longer decodes."""
+        cursor = encode_cursor("2026-01-01T00:00:00", str(uuid.uuid4()))
+
+        with pytest.raises(InvalidRequestError):
+            decode_cursor(cursor[:-3], 2)
+
+    @pytest.mark.parametrize("timestamp, row_id", [
+        ("yesterday", str(uuid.uuid4())),
+        ("2026-01-01T00:00:00", "not-a-uuid"),
+    ])
+    def test_unparsable_seek_values_rejected(self, timestamp, row_id):
+        """Test a well-formed token with bad values is rejected."""
+        with pytest.raises(InvalidRequestError):
+            decode_seek_cursor(encode_cursor(timestamp, row_id))
+
+    def test_invalid_cursor_is_value_error(self):
+        """Test callers catching ValueError still see bad cursors."""
+        with pytest.raises(ValueError):
+            decode_cursor("%%%%", 2)
@@ -8,6 +8,8 @@ from datetime import datetime
 from typing import Dict, Any, List
 import uuid
 
+from pydantic import TypeAdapter, ValidationError
+
 from app.api.v1.endpoints.personality import (
     PersonalityQuestion, PersonalityAnswer, PersonalityAssessmentRequest,
     PersonalityProfileResponse, PersonalityInsight, AssessmentProgress,
@@ -76,32 +78,38 @@ class TestPersonalityQuestionnaire:
             assert trait in categories, f"Missing questions for {trait}"
     
     def test_personality_answer_validation(self):
-        """Test personality answer model validation."""
+        """Test personality answer validation."""
+        validate_answer = TypeAdapter(PersonalityAnswer).validate_python
+        
         # Valid scale answer
-        scale_answer = PersonalityAnswer(
-            question_id="open_1",
-            answer=5,
-            confidence=0.8
-        )
-        assert scale_answer.question_id == "open_1"
-        assert scale_answer.answer == 5
-        assert scale_answer.confidence == 0.8
+        scale_answer = validate_answer({
+            "question_id": "open_1",
+            "answer": 5,
+            "confidence": 0.8
+        })
+        assert scale_answer["question_id"] == "open_1"
+        assert scale_answer["answer"] == 5
+        assert scale_answer["confidence"] == 0.8
         
         # Valid multiple choice answer
-        mc_answer = PersonalityAnswer(
-            question_id="values_2",
-            answer="Trust and honesty"
-        )
-        assert mc_answer.question_id == "values_2"
-        assert mc_answer.answer == "Trust and honesty"
+        mc_answer = validate_answer({
+            "question_id": "values_2",
+            "answer": "Trust and honesty"
+        })
+        assert mc_answer["question_id"] == "values_2"
+        assert mc_answer["answer"] == "Trust and honesty"
         
         # Valid ranking answer
-        ranking_answer = PersonalityAnswer(
-            question_id="values_1",
-            answer=["Family", "Career Success", "Personal Growth"]
-        )
-        assert ranking_answer.question_id == "values_1"
-        assert isinstance(ranking_answer.answer, list)
+        ranking_answer = validate_answer({
+            "question_id": "values_1",
+            "answer": ["Family", "Career Success", "Personal Growth"]
+        })
+        assert ranking_answer["question_id"] == "values_1"
+        assert isinstance(ranking_answer["answer"], list)
+        
+        # Answers of any other shape are rejected
+        with pytest.raises(ValidationError):
+            validate_answer({"question_id": "open_1", "answer": {"score": 5}})
 
 
 class TestPersonalityScoring:
@@ -633,5 +641,5 @@ class TestPersonalityDataValidation:
         
         assert len(request.answers) == 2
         assert request.assessment_version == "1.0"
-        assert request.answers[0].question_id == "open_1"
-        assert request.answers[0].answer == 7
\ No newline at end of file
+        assert request.answers[0]["question_id"] == "open_1"
+        assert request.answers[0]["answer"] == 7
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Unit tests for buffered profile view recording.
+Tests queueing, the background flush, and batch writes with bad rows.
+"""
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.services import profile_view_buffer
+
+
+@pytest.fixture(autouse=True)
+def fresh_buffer(monkeypatch):
+    """Give every test its own queue, bound to its own event loop."""
+    monkeypatch.setattr(profile_view_buffer, "_view_buffer", asyncio.Queue(maxsize=10))
+    monkeypatch.setattr(profile_view_buffer, "PROFILE_VIEW_FLUSH_INTERVAL_SECONDS", 0.01)
+
+
+def _known_users_result(user_ids):
+    """Result of the known-user lookup."""
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = list(user_ids)
+    return result
+
+
+@pytest.fixture
+def mock_session(monkeypatch):
+    """Session handed out by AsyncSessionLocal."""
+    session = AsyncMock()
+    session_factory = MagicMock()
+    session_factory.return_value.__aenter__.return_value = session
+    monkeypatch.setattr(profile_view_buffer, "AsyncSessionLocal", session_factory)
+    return session
+
+
+def _view(viewer_id, viewed_user_id):
+    return {
+        "viewer_id": viewer_id,
+        "viewed_user_id": viewed_user_id,
+        "source": "discover",
+        "view_duration_seconds": None,
+    }
+
+
+class TestProfileViewBuffer:
+    """Test cases for buffering and flushing profile views."""
+
+    def test_buffer_drops_views_when_full(self):
+        """Views beyond the buffer size are dropped instead of raising."""
+        for _ in range(11):
+            profile_view_buffer.buffer_profile_view(uuid.uuid4(), uuid.uuid4())
+
+        assert profile_view_buffer._view_buffer.qsize() == 10
+
+    async def test_flusher_writes_buffered_views(self, monkeypatch):
+        """Stopping the flusher writes whatever is still queued."""
+        written = []
+
+        async def write_views(batch):
+            written.extend(batch)
+
+        monkeypatch.setattr(profile_view_buffer, "_write_views", write_views)
+        viewer_id, viewed_user_id = uuid.uuid4(), uuid.uuid4()
+
+        await profile_view_buffer.start_profile_view_flusher()
+        profile_view_buffer.buffer_profile_view(viewer_id, viewed_user_id, "match", 12)
+        await profile_view_buffer.stop_profile_view_flusher()
+
+        assert len(written) == 1
+        assert written[0]["viewer_id"] == viewer_id
+        assert written[0]["viewed_user_id"] == viewed_user_id
+        assert written[0]["source"] == "match"
+        assert written[0]["view_duration_seconds"] == 12
+
+    async def test_write_views_skips_unknown_users(self, mock_session):
+        """Views naming a missing user are dropped before the batch insert."""
+        viewer_id, known_id, unknown_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        good, bad = _view(viewer_id, known_id), _view(viewer_id, unknown_id)
+        mock_session.execute.side_effect = [_known_users_result([viewer_id, known_id]), None]
+
+        await profile_view_buffer._write_views([good, bad])
+
+        inserted = mock_session.execute.call_args_list[1].args[1]
+        assert inserted == [good]
+        mock_session.commit.assert_awaited_once()
+
+    async def test_write_views_retries_rejected_batch_row_by_row(self, mock_session):
+        """A rejected batch only loses the rows that fail on their own."""
+        viewer_id, first_id, second_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        first, second = _view(viewer_id, first_id), _view(viewer_id, second_id)
+        rejected = IntegrityError("INSERT", {}, Exception("fk violation"))
+        mock_session.execute.side_effect = [
+            _known_users_result([viewer_id, first_id, second_id]),
+            rejected,  # the batch
+            rejected,  # first row on its own
+            None,  # second row on its own
+        ]
+
+        await profile_view_buffer._write_views([first, second])
+
+        retried = [call.args[1] for call in mock_session.execute.call_args_list[2:]]
+        assert retried == [[first], [second]]
+        assert mock_session.rollback.await_count == 2
+        mock_session.commit.assert_awaited_once()
@@ -71,7 +71,7 @@ const ConversationsList: React.FC<ConversationsListProps> = ({ onSelectConversat
         try {
             setError(null);
             const data = await api.get('/api/v1/messages/conversations');
-            setConversations(data);
+            setConversations(data.conversations);
         } catch (err: any) {
             setError(err.message || 'Failed to load conversations');
         } finally {
@@ -102,11 +102,9 @@ const ConversationsList: React.FC<ConversationsListProps> = ({ onSelectConversat
         if (!selectedConversation) return;
 
         try {
-            if (selectedConversation.is_archived) {
-                await api.post(`/api/v1/messages/conversation/${selectedConversation.match_id}/unarchive`);
-            } else {
-                await api.post(`/api/v1/messages/conversation/${selectedConversation.match_id}/archive`);
-            }
+            await api.patch(`/api/v1/messages/conversation/${selectedConversation.match_id}`, {
+                is_archived: !selectedConversation.is_archived,
+            });
 
             await loadConversations();
         } catch (err: any) {
@@ -120,11 +118,9 @@ const ConversationsList: React.FC<ConversationsListProps> = ({ onSelectConversat
         if (!selectedConversation) return;
 
         try {
-            if (selectedConversation.is_muted) {
-                await api.post(`/api/v1/messages/conversation/${selectedConversation.match_id}/unmute`);
-            } else {
-                await api.post(`/api/v1/messages/conversation/${selectedConversation.match_id}/mute`);
-            }
+            await api.patch(`/api/v1/messages/conversation/${selectedConversation.match_id}`, {
+                is_muted: !selectedConversation.is_muted,
+            });
 
             await loadConversations();
         } catch (err: any) {
@@ -76,7 +76,7 @@ const MessageList: React.FC<MessageListProps> = ({ matchId, currentUserId, other
 
     const markAsRead = async () => {
         try {
-            await api.post(`/api/v1/messages/conversation/${matchId}/read`);
+            await api.patch(`/api/v1/messages/conversation/${matchId}`, { mark_read: true });
         } catch (err: any) {
             console.error('Failed to mark messages as read:', err);
         }
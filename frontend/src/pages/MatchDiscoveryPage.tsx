@@ -60,8 +60,9 @@ interface MatchFilters {
 
 interface MatchDiscoveryResponse {
     matches: PotentialMatch[];
-    total_count: number;
+    total_count?: number | null;
     has_more: boolean;
+    next_cursor?: string | null;
     recommendations: string[];
 }
 
@@ -95,7 +96,6 @@ const MatchDiscoveryPage: React.FC = () => {
 
             const params = new URLSearchParams();
             params.append('limit', '20');
-            params.append('offset', '0');
 
             const activeFilters = newFilters || filters;
             if (activeFilters.age_min) params.append('age_min', activeFilters.age_min.toString());
@@ -105,7 +105,7 @@ const MatchDiscoveryPage: React.FC = () => {
             const response: MatchDiscoveryResponse = await api.get(`/api/v1/matches/discover?${params}`);
 
             setMatches(response.matches);
-            setTotalCount(response.total_count);
+            setTotalCount(response.total_count ?? response.matches.length);
             setHasMore(response.has_more);
             setRecommendations(response.recommendations || []);
             setCurrentIndex(0);
@@ -84,12 +84,12 @@ const initialState: MatchState = {
 // Async thunks
 export const discoverMatches = createAsyncThunk(
     'match/discoverMatches',
-    async (params: { filters?: MatchFilters; limit?: number; offset?: number }) => {
-        const { filters, limit = 20, offset = 0 } = params;
+    async (params: { filters?: MatchFilters; limit?: number; cursor?: string }) => {
+        const { filters, limit = 20, cursor } = params;
 
         const searchParams = new URLSearchParams();
         searchParams.append('limit', limit.toString());
-        searchParams.append('offset', offset.toString());
+        if (cursor) searchParams.append('cursor', cursor);
 
         if (filters?.age_min) searchParams.append('age_min', filters.age_min.toString());
         if (filters?.age_max) searchParams.append('age_max', filters.age_max.toString());
@@ -164,7 +164,7 @@ const matchSlice = createSlice({
             .addCase(discoverMatches.fulfilled, (state, action) => {
                 state.discoveryLoading = false;
                 state.potentialMatches = action.payload.matches;
-                state.totalMatches = action.payload.total_count;
+                state.totalMatches = action.payload.total_count ?? action.payload.matches.length;
                 state.hasMoreMatches = action.payload.has_more;
                 state.recommendations = action.payload.recommendations || [];
                 state.currentMatchIndex = 0;
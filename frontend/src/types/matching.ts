@@ -134,6 +134,7 @@ export type WebSocketEventType =
     | 'feedback_received'
     | 'guidance_sent'
     | 'gemini_quota_exceeded'
+    | 'unread_count'
     | 'error'
     | 'ping'
     | 'pong';